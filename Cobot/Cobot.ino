@@ -231,6 +231,14 @@ unsigned long lastMoveGrip = 0;
 unsigned long waitStart = 0;
 const unsigned long MOVE_DELAY = 150;  // tempo fixo entre movimentos (em ms)
 
+// --- Modo fluxo (S:C:S): sequence[] vira uma fila circular que o PC vai completando ---
+bool streamMode = false;
+bool streamEnded = false;     // S:C:E: o PC não vai mandar mais passos
+bool streamUnderrun = false;  // já avisou que a fila esvaziou
+uint8_t streamHead = 0;       // posição em sequence[] do passo atual
+uint32_t streamDone = 0;      // passos concluídos desde o S:C:S (numeração global)
+uint32_t streamTotal = 0;     // passos recebidos desde o S:C:S
+
 bool gripReached = false;
 bool startBeginning = true;
 bool initialPrint = true;
@@ -246,6 +254,10 @@ const unsigned long DEBOUNCE = 200;  // 150 ms delay p/ botão
 
 bool detachSituation = false;
 
+// --- Protocolo (P:B / P:T): telemetria, passos e M:M / M:MS em quadros binários ---
+bool binaryMode = false;
+uint8_t txSeq = 0;            // seq dos quadros enviados (o PC detecta perdas pelos buracos)
+
 // ========================================
 //             --- SETUP ---
 // ========================================
@@ -344,7 +356,9 @@ void setup() {
 // ========================================
 void loop() {
   // put your main code here, to run repeatedly:
-  if (Serial.available()) {
+  if (Serial.available() && Serial.peek() == FRAME_SYNC_1) {
+    readFrame();  // protocolo binário: sem eco nem DONE
+  } else if (Serial.available()) {
     serialPrintln("========================================");
     serialPrintln("--- Resposta Serial Identificada ---");
     // Serial.setTimeout(2000);
@@ -444,7 +458,7 @@ void loop() {
     btn3Ctrl = true;
     btn3T = millis();
 
-    serialPrintln("#SAVEPOS#");
+    reportSavePos();
   }
 }
 
@@ -531,6 +545,18 @@ void processCommand(String data[4]) {
     }
   }
 
+  if (data[0] == "P") {  // Protocolo
+    if (data[1] == "B") {
+      binaryMode = true;
+      txSeq = 0;
+      serialPrintln("#PROTO:BIN#");
+    }
+    if (data[1] == "T") {
+      binaryMode = false;
+      serialPrintln("#PROTO:TXT#");
+    }
+  }
+
   if (data[0] == "M") {
     if (data[1] == "A") {
       serialPrintln("all->attach()");
@@ -579,6 +605,10 @@ void processCommand(String data[4]) {
       // joint[6]->calibrateFeedbackMultiPoint();
     }
     if (data[1] == "P") {
+      if (binaryMode) {
+        reportJoints();
+        return;
+      }
       // String data = "#POS:";
       for (int i = 0; i < 6; i++) {
         int angle = joint[i]->getAngle();
@@ -610,7 +640,7 @@ void processCommand(String data[4]) {
       }
     }
     if (data[1] == "SP") {
-      serialPrintln("#SAVEPOS#");
+      reportSavePos();
     }
   }
 
@@ -641,9 +671,7 @@ void processCommand(String data[4]) {
       }
 
       // Adiciona o comando à sequência
-      sequence[numSteps++] = newCmd;
-      serialPrint(numSteps, " - ");
-      newCmd.dump();
+      addStep(newCmd);
     }
 
     // ============================
@@ -657,9 +685,7 @@ void processCommand(String data[4]) {
       newCmd.grip = data[2].toInt();
 
       // Adiciona o comando à sequência
-      sequence[numSteps++] = newCmd;
-      serialPrint(numSteps, " - ");
-      newCmd.dump();
+      addStep(newCmd);
     }
 
     // ============================
@@ -673,9 +699,7 @@ void processCommand(String data[4]) {
       newCmd.wait = data[2].toInt();
       if (newCmd.wait <= 0) newCmd.wait = 1000;  // padrão de 1000 ms
 
-      sequence[numSteps++] = newCmd;
-      serialPrint(numSteps, " - ");
-      newCmd.dump();
+      addStep(newCmd);
     }
 
     // ============================
@@ -699,11 +723,41 @@ void processCommand(String data[4]) {
       // CLEAR
       if (data[2] == "C") {
         numSteps = 0;
+        streamMode = false;
         executingSequence = false;
         currentStep = 0;
         startBeginning = true;
         initialPrint = true;
-        serialPrintln("#STEP:INIT#");
+        reportStepEvent(STEP_INIT);
+      }
+
+      // STREAM: S:C:S limpa a sequência e passa a usá-la como fila circular.
+      // Cada passo concluído libera espaço; os passos são numerados desde o S:C:S.
+      if (data[2] == "S") {
+        numSteps = 0;
+        executingSequence = false;
+        stepStarted = false;
+        lastMoveEnd = 0;
+        waitStart = 0;
+        streamMode = true;
+        streamEnded = false;
+        streamUnderrun = false;
+        streamHead = 0;
+        streamDone = 0;
+        streamTotal = 0;
+        reportStepEvent(STEP_INIT);
+      }
+
+      // END OF STREAM: depois do último passo da fila, #STEP:END#
+      if (data[2] == "E") {
+        streamEnded = true;
+      }
+
+      // F/B não valem no fluxo: a fila circular não guarda os passos já executados
+      // e sequence[currentStep] não é o passo atual (use S:C:P / S:C:R)
+      if (streamMode && (data[2] == "B" || data[2] == "F")) {
+        serialPrintln("Fluxo ativo: S:C:", data[2], " ignorado");
+        return;
       }
 
       // FAST BACKWARD
@@ -714,7 +768,7 @@ void processCommand(String data[4]) {
         executingSequence = false;
         waitStart = 0;
         stepStarted = 0;
-        serialPrintln("#STEP:INIT");
+        reportStepEvent(STEP_INIT);
       }
 
       // FORWARD
@@ -722,7 +776,7 @@ void processCommand(String data[4]) {
         executingSequence = false;
         if (!initialPrint && currentStep < numSteps) currentStep++;
         if (currentStep < numSteps) {
-          serialPrintln("#STEP:" + String(currentStep + 1) + "#");
+          reportStep(currentStep + 1);
 
           Cmd c = sequence[currentStep];
           switch (c.type) {
@@ -747,7 +801,7 @@ void processCommand(String data[4]) {
               break;
           }
         } else {
-          serialPrintln("#STEP:END#");
+          reportStepEvent(STEP_END);
           currentStep = constrain(currentStep, 0, numSteps - 1);
         }
         startBeginning = false;
@@ -819,10 +873,114 @@ void processCommand(String data[4]) {
   }
 }
 
+// ========================================
+//       --- PROTOCOLO BINÁRIO ---
+// ========================================
+// CRC-16/CCITT-FALSE (poly 0x1021, início 0xFFFF)
+uint16_t crc16(const uint8_t* data, size_t len) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t b = 0; b < 8; b++) crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+void sendFrame(uint8_t type, const uint8_t* payload, uint8_t len) {
+  uint8_t frame[FRAME_MAX_PAYLOAD + 7];
+  frame[0] = FRAME_SYNC_1;
+  frame[1] = FRAME_SYNC_2;
+  frame[2] = len;
+  frame[3] = txSeq++;
+  frame[4] = type;
+  memcpy(frame + 5, payload, len);
+  uint16_t crc = crc16(frame + 2, len + 3);
+  frame[5 + len] = crc & 0xFF;
+  frame[6 + len] = crc >> 8;
+  Serial.write(frame, len + 7);
+}
+
+void reportJoint(uint8_t joint, int angle) {
+  if (!binaryMode) {
+    serialPrintln("#J", joint, ":", angle, "#");
+    return;
+  }
+  uint8_t payload[3] = { joint, (uint8_t)(angle & 0xFF), (uint8_t)((angle >> 8) & 0xFF) };
+  sendFrame(FRAME_JOINT, payload, 3);
+}
+
+// M:P no modo binário: as 6 juntas num quadro só
+void reportJoints() {
+  uint8_t payload[12];
+  for (int i = 0; i < 6; i++) {
+    int16_t angle = joint[i]->getAngle();
+    payload[2 * i] = angle & 0xFF;
+    payload[2 * i + 1] = (angle >> 8) & 0xFF;
+  }
+  sendFrame(FRAME_JOINTS, payload, 12);
+}
+
+void reportStep(uint32_t step) {
+  if (!binaryMode) {
+    serialPrintln("#STEP:", step, "#");
+    return;
+  }
+  uint8_t payload[4];
+  for (int i = 0; i < 4; i++) payload[i] = (step >> (8 * i)) & 0xFF;
+  sendFrame(FRAME_STEP, payload, 4);
+}
+
+void reportStepEvent(uint8_t event) {
+  if (binaryMode) sendFrame(FRAME_STEP_EVENT, &event, 1);
+  else if (event == STEP_INIT) serialPrintln("#STEP:INIT#");
+  else if (event == STEP_END) serialPrintln("#STEP:END#");
+  else if (event == STEP_UNDERRUN) serialPrintln("#STEP:UNDERRUN#");
+}
+
+void reportSavePos() {
+  if (binaryMode) sendFrame(FRAME_SAVEPOS, nullptr, 0);
+  else serialPrintln("#SAVEPOS#");
+}
+
+// Lê um quadro que começa no próximo byte (0xA5). Quadro inválido é descartado.
+void readFrame() {
+  uint8_t frame[FRAME_MAX_PAYLOAD + 5];  // len | seq | tipo | payload | crc
+  Serial.read();                         // FRAME_SYNC_1
+  if (Serial.readBytes(frame, 1) != 1 || frame[0] != FRAME_SYNC_2) return;
+  if (Serial.readBytes(frame, 3) != 3 || frame[0] > FRAME_MAX_PAYLOAD) return;
+
+  uint8_t len = frame[0];
+  if (Serial.readBytes(frame + 3, len + 2) != (size_t)(len + 2)) return;
+  uint16_t crc = frame[3 + len] | (frame[4 + len] << 8);
+  if (crc16(frame, len + 3) != crc) {
+    serialPrintln("#FRAME:CRC#");
+    return;
+  }
+  processFrame(frame[2], frame + 3, len);
+}
+
+void processFrame(uint8_t type, const uint8_t* payload, uint8_t len) {
+  if ((type == FRAME_MOVE || type == FRAME_MOVESMOOTH) && len >= 1) {  // = M:M / M:MS
+    uint8_t speed = payload[0];
+    int count = min((len - 1) / 2, 6);
+    for (int c = 0; c < count; c++) {
+      int16_t angle = payload[1 + 2 * c] | (payload[2 + 2 * c] << 8);
+      if (type == FRAME_MOVE) joint[c]->move(angle, speed);
+      else joint[c]->moveSmooth(angle, speed);
+    }
+  }
+}
+
 void executeSequence() {
-  if (!executingSequence || currentStep >= numSteps) return;
+  if (streamMode) {
+    if (!executingSequence) return;
+    if (numSteps == 0) {
+      streamIdle();
+      return;
+    }
+  } else if (!executingSequence || currentStep >= numSteps) return;
 
-  Cmd& c = sequence[currentStep];
+  Cmd& c = sequence[streamMode ? streamHead : currentStep];
 
   bool movementCommand = (c.type == CmdType::MOVE || c.type == CmdType::MOVESMOOTH);
   bool waitCommand = (c.type == CmdType::WAIT);
@@ -830,7 +988,7 @@ void executeSequence() {
 
   // Envio do passo atual no início da execução
   if (!stepStarted) {
-    serialPrintln("#STEP:" + String(currentStep + 1) + "#");
+    reportStep(streamMode ? streamDone + 1 : currentStep + 1);
     stepStarted = true;  // flag global ou estática para não repetir durante o mesmo passo
 
     switch (c.type) {
@@ -881,10 +1039,12 @@ void executeSequence() {
     if (lastMoveEnd == 0) lastMoveEnd = millis();
     if (millis() - lastMoveEnd < MOVE_DELAY) return;
 
-    if (currentStep < numSteps -1) {
+    if (streamMode) {
+      streamNext();
+    } else if (currentStep < numSteps -1) {
       nextStep();
     } else {
-      serialPrintln("#STEP:END#");
+      reportStepEvent(STEP_END);
       stepStarted = false;
       lastMoveEnd = 0;
       startBeginning = true;
@@ -904,6 +1064,42 @@ void nextStep() {
   lastMoveEnd = 0;
 }
 
+// Adiciona um passo à sequência (ou ao fim da fila no modo fluxo) e ecoa "N - <passo>"
+void addStep(Cmd& c) {
+  if (streamMode) {
+    sequence[(streamHead + numSteps) % MAX_STEPS] = c;
+    numSteps++;
+    streamTotal++;
+    streamUnderrun = false;
+    serialPrint(streamTotal, " - ");
+  } else {
+    sequence[numSteps++] = c;
+    serialPrint(numSteps, " - ");
+  }
+  c.dump();
+}
+
+// Modo fluxo: libera a posição do passo concluído
+void streamNext() {
+  streamHead = (streamHead + 1) % MAX_STEPS;
+  numSteps--;
+  streamDone++;
+  stepStarted = false;
+  lastMoveEnd = 0;
+}
+
+// Modo fluxo com a fila vazia: fim (S:C:E já recebido) ou falta de passos (underrun)
+void streamIdle() {
+  if (streamEnded) {
+    reportStepEvent(STEP_END);
+    executingSequence = false;
+    startBeginning = true;
+  } else if (!streamUnderrun) {
+    reportStepEvent(STEP_UNDERRUN);
+    streamUnderrun = true;
+  }
+}
+
 void fecharGarra() {
   // Comando de fechar
   // serialPrintln("Fechar garra");
@@ -69,4 +69,31 @@ template<typename... Args>
 void serialPrint(Args... args);
 
 template<typename... Args>
-void serialPrintln(Args... args);
\ No newline at end of file
+void serialPrintln(Args... args);
+
+
+// ======= PROTOCOLO BINÁRIO (P:B) =======
+// Quadro: A5 5A | len | seq | tipo | payload | crc16 (LE, CCITT-FALSE de len..payload)
+#define FRAME_SYNC_1 0xA5
+#define FRAME_SYNC_2 0x5A
+#define FRAME_MAX_PAYLOAD 32
+
+#define FRAME_MOVE 0x01        // PC -> ESP: vel(u8) + ângulos(int16)  = M:M
+#define FRAME_MOVESMOOTH 0x02  // PC -> ESP: idem                      = M:MS
+#define FRAME_JOINT 0x81       // ESP -> PC: junta(u8) + ângulo(int16) = #Jn:angle#
+#define FRAME_JOINTS 0x82      // ESP -> PC: ângulos(int16 * 6)        = M:P
+#define FRAME_STEP 0x83        // ESP -> PC: passo(uint32)             = #STEP:n#
+#define FRAME_SAVEPOS 0x84     // ESP -> PC: vazio                     = #SAVEPOS#
+#define FRAME_STEP_EVENT 0x85  // ESP -> PC: evento(u8)                = #STEP:INIT/END/UNDERRUN#
+
+// Eventos da sequência (reportStepEvent): separados do número do passo,
+// que no modo fluxo é um contador de 32 bits e pode ter qualquer valor
+#define STEP_INIT 0
+#define STEP_END 1
+#define STEP_UNDERRUN 2
+
+// Texto ou quadro, conforme o protocolo negociado
+void reportJoint(uint8_t joint, int angle);
+void reportStep(uint32_t step);
+void reportStepEvent(uint8_t event);
+void reportSavePos();
\ No newline at end of file
@@ -122,7 +122,7 @@ public:
     if (mirror) mirror->write(map(angle, 0, 180, 180, 0), true);
 
     if (!isMirror) {
-      serialPrintln("#J", this->joint, ":", currentAngle, "#");  // Ex: #J1:90#
+      reportJoint(this->joint, currentAngle);  // Ex: #J1:90#
       if (log_in_move && !log) display();
     }
   }
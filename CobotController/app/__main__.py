@@ -1,4 +1,20 @@
-from main import run_app
+import argparse
+import sys
+from pathlib import Path
+
+# python -m app (a partir de CobotController/): os módulos se importam pelo nome
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import startup  # noqa: E402  (primeiro: o relógio da partida começa aqui)
+from main import run_app  # noqa: E402
+
+startup.marcar("imports")
 
 if __name__ == '__main__':
-   run_app()
\ No newline at end of file
+   parser = argparse.ArgumentParser(description="Controlador do Cobot")
+   parser.add_argument("--headless", action="store_true", help="sem janela: serve a interface e o Api por HTTP + WebSocket")
+   parser.add_argument("--host", default=None, help="endereço do servidor headless (padrão 127.0.0.1)")
+   parser.add_argument("--porta", type=int, default=None, help="porta do servidor headless (padrão 8765)")
+   args = parser.parse_args()
+
+   run_app(args.headless, args.host, args.porta)
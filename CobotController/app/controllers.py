@@ -1,48 +1,297 @@
 from serial_comm import SerialManager
-from time import sleep
+from program_store import ProgramStore, ProgramCache
+from sequence_stream import ExecutorSequencia, JANELA_PADRAO
+from jog import JogController
+from joint_state import EstadoJuntas
+from time import perf_counter
 import json
+import threading
 import uuid
 from pathlib import Path
+from typing import NamedTuple
+
+MAX_STEPS = 30  # mesmo valor de config.h (tamanho de sequence[] no firmware)
+TOLERANCIA_GRAUS = 1  # movimentos seguidos com diferença até esse valor viram um só
+TOLERANCIA_INICIO_GRAUS = 3  # mover_linear: distância máxima entre o braço e o ponto de início
+
+
+def _ponto(points, i):
+    """points vem do JSON salvo ({"0": [...]}) ou de uma lista."""
+    if isinstance(points, dict):
+        return points.get(str(i), points.get(i))
+    return points[i] if 0 <= i < len(points) else None
+
+
+# ============================================================
+# === COMPILADOR (IR + PASSES) ===============================
+# ============================================================
+
+OP_MOVER = "M"          # S:M   (todas as juntas na mesma velocidade)
+OP_MOVER_SUAVE = "MS"   # S:MS  (desacelera na segunda metade)
+OP_ESPERA = "W"         # S:W
+OP_GARRA = "G"          # S:G
+
+
+class Instrucao(NamedTuple):
+    """Um passo da sequência do firmware."""
+    op: str
+    origem: int             # número (1..N) do command do programa que gerou o passo
+    pos: tuple = ()         # mover: ângulos das juntas
+    vel: int = 0            # mover: velocidade 1-10
+    ms: int = 0             # espera
+    acao: int = 0           # garra: 0 abrir, 1 fechar
+
+    def linha(self):
+        if self.op in (OP_MOVER, OP_MOVER_SUAVE):
+            return f"S:{self.op}:{self.vel}:#{';'.join(str(a) for a in self.pos)}#"
+        if self.op == OP_ESPERA:
+            return f"S:W:{self.ms}"
+        return f"S:G:{self.acao}"
+
+
+def gerar_ir(program):
+    """
+    Converte os commands de um programa salvo em instruções.
+    - mover -> S:M (Linear) / S:MS (suavizado), velocidade = speed/10
+    - delay -> S:W em ms
+    - garra -> S:G:0 (abrir) / S:G:1 (fechar)
+    """
+    points = program.get("points") or {}
+    ir = []
+
+    for n, cmd in enumerate(program.get("commands") or [], start=1):
+        tipo = cmd.get("type")
+        params = cmd.get("params") or {}
+
+        if tipo == "mover" and params.get("point") is not None:
+            pos = _ponto(points, int(params["point"]))
+            if pos is None:
+                raise ValueError(f"Ponto {int(params['point']) + 1} não existe no programa")
+            op = OP_MOVER if params.get("mode") == "Linear" else OP_MOVER_SUAVE
+            vel = int(params.get("speed", 50) / 10)
+            ir.append(Instrucao(op, n, pos=tuple(int(a) for a in pos), vel=vel))
+        elif tipo == "delay" and params.get("delay") is not None:
+            ir.append(Instrucao(OP_ESPERA, n, ms=round(params["delay"] * 1000)))
+        elif tipo == "garra" and params.get("acao") is not None:
+            ir.append(Instrucao(OP_GARRA, n, acao=int(params["acao"])))
+
+    return ir
+
+
+def _eh_movimento(inst):
+    return inst.op in (OP_MOVER, OP_MOVER_SUAVE)
+
+
+def _passo_esperas(ir):
+    """Junta esperas seguidas numa só e remove esperas de 0 ms."""
+    saida = []
+    for inst in ir:
+        if inst.op == OP_ESPERA:
+            if saida and saida[-1].op == OP_ESPERA:
+                saida[-1] = saida[-1]._replace(ms=saida[-1].ms + inst.ms)
+                continue
+        saida.append(inst)
+    return [i for i in saida if not (i.op == OP_ESPERA and i.ms <= 0)]
+
+
+def _passo_movimentos_nulos(ir):
+    """Remove movimentos para a posição em que o braço já está (esperas e garra não movem o braço)."""
+    saida, atual = [], None
+    for inst in ir:
+        if _eh_movimento(inst):
+            if inst.pos == atual:
+                continue
+            atual = inst.pos
+        saida.append(inst)
+    return saida
+
+
+def _passo_tolerancia(ir, tolerancia):
+    """Movimento seguido de outro a até `tolerancia` graus: vai direto para o segundo."""
+    saida = []
+    for inst in ir:
+        if _eh_movimento(inst) and saida and _eh_movimento(saida[-1]):
+            anterior = saida[-1]
+            if max(abs(a - b) for a, b in zip(anterior.pos, inst.pos)) <= tolerancia:
+                saida[-1] = inst._replace(origem=anterior.origem)
+                continue
+        saida.append(inst)
+    return saida
+
+
+def _passo_garra(ir):
+    """Comandos de garra seguidos valem pelo último; garra já no estado pedido é removida."""
+    saida, estado = [], None
+    for inst in ir:
+        if inst.op == OP_GARRA:
+            if saida and saida[-1].op == OP_GARRA:
+                anterior = saida.pop()
+                inst = inst._replace(origem=anterior.origem)
+                estado = _estado_garra(saida)
+            if inst.acao == estado:
+                continue
+            estado = inst.acao
+        saida.append(inst)
+    return saida
+
+
+def _estado_garra(ir):
+    for inst in reversed(ir):
+        if inst.op == OP_GARRA:
+            return inst.acao
+    return None
+
+
+def otimizar_ir(ir, tolerancia=TOLERANCIA_GRAUS):
+    """Roda os passes até nenhum deles mudar mais nada."""
+    while True:
+        novo = _passo_esperas(ir)
+        novo = _passo_movimentos_nulos(novo)
+        if tolerancia > 0:
+            novo = _passo_tolerancia(novo, tolerancia)
+        novo = _passo_garra(novo)
+        if novo == ir:
+            return novo
+        ir = novo
+
+
+def compilar_programa(program, otimizar=True, tolerancia=TOLERANCIA_GRAUS):
+    """
+    Compila o programa e, se otimizar, roda os passes.
+    Retorna (ir, relatorio) com os passos e o tempo estimado antes/depois.
+    """
+    from simulator import simular_lote
+    ir = gerar_ir(program)
+    otimizado = otimizar_ir(ir, tolerancia) if otimizar else ir
+    antes, depois = simular_lote([ir, otimizado]).total
+    return otimizado, {
+        "passos_originais": len(ir),
+        "passos": len(otimizado),
+        "passos_economizados": len(ir) - len(otimizado),
+        "tempo_estimado_ms": round(depois),
+        "tempo_economizado_ms": round(antes - depois),
+    }
 
 
 class Cobot:
-    def __init__(self, ser: SerialManager):
+    def __init__(self, ser: SerialManager, saves_path='app/saves', modelo=None, base=None):
+        """
+        base: outro Cobot da mesma célula (fleet.Frota). O modelo, o IK, o banco de
+        programas e os caches são os dele; conexão, juntas e sequência são de cada braço.
+
+        Nada pesado é feito aqui (a janela abre sem esperar): modelo/IK/streamer
+        (numpy), o banco de programas (e a migração do slots.json) e o cache de
+        planos são criados no primeiro uso - ou antes, por aquecer().
+        """
         self._ser = ser
         self.points = []
-        self.joint_pos = [90, 30, 152, 90, 84]
+        self._juntas = EstadoJuntas([90, 30, 152, 90, 84])  # escrito pela thread serial (#Jn#)
+        self._jog = JogController(ser, posicao=lambda j: self._juntas.posicao(j - 1) if j <= len(self._juntas) else None)
+
+        self._base = base
+        self._adiados = {"modelo": modelo} if modelo is not None else {}   # nome -> objeto já criado
+        if base is not None:
+            self._lock_adiados = base._lock_adiados
+            self._saves_path, self._slots_file = base._saves_path, base._slots_file
+            self._cache = base._cache
+        else:
+            self._lock_adiados = threading.RLock()  # o IK pede o modelo com o lock na mão
 
-        self._saves_path = Path('app/saves')
-        self._saves_path.mkdir(parents=True, exist_ok=True)
+            self._saves_path = Path(saves_path)
+            self._saves_path.mkdir(parents=True, exist_ok=True)
 
-        self._slots_file = self._saves_path / 'slots.json'
-        self.slots = []
+            self._slots_file = self._saves_path / 'slots.json'
+            self._cache = ProgramCache()
 
-        self._load_slots()
+        self._plano_carregado = None    # plano que está gravado no firmware
+        self._executor = None           # ExecutorSequencia, criado no primeiro uso
+        self._origem_fluxo = ()         # origem dos passos do programa em execução em fluxo
+        self.otimizar = True            # passes do compilador (ver otimizar_ir)
+        self.tolerancia = TOLERANCIA_GRAUS
 
 
     # ============================================================
-    # === LOAD E SALVAR SLOTS ====================================
+    # === CARGA ADIADA ===========================================
     # ============================================================
 
-    def _load_slots(self):
-        """Carrega a lista de slots."""
-        if not self._slots_file.exists():
-            self._slots_file.write_text("[]", encoding="utf-8")
+    def _adiado(self, nome, criar):
+        """Objeto `nome`, criado por criar() na primeira vez que alguém pede."""
+        obj = self._adiados.get(nome)
+        if obj is None:
+            with self._lock_adiados:
+                obj = self._adiados.get(nome)
+                if obj is None:
+                    obj = self._adiados[nome] = criar()
+        return obj
+
+    @property
+    def modelo(self):
+        """Geometria para FK (kinematics.py)."""
+        def criar():
+            if self._base is not None:
+                return self._base.modelo
+            from kinematics import ModeloBraco
+            return ModeloBraco()
+        return self._adiado("modelo", criar)
+
+    @property
+    def _ik(self):
+        def criar():
+            if self._base is not None:
+                return self._base._ik
+            from inverse_kinematics import SolverIK
+            return SolverIK(self.modelo)
+        return self._adiado("ik", criar)
+
+    @property
+    def _streamer(self):
+        def criar():
+            from trajectory import StreamerTrajetoria
+            return StreamerTrajetoria(self._ser)
+        return self._adiado("streamer", criar)
+
+    @property
+    def _store(self):
+        return self._adiado("store", lambda: self._base._store if self._base is not None else self._load_slots())
+
+    @property
+    def _planos(self):
+        def criar():
+            if self._base is not None:
+                return self._base._planos
+            from plan_cache import PlanCache
+            return PlanCache(self._saves_path / 'plans.json')
+        return self._adiado("planos", criar)
+
+    def aquecer(self):
+        """
+        Cria de uma vez o que o construtor adiou (chamado em segundo plano
+        depois que a janela abre), para o primeiro clique não pagar a carga.
+        """
+        for nome in ("_store", "_planos", "_ik", "_streamer"):
+            getattr(self, nome)
+        import simulator  # noqa: F401
 
-        try:
-            conteudo = self._slots_file.read_text(encoding="utf-8").strip()
-            self.slots = json.loads(conteudo) if conteudo else []
-        except Exception as e:
-            print("ERRO NA LEITURA DOS SAVES\n", e)
-            self.slots = []
-            self._save_slots()
 
-    def _save_slots(self):
-        """Atualiza o arquivo slots.json."""
-        self._slots_file.write_text(
-            json.dumps(self.slots, indent=2),
-            encoding="utf-8"
-        )
+    # ============================================================
+    # === LOAD E SALVAR SLOTS ====================================
+    # ============================================================
+
+    def _load_slots(self):
+        """Abre o banco de programas (migra o slots.json antigo na primeira vez)."""
+        store = ProgramStore(self._saves_path / 'programs.db')
+        if self._slots_file.exists():
+            try:
+                n = store.migrar_json(self._saves_path)
+                if n:
+                    print(f"{n} programa(s) migrado(s) de slots.json")
+            except Exception as e:
+                print("ERRO NA MIGRAÇÃO DOS SAVES\n", e)
+        return store
+
+    @property
+    def slots(self):
+        return self._store.listar()
 
 
     # ============================================================
@@ -50,11 +299,9 @@ class Cobot:
     # ============================================================
 
     def gerar_id(self):
-        existente = {item["id"] for item in self.slots}
-
         while True:
             novo_id = uuid.uuid4().hex
-            if novo_id not in existente:
+            if novo_id not in self._store:
                 return novo_id
 
 
@@ -63,48 +310,24 @@ class Cobot:
     # ============================================================
 
     def create_slot(self, name: str, dom: str):
-        """Cria um save novo (arquivo e registro no slots.json)."""
+        """Cria um save novo."""
         new_id = self.gerar_id()
 
-        # salva conteúdo do DOM
-        dados = json.loads(dom)
-        (self._saves_path / f"{new_id}.json").write_text(
-            json.dumps(dados, indent=2),
-            encoding="utf-8"
-        )
-
-        # grava na lista de slots
-        self.slots.append({"id": new_id, "name": name})
-        self._save_slots()
+        json.loads(dom)  # valida antes de gravar; o texto do DOM já vem compacto
+        self._store.salvar(new_id, name, dom)
 
         return new_id
 
 
     def update_slot_name(self, id: str, new_name: str):
-        """Atualiza o nome apenas dentro do slots.json."""
-        for slot in self.slots:
-            if slot["id"] == id:
-                slot["name"] = new_name
-                self._save_slots()
-                return True
-        return False
+        """Atualiza só o nome do slot."""
+        return self._store.renomear(id, new_name)
 
 
     def delete_slot(self, id: str):
-        """Remove o arquivo <id>.json e o slot correspondente."""
-        # remove arquivo físico
-        path = self._saves_path / f"{id}.json"
-        if path.exists():
-            path.unlink()
-
-        # remove do array
-        original = len(self.slots)
-        self.slots = [slot for slot in self.slots if slot["id"] != id]
-
-        # salva arquivo atualizado
-        self._save_slots()
-
-        return len(self.slots) < original
+        """Remove o programa e o slot correspondente."""
+        self._cache.invalidar(id)
+        return self._store.remover(id)
 
 
     # ============================================================
@@ -117,20 +340,12 @@ class Cobot:
         - Cria novo se o id for None ou não existir.
         - Atualiza conteúdo e nome se já existir.
         """
-        ids_existentes = {s["id"] for s in self.slots}
-
-        if id is None or id not in ids_existentes:
+        if id is None or id not in self._store:
             return self.create_slot(name, dom)
 
-        # atualizar arquivo
-        dados = json.loads(dom)
-        (self._saves_path / f"{id}.json").write_text(
-            json.dumps(dados, indent=2),
-            encoding="utf-8"
-        )
-
-        # atualizar nome
-        self.update_slot_name(id, name)
+        json.loads(dom)
+        self._store.salvar(id, name, dom)
+        self._cache.invalidar(id)
 
         return id
 
@@ -145,18 +360,18 @@ class Cobot:
 
 
     def load_program(self, id: str):
-        """Retorna o JSON do arquivo <id>.json como string."""
-        path = self._saves_path / f"{id}.json"
-
-        if not path.exists():
-            return "[]"
-
+        """
+        Retorna o programa salvo (dict) e carrega seus pontos.
+        Programas recentes vêm do cache; o mtime gravado no banco invalida o item
+        se o programa mudou (inclusive por outro processo).
+        """
         try:
-            program = json.loads(path.read_text(encoding="utf-8"))
-            self.clear_point()
-            if (program):
-                for point in program['points'].values():
-                    self.add_point(point)
+            program = self._obter_programa(id)
+            if program is None:
+                return "[]"
+
+            # cópia dos pontos: o dict do cache não pode ser alterado por add/delete_point
+            self.points = [list(p) for p in program['points'].values()] if program else []
 
             return program
         except Exception as erro:
@@ -164,26 +379,260 @@ class Cobot:
             print(erro)
             return "[]"
 
+    def _obter_programa(self, id):
+        """Programa salvo (dict do cache, não alterar) ou None, sem mexer nos pontos da tela."""
+        mtime = self._store.obter_mtime(id)
+        if mtime is None:
+            return None
+
+        program = self._cache.obter(id, mtime)
+        if program is None:
+            program, mtime = self._store.obter_com_mtime(id)
+            if program is None:
+                return None
+            self._cache.guardar(id, mtime, program)
+        return program
+
+
+    # ============================================================
+    # === ENVIO DE SEQUÊNCIA =====================================
+    # ============================================================
+
+    def upload_sequence(self, program, janela=4, timeout=1.0, forcar=False):
+        """
+        Compila os commands do programa e grava a sequência no firmware.
+        As linhas vão uma atrás da outra; cada uma é confirmada pelo eco
+        "N - ..." do firmware, com até `janela` linhas em trânsito.
+        O plano compilado vem do cache (hash do conteúdo) e, se for o mesmo que
+        já está no firmware, nada é enviado (forcar=True envia mesmo assim).
+        Retorna {"passos", "tempo_ms", "cache", "enviado", "otimizacao"}.
+        """
+        if isinstance(program, str):
+            program = json.loads(program)
+
+        inicio = perf_counter()
+        plano, do_cache = self.compilar(program)
+        linhas = plano.linhas
+        if len(linhas) > MAX_STEPS:
+            raise ValueError(f"Programa com {len(linhas)} passos (máximo {MAX_STEPS})")
+
+        resultado = {"passos": len(linhas), "cache": do_cache, "otimizacao": dict(plano.relatorio)}
+        carregado = self._plano_carregado
+        if carregado is not None and plano.hash == carregado.hash and not forcar:
+            return {**resultado, "tempo_ms": round((perf_counter() - inicio) * 1000, 1), "enviado": False}
+
+        # se falhar no meio, o firmware fica com uma sequência parcial
+        self.invalidar_sequencia()
+        if self._ser.enviar_e_aguardar_linha("S:C:C", "#STEP:INIT", timeout) is None:
+            raise TimeoutError("Firmware não confirmou a limpeza da sequência (S:C:C)")
+
+        confirmacoes = [f"{i} - " for i in range(1, len(linhas) + 1)]
+        enviados = self._ser.enviar_em_fluxo(linhas, confirmacoes, janela, timeout)
+        if enviados < len(linhas):
+            raise TimeoutError(f"Firmware confirmou só {enviados} de {len(linhas)} passos")
+
+        self._plano_carregado = plano
+        return {**resultado, "tempo_ms": round((perf_counter() - inicio) * 1000, 1), "enviado": True}
+
+    def compilar(self, program):
+        """Plano compilado do programa, do cache se o conteúdo já foi compilado. (plano, do_cache)"""
+        def compilar(p):
+            ir, relatorio = compilar_programa(p, self.otimizar, self.tolerancia)
+            return [inst.linha() for inst in ir], [inst.origem for inst in ir], relatorio
+
+        opcoes = {"otimizar": self.otimizar, "tolerancia": self.tolerancia}
+        return self._planos.obter_ou_compilar(program, compilar, opcoes)
+
+    def step_original(self, step):
+        """
+        Passo do firmware (#STEP:n#) -> número do command no programa. Com os
+        passes do compilador os dois deixam de coincidir; "init"/"end" não mudam.
+        """
+        if not step.isdigit():
+            return step
+        n = int(step)
+        if self._origem_fluxo:
+            # em fluxo a numeração continua entre repetições do programa
+            return str(self._origem_fluxo[(n - 1) % len(self._origem_fluxo)])
+        plano = self._plano_carregado
+        if plano is None or not plano.origem:
+            return step
+        return str(plano.origem[n - 1]) if 1 <= n <= len(plano.origem) else step
+
+    def invalidar_sequencia(self):
+        """A sequência do firmware deixou de ser conhecida (reconexão, S:* avulso)."""
+        self._plano_carregado = None
+        self._origem_fluxo = ()
+        if self._executor is not None and self._executor.ativo:
+            self._executor.parar(imediato=False)
+
+    def executar_em_fluxo(self, program, janela=JANELA_PADRAO, repetir=False, timeout=1.0):
+        """
+        Executa o programa (qualquer número de passos) mantendo só `janela` passos
+        no firmware e completando a fila conforme os #STEP:n# chegam.
+        Retorna {"passos", "janela", "otimizacao"}; o resto roda em segundo plano.
+        """
+        if isinstance(program, str):
+            program = json.loads(program)
+
+        plano, _ = self.compilar(program)
+        if self._executor is None:
+            self._executor = ExecutorSequencia(self._ser, MAX_STEPS)
+        self.invalidar_sequencia()
+        self._executor.executar(plano.linhas, janela, repetir, timeout)
+        self._origem_fluxo = plano.origem
+        return {"passos": len(plano.linhas), "janela": janela, "otimizacao": dict(plano.relatorio)}
+
+    def simular(self, ids, otimizar=None, inicio=None):
+        """
+        Tempo de ciclo previsto de programas salvos, sem o braço (simulator.py),
+        todos numa simulação só. inicio=None: braço no fim do último movimento (loop).
+        Retorna [{"id", "total_ms", "passos", "tempos_ms", "origem"}], na ordem de ids.
+        """
+        from simulator import simular_lote
+        otimizar = self.otimizar if otimizar is None else otimizar
+        # direto do banco/cache: o programa aberto na tela (self.points) não muda
+        programas = [self._obter_programa(id) for id in ids]
+
+        irs = []
+        for id, program in zip(ids, programas):
+            if not isinstance(program, dict):
+                raise ValueError(f"Programa {id} não encontrado")
+            irs.append(compilar_programa(program, otimizar, self.tolerancia)[0])
+
+        r = simular_lote(irs, inicio)
+        return [
+            {
+                "id": id,
+                "total_ms": round(float(r.total[i]), 1),
+                "passos": int(r.passos[i]),
+                "tempos_ms": r.tempos[i, :r.passos[i]].round(1).tolist(),
+                "origem": [inst.origem for inst in irs[i]],
+            }
+            for i, id in enumerate(ids)
+        ]
+
+    def parar_fluxo(self, imediato=True):
+        if self._executor is not None:
+            self._executor.parar(imediato)
+
+    def fluxo_stats(self):
+        return self._executor.stats() if self._executor is not None else {"ativo": False}
+
+    def plan_stats(self):
+        return self._planos.stats()
+
 
     # ============================================================
     # === FUNÇÕES DO ROBÔ ========================================
     # ============================================================
 
     def add_point(self, pos=None):
-        self.points.append(self.joint_pos[:] if pos is None else pos)
+        self.points.append(self.joint_pos if pos is None else pos)
 
     def delete_point(self, i):
         if 0 <= i < len(self.points):
             self.points.pop(i)
 
+    def preview_points(self, points=None, z_min=0.0):
+        """
+        Pose da ferramenta de todos os pontos (FK vetorizada, uma chamada só).
+        Retorna {"poses": [[x, y, z, yaw, pitch, roll], ...], "validos": [bool, ...]}.
+        """
+        points = self.points if points is None else points
+        if not points:
+            return {"poses": [], "validos": []}
+        poses = self.modelo.poses(points)
+        validos = self.modelo.validar(points, z_min)
+        return {"poses": poses.round(2).tolist(), "validos": validos.tolist()}
+
+    def ik(self, alvos, semente=None):
+        """
+        Ângulos de servo para as poses [x, y, z, pitch, roll] (uma ou N, pitch/roll
+        None = livre). Parte da posição atual (joint_pos), ou de `semente`.
+        Retorna {"angulos": [[...5], ...], "erro": [mm, ...], "ok": [bool, ...]}.
+        """
+        alvos = [[float('nan') if v is None else v for v in alvo]
+                 for alvo in ([alvos] if not isinstance(alvos[0], (list, tuple)) else alvos)]
+        semente = self.joint_pos if semente is None else semente
+        angulos, erro, ok = self._ik.resolver(alvos, semente)
+        return {"angulos": angulos.round(2).tolist(), "erro": erro.round(3).tolist(), "ok": ok.tolist()}
+
+    def planejar_linear(self, inicio, fim, velocidade=100.0, aceleracao=400.0, perfil=None):
+        """Trajetória em linha reta entre os pontos salvos `inicio` e `fim` (índices); perfil None = trapezoidal."""
+        from trajectory import planejar_linear, PERFIL_TRAPEZOIDAL
+        return planejar_linear(self.points[inicio], self.points[fim], velocidade, aceleracao,
+                               perfil or PERFIL_TRAPEZOIDAL, solver=self._ik)
+
+    def mover_linear(self, inicio, fim, velocidade=100.0, aceleracao=400.0, perfil=None):
+        """
+        Planeja a reta inteira e só então começa a enviar as amostras (M:M) em taxa fixa.
+        Retorna {"amostras", "duracao_s", "erro_max_mm"}; o envio segue em segundo plano.
+        A primeira amostra sai na velocidade máxima: se o braço (joint_pos) não
+        estiver no ponto `inicio`, gera ValueError em vez de saltar até ele.
+        """
+        desvio = max(abs(a - b) for a, b in zip(self.joint_pos, self.points[inicio]))
+        if desvio > TOLERANCIA_INICIO_GRAUS:
+            raise ValueError(f"o braço está a {desvio:.0f}° do ponto {inicio}; leve-o até o ponto antes da reta")
+        trajetoria = self.planejar_linear(inicio, fim, velocidade, aceleracao, perfil)
+        self._streamer.executar(trajetoria)
+        return {
+            "amostras": len(trajetoria.tempos),
+            "duracao_s": round(trajetoria.duracao, 3),
+            "erro_max_mm": round(float(trajetoria.erro.max()), 3),
+        }
+
+    def parar_trajetoria(self):
+        self._streamer.parar()
+
+    def trajetoria_stats(self):
+        return self._streamer.stats()
+
+    def start_jog(self, joint, step):
+        """Jog contínuo da junta (1-6), `step` graus por passo, até stop_jog() ou o homem-morto."""
+        return self._jog.iniciar(joint, step)
+
+    def manter_jog(self):
+        return self._jog.manter()
+
+    def stop_jog(self):
+        self._jog.parar()
+
+    def jog_stats(self):
+        return self._jog.stats()
+
+    def cache_stats(self):
+        return self._cache.stats()
+
     def set_points(self, points):
         self.points, points
 
     def clear_point(self):
         self.points.clear()
 
+    @property
+    def joint_pos(self):
+        """Cópia coerente das 5 juntas (lista, como antes)."""
+        return self._juntas.posicoes()
+
+    @joint_pos.setter
+    def joint_pos(self, posicoes):
+        self._juntas.atualizar_todas(posicoes)
+
     def get_joint_pos(self, j):
-        return self.joint_pos[j]
+        return self._juntas.posicao(j)
 
     def set_joint_pos(self, j, p):
-        self.joint_pos[j] = p
+        self._juntas.atualizar(j, p)
+
+    def joint_state(self, validade=None):
+        """Posições com idade (ms) e número de sequência; `velhas` = juntas sem feedback recente."""
+        leitura = self._juntas.ler()
+        validade = self._juntas.validade if validade is None else validade
+        return {
+            "pos": list(leitura.pos),
+            "idade_ms": [None if i is None else round(i * 1000, 1) for i in leitura.idades()],
+            "numeros": list(leitura.numeros),
+            "seq": leitura.seq,
+            "velhas": leitura.velhas(validade),
+        }
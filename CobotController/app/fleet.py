@@ -0,0 +1,207 @@
+# fleet.py
+"""
+Vários braços no mesmo processo: um SerialManager + Cobot por porta.
+
+- Leitura: no modo seletor (POSIX) uma única thread espera em todas as portas
+  com selectors e chama ler_disponivel() de quem tem dados; no modo threads
+  cada porta tem sua thread de leitura (como no app de um braço só).
+- Os Cobots compartilham modelo, IK, banco de programas e caches (Cobot(base=...)).
+- BarramentoTelemetria: toda mensagem de todas as portas (JointPos, Step,
+  SavePos) vai para os inscritos junto com a porta de origem.
+- iniciar_sincronizado(): todos os S:C:R saem no mesmo laço, depois que as
+  sequências já estão gravadas, para os braços começarem juntos.
+"""
+import os
+import selectors
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from serial_comm import SerialManager, JointPos, Step, SavePos, LEITURA_EVENTOS, LEITURA_EXTERNA
+from controllers import Cobot
+
+MODO_SELETOR = "seletor"    # uma thread para todas as portas (só POSIX)
+MODO_THREADS = "threads"    # uma thread de leitura por porta
+
+
+class BarramentoTelemetria:
+    """Tipo de mensagem -> callbacks(porta, msg), para as mensagens de todos os braços."""
+    def __init__(self):
+        self._rotas = {}
+        self.contagem = {}
+
+    def inscrever(self, tipo, callback):
+        # tupla imutável: publicar() roda nas threads de leitura sem lock
+        self._rotas[tipo] = self._rotas.get(tipo, ()) + (callback,)
+
+    def publicar(self, porta, msg):
+        tipo = type(msg)
+        self.contagem[tipo.__name__] = self.contagem.get(tipo.__name__, 0) + 1
+        for f in self._rotas.get(tipo, ()):
+            try:
+                f(porta, msg)
+            except Exception as e:
+                print("Erro no listener da frota:", e)
+
+
+class MultiplexadorSerial:
+    """Uma thread e um selector para as portas em modo LEITURA_EXTERNA."""
+    def __init__(self):
+        self._seletor = selectors.DefaultSelector()
+        self._acordar_r, self._acordar_w = os.pipe()
+        self._seletor.register(self._acordar_r, selectors.EVENT_READ, None)
+        self._lock = threading.Lock()
+        self._rodando = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def adicionar(self, ser: SerialManager):
+        with self._lock:
+            self._seletor.register(ser.fileno(), selectors.EVENT_READ, ser)
+        os.write(self._acordar_w, b"x")
+
+    def remover(self, ser: SerialManager):
+        with self._lock:
+            try:
+                self._seletor.unregister(ser.fileno())
+            except (KeyError, ValueError, OSError):
+                pass
+        os.write(self._acordar_w, b"x")
+
+    def _loop(self):
+        while self._rodando:
+            for chave, _ in self._seletor.select(timeout=1.0):
+                ser = chave.data
+                if ser is None:
+                    os.read(self._acordar_r, 512)   # só para o select ver as portas novas
+                elif not ser.ler_disponivel():
+                    with self._lock:
+                        try:
+                            self._seletor.unregister(chave.fd)
+                        except (KeyError, ValueError):
+                            pass
+
+    def fechar(self):
+        self._rodando = False
+        os.write(self._acordar_w, b"x")
+        self._thread.join(timeout=2.0)
+        self._seletor.close()
+        os.close(self._acordar_r)
+        os.close(self._acordar_w)
+
+
+class Frota:
+    def __init__(self, saves_path='app/saves', modo=None):
+        self.modo = modo or (MODO_SELETOR if os.name == "posix" else MODO_THREADS)
+        self.barramento = BarramentoTelemetria()
+        self._saves_path = saves_path
+        self._bracos = {}           # porta -> (SerialManager, Cobot)
+        self._base = None           # primeiro Cobot: dono do banco e dos caches compartilhados
+        self._lock = threading.Lock()
+        self._mux = MultiplexadorSerial() if self.modo == MODO_SELETOR else None
+
+    def __len__(self):
+        return len(self._bracos)
+
+    def __contains__(self, porta):
+        return porta in self._bracos
+
+    def __getitem__(self, porta) -> Cobot:
+        return self._bracos[porta][1]
+
+    @property
+    def portas(self):
+        return list(self._bracos)
+
+    # ============================================================
+    # === CONEXÃO ================================================
+    # ============================================================
+
+    def adicionar(self, porta, baudrate=115200):
+        """Conecta o braço da porta e devolve o Cobot dele."""
+        if porta in self._bracos:
+            return self._bracos[porta][1]
+        ser = SerialManager()
+        ser.conectar(porta, baudrate, modo_leitura=LEITURA_EXTERNA if self._mux else LEITURA_EVENTOS)
+
+        with self._lock:
+            if self._base is None:
+                cobot = self._base = Cobot(ser, self._saves_path)
+            else:
+                cobot = Cobot(ser, base=self._base)
+            self._bracos[porta] = (ser, cobot)
+
+        def posicao(msg):
+            if msg.joint < 5:
+                cobot.set_joint_pos(msg.joint, msg.pos)
+            self.barramento.publicar(porta, msg)
+
+        ser.subscribe(JointPos, posicao)
+        ser.subscribe(Step, lambda msg: self.barramento.publicar(porta, msg))
+        ser.subscribe(SavePos, lambda msg: self.barramento.publicar(porta, msg))
+        if self._mux:
+            self._mux.adicionar(ser)
+        return cobot
+
+    def adicionar_varias(self, portas, baudrate=115200):
+        """Conecta várias portas ao mesmo tempo (a abertura de cada uma espera o ESP32)."""
+        with ThreadPoolExecutor(max_workers=max(len(portas), 1)) as pool:
+            return dict(zip(portas, pool.map(lambda p: self.adicionar(p, baudrate), portas)))
+
+    def remover(self, porta):
+        ser, cobot = self._bracos.pop(porta)
+        cobot.stop_jog()
+        cobot.parar_fluxo()
+        if self._mux:
+            self._mux.remover(ser)
+        ser.desconectar()
+
+    def fechar(self):
+        for porta in list(self._bracos):
+            self.remover(porta)
+        if self._mux:
+            self._mux.fechar()
+            self._mux = None
+
+    # ============================================================
+    # === SEQUÊNCIAS =============================================
+    # ============================================================
+
+    def _selecionar(self, portas):
+        return list(self._bracos) if portas is None else list(portas)
+
+    def carregar(self, programas, portas=None):
+        """
+        Grava a sequência em cada braço, em paralelo. programas: um programa para
+        todos ou {porta: programa}. Retorna {porta: resultado do upload_sequence}.
+        """
+        portas = self._selecionar(portas)
+        por_porta = programas if isinstance(programas, dict) and "commands" not in programas else \
+            {p: programas for p in portas}
+        with ThreadPoolExecutor(max_workers=max(len(portas), 1)) as pool:
+            futuros = {p: pool.submit(self[p].upload_sequence, por_porta[p]) for p in portas}
+            return {p: f.result() for p, f in futuros.items()}
+
+    def iniciar_sincronizado(self, portas=None):
+        """
+        Dá o S:C:R em todos os braços no mesmo laço (sequências já gravadas).
+        Retorna a defasagem entre o primeiro e o último envio.
+        """
+        sers = [self._bracos[p][0] for p in self._selecionar(portas)]
+        horarios = []
+        for ser in sers:
+            ser.enviar("S:C:R")
+            horarios.append(perf_counter())
+        return {"bracos": len(sers), "defasagem_us": round((horarios[-1] - horarios[0]) * 1e6, 1) if sers else 0.0}
+
+    def parar(self, portas=None):
+        for p in self._selecionar(portas):
+            self._bracos[p][0].enviar("S:C:P")
+
+    def stats(self):
+        return {
+            "modo": self.modo,
+            "bracos": len(self._bracos),
+            "threads": threading.active_count(),
+            "mensagens": dict(self.barramento.contagem),
+        }
@@ -0,0 +1,246 @@
+# framing.py
+"""
+Protocolo binário opcional (negociado com P:B no conectar; ver Cobot.ino).
+
+Quadro:  A5 5A | len | seq | tipo | payload (len bytes) | crc16 (LE)
+- len: tamanho do payload; seq: contador de 8 bits de quem envia (buracos = quadros perdidos);
+- crc16: CRC-16/CCITT-FALSE (poly 0x1021, início 0xFFFF) de len, seq, tipo e payload;
+- ângulos em int16 little-endian.
+
+No modo binário o fio continua misto: telemetria (#Jn#), passos (#STEP#),
+#SAVEPOS# e os movimentos M:M / M:MS vão em quadros; o resto (eco, log, DONE,
+confirmações da sequência) continua em linhas de texto. Texto nunca contém o
+byte A5, então o decodificador separa os dois sem ambiguidade.
+"""
+import struct
+from binascii import crc_hqx
+from typing import NamedTuple
+
+from serial_comm import JointPos, Step, SAVEPOS
+
+SYNC = b"\xa5\x5a"
+CABECALHO = 5                   # sync(2) + len + seq + tipo
+TAMANHO_MAX_PAYLOAD = 32
+TAMANHO_MAX_LINHA = 4096
+TAMANHO_MAX_CACHE = 4096        # pares (junta, ângulo) guardados pelo decodificador
+
+# host -> firmware
+QUADRO_MOVER = 0x01             # vel(u8) + ângulos(int16 * n)  = M:M
+QUADRO_MOVER_SUAVE = 0x02       # idem                           = M:MS
+# firmware -> host
+QUADRO_JUNTA = 0x81             # junta(u8, 1-6) + ângulo(int16) = #Jn:angle#
+QUADRO_JUNTAS = 0x82            # ângulos(int16 * 6)             = resposta do M:P
+QUADRO_STEP = 0x83              # passo(uint32)                  = #STEP:n#
+QUADRO_SAVEPOS = 0x84           # vazio                          = #SAVEPOS#
+QUADRO_STEP_EVENTO = 0x85       # evento(u8)                     = #STEP:INIT/END/UNDERRUN#
+
+# o número do passo (contador de 32 bits no modo fluxo) não reserva valores para os eventos
+EVENTOS_STEP = ("init", "end", "underrun")
+
+_U32 = struct.Struct("<I")
+_JUNTA = struct.Struct("<Bh")
+_CRC = struct.Struct("<H")
+_QUADRO_JUNTA = struct.Struct("<HBBBBhH")    # quadro de junta inteiro, lido de uma vez
+_SYNC_LE = 0x5AA5
+
+
+class Mover(NamedTuple):
+    """Quadro de movimento (M:M / M:MS) recebido pelo firmware (usado pelo emulador)."""
+    suave: bool
+    vel: int
+    angulos: tuple
+
+
+def crc16(dados, inicial=0xFFFF):
+    return crc_hqx(dados, inicial)
+
+
+def quadro(tipo, payload, seq):
+    corpo = bytes((len(payload), seq & 0xFF, tipo)) + payload
+    return SYNC + corpo + _CRC.pack(crc16(corpo))
+
+
+# ============================================================
+# === CODIFICAÇÃO ============================================
+# ============================================================
+
+def codificar_comando(msg: str, seq):
+    """
+    Quadro equivalente ao comando de texto, ou None se ele continua em texto.
+    Só M:M / M:MS (o grosso do tráfego de trajetórias) têm quadro próprio.
+    """
+    if not msg.startswith(("M:M:", "M:MS:")):
+        return None
+    partes = msg.split(":", 3)
+    if len(partes) != 4:
+        return None
+    try:
+        vel = int(partes[2])
+        angulos = [int(a) for a in partes[3].strip("#").split(";") if a]
+    except ValueError:
+        return None
+    if not 0 <= vel <= 255 or not angulos or len(angulos) > 6:
+        return None
+    tipo = QUADRO_MOVER if partes[1] == "M" else QUADRO_MOVER_SUAVE
+    return quadro(tipo, struct.pack(f"<B{len(angulos)}h", vel, *angulos), seq)
+
+
+def quadro_junta(junta, angulo, seq):
+    return quadro(QUADRO_JUNTA, _JUNTA.pack(junta, angulo), seq)
+
+
+def quadro_juntas(angulos, seq):
+    return quadro(QUADRO_JUNTAS, struct.pack(f"<{len(angulos)}h", *angulos), seq)
+
+
+def quadro_step(step, seq):
+    """step: número do passo, ou "init" / "end" / "underrun"."""
+    if isinstance(step, str):
+        return quadro(QUADRO_STEP_EVENTO, bytes((EVENTOS_STEP.index(step),)), seq)
+    return quadro(QUADRO_STEP, _U32.pack(step), seq)
+
+
+def quadro_savepos(seq):
+    return quadro(QUADRO_SAVEPOS, b"", seq)
+
+
+def texto_da_mensagem(msg):
+    """Linha de texto equivalente (para o log e para quem espera respostas em texto)."""
+    if type(msg) is JointPos:
+        return f"#J{msg.joint + 1}:{msg.pos}#"
+    if type(msg) is Step:
+        return f"#STEP:{msg.step.upper() if not msg.step.isdigit() else msg.step}#"
+    if type(msg) is Mover:
+        return f"M:{'MS' if msg.suave else 'M'}:{msg.vel}:#{';'.join(map(str, msg.angulos))}#"
+    return "#SAVEPOS#"
+
+
+# ============================================================
+# === DECODIFICAÇÃO ==========================================
+# ============================================================
+
+class DecodificadorQuadros:
+    """
+    Separa o fluxo misto em linhas de texto e quadros. Os campos são lidos com
+    struct.unpack_from direto no buffer, o CRC é calculado sobre um memoryview
+    (sem fatiar cópias) e o buffer só é compactado uma vez por bloco recebido.
+    alimentar(bytes) -> [(linha, msg)]: msg é None para texto; para quadros, a
+    mensagem tipada (JointPos, Step, SavePos, Mover) e linha é o texto equivalente.
+
+    O quadro de junta (a telemetria, quase todo o tráfego) tem caminho próprio:
+    um único unpack_from e o par (linha, JointPos) reaproveitado por ângulo.
+    """
+    def __init__(self, tamanho_max_linha=TAMANHO_MAX_LINHA):
+        self._buf = bytearray()
+        self._tamanho_max_linha = tamanho_max_linha
+        self._seq_esperado = None
+        self._juntas = {}           # (junta, ângulo) -> (linha, JointPos)
+        self.quadros = 0
+        self.erros_crc = 0
+        self.perdidos = 0           # pelos buracos no seq
+
+    def limpar(self):
+        self._buf.clear()
+        self._seq_esperado = None
+
+    def alimentar(self, data):
+        buf = self._buf
+        buf += data
+        saida = []
+        anexar = saida.append
+        juntas = self._juntas
+        pos, fim = 0, len(buf)
+        mv = memoryview(buf)
+        try:
+            while pos < fim:
+                if buf[pos] == 0xA5:
+                    if fim - pos >= 10:
+                        sync, n, seq, tipo, junta, angulo, crc = _QUADRO_JUNTA.unpack_from(buf, pos)
+                        if sync == _SYNC_LE and n == 3 and tipo == QUADRO_JUNTA and \
+                                crc_hqx(mv[pos + 2:pos + 8], 0xFFFF) == crc:
+                            if seq != self._seq_esperado:
+                                self._contar_buraco(seq)
+                            self._seq_esperado = (seq + 1) & 0xFF
+                            self.quadros += 1
+                            item = juntas.get((junta, angulo))
+                            if item is None:
+                                if len(juntas) >= TAMANHO_MAX_CACHE:
+                                    juntas.clear()
+                                msg = JointPos(junta - 1, angulo)
+                                item = juntas[(junta, angulo)] = (texto_da_mensagem(msg), msg)
+                            anexar(item)
+                            pos += 10
+                            continue
+                    pos = self._quadro_generico(buf, mv, pos, fim, saida)
+                    if pos < 0:
+                        pos = -pos - 1      # quadro incompleto: espera o resto
+                        break
+                    continue
+
+                nl = buf.find(b"\n", pos)
+                a5 = buf.find(b"\xa5", pos, nl if nl != -1 else fim)
+                if a5 != -1:
+                    # quadro no meio de uma linha incompleta: o texto antes dele é descartado
+                    pos = a5
+                    continue
+                if nl == -1:
+                    if fim - pos > self._tamanho_max_linha:
+                        pos = fim
+                    break
+                linha = buf[pos:nl].decode(errors="ignore").strip("\r")
+                if linha:
+                    anexar((linha, None))
+                pos = nl + 1
+        finally:
+            mv.release()            # o bytearray não redimensiona com memoryview aberto
+        del buf[:pos]
+        return saida
+
+    def _quadro_generico(self, buf, mv, pos, fim, saida):
+        """Quadro em pos (qualquer tipo). Retorna a próxima posição, ou -(pos + 1) se incompleto."""
+        if fim - pos < CABECALHO:
+            return -pos - 1
+        n = buf[pos + 2]
+        if buf[pos + 1] != 0x5A or n > TAMANHO_MAX_PAYLOAD:
+            return pos + 1              # não é início de quadro: ressincroniza
+        total = CABECALHO + n + 2
+        if fim - pos < total:
+            return -pos - 1
+        if crc_hqx(mv[pos + 2:pos + CABECALHO + n], 0xFFFF) != _CRC.unpack_from(buf, pos + CABECALHO + n)[0]:
+            self.erros_crc += 1
+            return pos + 1
+        for msg in self._interpretar(buf, pos, n):
+            saida.append((texto_da_mensagem(msg), msg))
+        return pos + total
+
+    def _contar_buraco(self, seq):
+        if self._seq_esperado is not None:
+            self.perdidos += (seq - self._seq_esperado) & 0xFF
+
+    def _interpretar(self, buf, pos, n):
+        seq, tipo = buf[pos + 3], buf[pos + 4]
+        if seq != self._seq_esperado:
+            self._contar_buraco(seq)
+        self._seq_esperado = (seq + 1) & 0xFF
+        self.quadros += 1
+
+        p = pos + CABECALHO
+        if tipo == QUADRO_JUNTA and n == 3:
+            junta, angulo = _JUNTA.unpack_from(buf, p)
+            return (JointPos(junta - 1, angulo),)
+        if tipo == QUADRO_STEP and n == 4:
+            return (Step(str(_U32.unpack_from(buf, p)[0])),)
+        if tipo == QUADRO_STEP_EVENTO and n == 1 and buf[p] < len(EVENTOS_STEP):
+            return (Step(EVENTOS_STEP[buf[p]]),)
+        if tipo == QUADRO_SAVEPOS:
+            return (SAVEPOS,)
+        if tipo == QUADRO_JUNTAS:
+            # uma JointPos por junta, como as 6 linhas do M:P em texto
+            return [JointPos(j, a) for j, a in enumerate(struct.unpack_from(f"<{n // 2}h", buf, p))]
+        if tipo in (QUADRO_MOVER, QUADRO_MOVER_SUAVE) and n >= 1:
+            angulos = struct.unpack_from(f"<{(n - 1) // 2}h", buf, p + 1)
+            return (Mover(tipo == QUADRO_MOVER_SUAVE, buf[p], angulos),)
+        return ()
+
+    def stats(self):
+        return {"quadros": self.quadros, "erros_crc": self.erros_crc, "perdidos": self.perdidos}
@@ -0,0 +1,170 @@
+# inverse_kinematics.py
+"""
+Cinemática inversa (IK) do braço de 5 juntas, em lote.
+
+O alvo de cada pose é [x, y, z, pitch, roll] (mm e graus, mesmas definições de
+ModeloBraco.poses). pitch/roll = NaN significa "livre": mantém o da semente.
+
+1. Solução analítica (base + 2 elos planares + pulso), quando a tabela DH tem a
+   estrutura padrão do braço (ver DH_PADRAO). Das duas soluções de cotovelo fica
+   a que respeita os limites e está mais perto da semente.
+2. Mínimos quadrados amortecidos (DLS) com Jacobiano numérico, partindo da
+   semente (ex: Cobot.joint_pos), para as poses em que a analítica não serve.
+
+Os limites dos servos são respeitados nas duas etapas.
+"""
+import numpy as np
+
+from kinematics import ModeloBraco, NUM_JUNTAS
+
+ESCALA_ANGULO = 1.0   # mm de erro equivalentes a 1 grau de pitch/roll no DLS
+TOL_MM = 0.5          # erro máximo aceito (mm, com a escala acima para ângulos)
+
+
+class SolverIK:
+    def __init__(self, modelo: ModeloBraco = None, amortecimento=0.2, max_iter=80, tol=TOL_MM):
+        self.modelo = modelo or ModeloBraco()
+        self.amortecimento = amortecimento
+        self.max_iter = max_iter
+        self.tol = tol
+        self._analitica = self._estrutura_padrao(self.modelo.dh)
+
+    @staticmethod
+    def _estrutura_padrao(dh):
+        """A solução analítica vale para: base com alpha 90, 2 elos planares, pulso pitch + roll."""
+        a, alpha, d, theta0 = dh.T
+        return (
+            a[0] == 0 and alpha[0] == 90 and theta0[0] == 0
+            and np.all(alpha[1:3] == 0) and np.all(d[1:4] == 0) and np.all(theta0[1:3] == 0)
+            and a[3] == 0 and alpha[3] == 90 and theta0[3] == 90
+            and a[4] == 0 and alpha[4] == 0
+        )
+
+    # ============================================================
+    # === API ====================================================
+    # ============================================================
+
+    def resolver(self, alvos, semente):
+        """
+        alvos: (N, 5) ou (5,) [x, y, z, pitch, roll]; semente: (N, 5) ou (5,) em graus de servo.
+        Retorna (angulos (N, 5) em graus de servo, erro (N,), ok (N,)).
+        """
+        alvos = np.atleast_2d(np.asarray(alvos, dtype=float))
+        semente = np.broadcast_to(np.atleast_2d(np.asarray(semente, dtype=float)), (len(alvos), NUM_JUNTAS))
+
+        # orientação livre -> usa a da semente
+        pose_semente = self.modelo.poses(semente)
+        alvos = np.where(np.isnan(alvos), pose_semente[:, [0, 1, 2, 4, 5]], alvos)
+
+        if self._analitica:
+            angulos = self.analitica(alvos, semente)
+        else:
+            angulos = np.full_like(alvos, np.nan)
+
+        erro = self._erro(angulos, alvos)
+        refazer = ~(erro <= self.tol)  # inclui NaN (sem solução analítica)
+        if np.any(refazer):
+            angulos[refazer] = self.dls(alvos[refazer], semente[refazer])
+            erro[refazer] = self._erro(angulos[refazer], alvos[refazer])
+
+        ok = (erro <= self.tol) & self.modelo.dentro_limites(angulos)
+        return angulos, erro, ok
+
+    # ============================================================
+    # === SOLUÇÃO ANALÍTICA ======================================
+    # ============================================================
+
+    def analitica(self, alvos, semente):
+        """Solução fechada; NaN nas linhas sem solução dentro dos limites."""
+        dh = self.modelo.dh
+        d1, a2, a3, d5, theta05 = dh[0, 2], dh[1, 0], dh[2, 0], dh[4, 2], np.radians(dh[4, 3])
+
+        x, y, z = alvos[:, 0], alvos[:, 1], alvos[:, 2]
+        pitch, roll = np.radians(alvos[:, 3]), np.radians(alvos[:, 4])
+
+        melhor = np.full((len(alvos), NUM_JUNTAS), np.nan)
+        melhor_dist = np.full(len(alvos), np.inf)
+        # base virada para o alvo ou de costas (ombro inclinado para trás)
+        for q1 in (np.arctan2(y, x), np.arctan2(-y, -x)):
+            # centro do pulso no plano do braço: recua d5 ao longo do eixo da ferramenta
+            r = x * np.cos(q1) + y * np.sin(q1) - d5 * np.cos(pitch)
+            s = z + d5 * np.sin(pitch) - d1
+
+            cos_q3 = (r ** 2 + s ** 2 - a2 ** 2 - a3 ** 2) / (2 * a2 * a3)
+            alcancavel = np.abs(cos_q3) <= 1.0
+            base_q3 = np.arccos(np.clip(cos_q3, -1.0, 1.0))
+
+            for q3 in (base_q3, -base_q3):  # as duas soluções de cotovelo
+                q2 = np.arctan2(s, r) - np.arctan2(a3 * np.sin(q3), a2 + a3 * np.cos(q3))
+                q4 = -pitch - q2 - q3
+                q5 = roll - theta05
+                q = np.column_stack([q1, q2, q3, q4, q5])
+                q = (q + np.pi) % (2 * np.pi) - np.pi
+                servo = self.modelo.juntas_para_servo(q)
+
+                dist = np.abs(servo - semente).sum(axis=1)
+                usar = alcancavel & self.modelo.dentro_limites(servo) & (dist < melhor_dist)
+                melhor[usar] = servo[usar]
+                melhor_dist[usar] = dist[usar]
+        return melhor
+
+    # ============================================================
+    # === DLS (JACOBIANO) ========================================
+    # ============================================================
+
+    def _tarefa(self, angulos):
+        """[x, y, z, pitch, roll] com os ângulos em graus * ESCALA_ANGULO."""
+        p = self.modelo.poses(angulos)
+        return np.column_stack([p[:, :3], p[:, 4:] * ESCALA_ANGULO])
+
+    @staticmethod
+    def _diferenca(alvo, atual):
+        e = alvo - atual
+        # ângulos: menor diferença (-180, 180]
+        periodo = 360.0 * ESCALA_ANGULO
+        e[:, 3:] = (e[:, 3:] + periodo / 2) % periodo - periodo / 2
+        return e
+
+    def _erro(self, angulos, alvos):
+        erro = np.full(len(alvos), np.inf)
+        validos = ~np.isnan(angulos).any(axis=1)
+        if np.any(validos):
+            alvo = alvos[validos].copy()
+            alvo[:, 3:] *= ESCALA_ANGULO
+            erro[validos] = np.linalg.norm(self._diferenca(alvo, self._tarefa(angulos[validos])), axis=1)
+        return erro
+
+    def dls(self, alvos, semente, h=1e-3):
+        """Iteração de mínimos quadrados amortecidos a partir da semente (graus de servo)."""
+        alvo = alvos.copy()
+        alvo[:, 3:] *= ESCALA_ANGULO
+        q = np.clip(semente.copy(), self.modelo.limites[:, 0], self.modelo.limites[:, 1])
+        n = len(q)
+        lam2 = self.amortecimento ** 2
+        ativos = np.ones(n, dtype=bool)
+        eye = np.eye(NUM_JUNTAS)
+
+        for _ in range(self.max_iter):
+            idx = np.flatnonzero(ativos)
+            if idx.size == 0:
+                break
+            qa = q[idx]
+            f0 = self._tarefa(qa)
+            e = self._diferenca(alvo[idx], f0)
+            convergiu = np.linalg.norm(e, axis=1) <= self.tol * 0.1
+            ativos[idx[convergiu]] = False
+
+            # Jacobiano numérico de todas as poses com 5 FKs em lote: (M, 5 tarefa, 5 juntas)
+            pert = qa[:, None, :] + h * eye[None]
+            f1 = self._tarefa(pert.reshape(-1, NUM_JUNTAS)).reshape(len(idx), NUM_JUNTAS, NUM_JUNTAS)
+            J = (self._diferenca(f1.reshape(-1, NUM_JUNTAS), np.repeat(f0, NUM_JUNTAS, axis=0))
+                 .reshape(len(idx), NUM_JUNTAS, NUM_JUNTAS) / h).transpose(0, 2, 1)
+
+            # dq = J^T (J J^T + lambda^2 I)^-1 e
+            JJt = J @ J.transpose(0, 2, 1) + lam2 * eye
+            dq = (J.transpose(0, 2, 1) @ np.linalg.solve(JJt, e[..., None]))[..., 0]
+            dq = np.clip(dq, -15.0, 15.0)  # passo máximo por iteração (graus)
+
+            novo = np.clip(qa + dq, self.modelo.limites[:, 0], self.modelo.limites[:, 1])
+            q[idx[~convergiu]] = novo[~convergiu]
+        return q
@@ -0,0 +1,162 @@
+# jog.py
+"""
+Jog contínuo das juntas (botões + / - da tela mantidos pressionados).
+
+A tela reenviava J<n>:S:<passo> a cada 30 ms por setInterval: cada envio era
+uma ida e volta pela ponte do pywebview e o ritmo dependia do timer do
+navegador. Aqui os passos saem de uma thread com horário absoluto:
+- o primeiro passo sai na hora; depois de ATRASO_REPETICAO, um a cada PERIODO;
+- se a thread atrasar, os passos perdidos vão num comando só (J1:S:3 em vez de
+  três J1:S:1) e passos que não movem nada (junta no limite) não são enviados;
+- homem-morto: sem iniciar()/manter() por HOMEM_MORTO segundos o jog para
+  sozinho (ex: o mouseup se perdeu ou a tela travou).
+"""
+import threading
+from time import perf_counter
+
+PERIODO = 0.03              # s entre passos (o mesmo ritmo do setInterval antigo)
+ATRASO_REPETICAO = 0.2      # s entre o primeiro passo e a repetição
+HOMEM_MORTO = 0.5           # s sem sinal da tela até parar
+PASSO_MAX = 127             # Servo::step(int8_t)
+LIMITES = {1: (0, 180), 2: (0, 180), 3: (0, 180), 4: (0, 180), 5: (0, 180), 6: (26, 110)}
+
+
+class JogController:
+    """
+    posicao(junta) -> último ângulo conhecido da junta (1-6) ou None; usado só
+    para não mandar passos contra o limite.
+    """
+    def __init__(self, ser, posicao=None, periodo=PERIODO, atraso=ATRASO_REPETICAO, homem_morto=HOMEM_MORTO):
+        self._ser = ser
+        self._posicao = posicao
+        self.periodo = periodo
+        self.atraso = atraso
+        self.homem_morto = homem_morto
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._junta = None
+        self._passo = 0
+        self._versao = 0            # muda a cada iniciar/parar: o laço recomeça o horário
+        self._ultimo_sinal = 0.0
+
+        self.enviados = 0
+        self.colapsados = 0         # passos que foram juntos num comando só
+        self.ignorados = 0          # passos contra o limite
+        self.paradas_homem_morto = 0
+        self.atraso_max_ms = 0.0
+
+    @property
+    def ativo(self):
+        return self._junta is not None
+
+    def iniciar(self, junta, passo):
+        """Começa (ou mantém) o jog da junta. False se já era esse o jog (vale como manter())."""
+        junta, passo = int(junta), int(passo)
+        if junta not in LIMITES:
+            raise ValueError(f"Junta {junta} inválida")
+        if passo == 0:
+            raise ValueError("Passo deve ser diferente de zero")
+        passo = max(-PASSO_MAX, min(PASSO_MAX, passo))
+
+        with self._cond:
+            self._ultimo_sinal = perf_counter()
+            if (self._junta, self._passo) == (junta, passo):
+                return False
+            self._junta, self._passo = junta, passo
+            self._versao += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def manter(self):
+        """Sinal de vida da tela enquanto o botão está pressionado."""
+        with self._cond:
+            self._ultimo_sinal = perf_counter()
+            return self._junta is not None
+
+    def parar(self):
+        with self._cond:
+            if self._junta is None:
+                return
+            self._junta = None
+            self._versao += 1
+            self._cond.notify()
+
+    # ============================================================
+    # === LAÇO ===================================================
+    # ============================================================
+
+    def _devidos(self, t):
+        """Quantos passos deveriam ter saído `t` segundos depois do início."""
+        if t < self.atraso:
+            return 1
+        return 2 + int((t - self.atraso) / self.periodo)
+
+    def _instante(self, k):
+        """Horário (relativo ao início) do passo de índice k."""
+        return 0.0 if k == 0 else self.atraso + (k - 1) * self.periodo
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._junta is None:
+                    # ocioso: a thread fica viva e acorda no próximo iniciar()
+                    if not self._cond.wait(timeout=5.0) and self._junta is None:
+                        self._thread = None
+                        return
+                versao, junta, passo = self._versao, self._junta, self._passo
+            self._jog(versao, junta, passo)
+
+    def _jog(self, versao, junta, passo):
+        inicio = perf_counter()
+        feitos = 0
+        while True:
+            with self._cond:
+                if self._versao != versao:
+                    return
+                agora = perf_counter()
+                if agora - self._ultimo_sinal > self.homem_morto:
+                    self._junta = None
+                    self._versao += 1
+                    self.paradas_homem_morto += 1
+                    return
+                devidos = self._devidos(agora - inicio)
+                if devidos <= feitos:
+                    self._cond.wait(timeout=inicio + self._instante(feitos) - agora)
+                    continue
+
+            self.atraso_max_ms = max(self.atraso_max_ms, (agora - inicio - self._instante(devidos - 1)) * 1000)
+            n = devidos - feitos
+            feitos = devidos
+            self._enviar(junta, passo, n)
+
+    def _enviar(self, junta, passo, n):
+        delta = max(-PASSO_MAX, min(PASSO_MAX, passo * n))
+        if self._posicao is not None:
+            atual = self._posicao(junta)
+            minimo, maximo = LIMITES[junta]
+            if atual is not None and ((delta > 0 and atual >= maximo) or (delta < 0 and atual <= minimo)):
+                self.ignorados += n
+                return
+        try:
+            self._ser.enviar(f"J{junta}:S:{delta}")
+        except Exception as e:
+            print("Erro no jog:", e)
+            self.parar()
+            return
+        self.enviados += 1
+        self.colapsados += n - 1
+
+    def stats(self):
+        return {
+            "ativo": self.ativo,
+            "junta": self._junta,
+            "enviados": self.enviados,
+            "colapsados": self.colapsados,
+            "ignorados": self.ignorados,
+            "paradas_homem_morto": self.paradas_homem_morto,
+            "atraso_max_ms": round(self.atraso_max_ms, 3),
+        }
@@ -0,0 +1,97 @@
+# joint_state.py
+"""
+Posição das juntas compartilhada entre a thread de leitura serial (escreve a
+cada #Jn:angle#) e as threads do Api (leem em add_point, IK, jog...).
+
+Os valores ficam em arrays compactos (ângulo, horário e número de sequência de
+cada junta) protegidos por um seqlock: o escritor incrementa o contador antes
+e depois de escrever (ímpar = escrita em andamento); o leitor copia os arrays e
+repete se o contador mudou no meio. Ler nunca trava e nunca bloqueia a thread
+de leitura; a leitura sai sempre coerente (as 5 juntas do mesmo instante).
+
+Cada atualização leva o horário (perf_counter, monotônico) e o número de
+sequência global; com eles dá para saber se a realimentação está velha.
+O firmware só manda #Jn# quando a junta anda (ou em M:P): parado, o valor
+envelhece sem estar errado.
+"""
+import threading
+from array import array
+from time import perf_counter, sleep
+from typing import NamedTuple
+
+VALIDADE_S = 2.0        # idade a partir da qual a posição é considerada velha
+
+
+class LeituraJuntas(NamedTuple):
+    pos: tuple              # ângulos (graus)
+    tempos: tuple           # perf_counter da última atualização de cada junta (0 = nunca)
+    numeros: tuple          # número de sequência da última atualização de cada junta
+    seq: int                # total de atualizações até esta leitura
+
+    def idades(self, agora=None):
+        """Segundos desde a última atualização de cada junta (None = nunca atualizada)."""
+        agora = perf_counter() if agora is None else agora
+        return tuple(agora - t if t else None for t in self.tempos)
+
+    def velhas(self, validade=VALIDADE_S, agora=None):
+        """Índices das juntas sem atualização há mais de `validade` segundos (ou nunca)."""
+        return [j for j, idade in enumerate(self.idades(agora)) if idade is None or idade > validade]
+
+
+class EstadoJuntas:
+    def __init__(self, inicial, validade=VALIDADE_S):
+        n = len(inicial)
+        self._pos = array("h", inicial)
+        self._tempos = array("d", [0.0] * n)
+        self._numeros = array("Q", [0] * n)
+        self._contador = 0                      # seqlock: par = estável
+        self._lock_escrita = threading.Lock()   # só entre escritores; leitores não usam
+        self.validade = validade
+
+    def __len__(self):
+        return len(self._pos)
+
+    # --- Escrita ---
+    def atualizar(self, j, pos, tempo=None):
+        tempo = perf_counter() if tempo is None else tempo
+        with self._lock_escrita:
+            self._contador += 1
+            self._pos[j] = pos
+            self._tempos[j] = tempo
+            self._numeros[j] = self._contador // 2 + 1
+            self._contador += 1
+
+    def atualizar_todas(self, posicoes, tempo=None):
+        tempo = perf_counter() if tempo is None else tempo
+        with self._lock_escrita:
+            self._contador += 1
+            numero = self._contador // 2 + 1
+            for j, pos in enumerate(posicoes[:len(self._pos)]):
+                self._pos[j] = pos
+                self._tempos[j] = tempo
+                self._numeros[j] = numero
+            self._contador += 1
+
+    # --- Leitura (sem lock) ---
+    def ler(self) -> LeituraJuntas:
+        while True:
+            antes = self._contador
+            if antes & 1:
+                sleep(0)        # escritor no meio: solta o GIL para ele terminar
+                continue
+            pos, tempos, numeros = tuple(self._pos), tuple(self._tempos), tuple(self._numeros)
+            if self._contador == antes:
+                return LeituraJuntas(pos, tempos, numeros, antes // 2)
+
+    def posicao(self, j):
+        return self._pos[j]
+
+    def posicoes(self):
+        return list(self.ler().pos)
+
+    def velhas(self, validade=None):
+        return self.ler().velhas(self.validade if validade is None else validade)
+
+    @property
+    def seq(self):
+        return self._contador // 2
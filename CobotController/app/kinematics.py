@@ -0,0 +1,164 @@
+# kinematics.py
+"""
+Cinemática direta (FK) vetorizada do braço de 5 juntas.
+
+Os ângulos de entrada são os mesmos de Cobot.joint_pos / Cobot.points (graus de
+servo, 0 a 180). Cada servo é convertido para o ângulo da junta com
+    q = sinal * (servo - zero)
+e a pose da ferramenta sai da tabela de Denavit–Hartenberg (padrão):
+    T_i = Rot_z(theta0 + q) · Trans_z(d) · Trans_x(a) · Rot_x(alpha)
+
+Todas as funções aceitam um array (N, 5) e calculam as N poses de uma vez.
+
+As medidas padrão são de referência: meça o braço e passe as suas no ModeloBraco.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class DH(NamedTuple):
+    """Uma linha da tabela DH. Comprimentos em mm, ângulos em graus."""
+    a: float
+    alpha: float
+    d: float
+    theta0: float
+
+
+# J1 base (giro), J2 ombro, J3 cotovelo, J4 pulso (pitch), J5 pulso (roll)
+DH_PADRAO = (
+    DH(a=0.0,   alpha=90.0, d=70.0,  theta0=0.0),
+    DH(a=105.0, alpha=0.0,  d=0.0,   theta0=0.0),
+    DH(a=100.0, alpha=0.0,  d=0.0,   theta0=0.0),
+    DH(a=0.0,   alpha=90.0, d=0.0,   theta0=90.0),
+    DH(a=0.0,   alpha=0.0,  d=110.0, theta0=0.0),
+)
+
+ZERO_PADRAO = (90.0, 0.0, 180.0, 90.0, 90.0)    # ângulo de servo em que q = 0
+SINAL_PADRAO = (1.0, 1.0, 1.0, 1.0, 1.0)        # sentido de cada servo
+LIMITES_PADRAO = ((0, 180),) * 5                # limites de servo (min, max)
+
+NUM_JUNTAS = 5
+
+
+class ModeloBraco:
+    def __init__(self, dh=DH_PADRAO, zero=ZERO_PADRAO, sinal=SINAL_PADRAO, limites=LIMITES_PADRAO):
+        dh = np.asarray(dh, dtype=float)
+        if dh.shape != (NUM_JUNTAS, 4):
+            raise ValueError(f"Tabela DH precisa de {NUM_JUNTAS} linhas (a, alpha, d, theta0)")
+
+        self.dh = dh
+        self._a = dh[:, 0]
+        self._d = dh[:, 2]
+        self._cos_alpha = np.cos(np.radians(dh[:, 1]))
+        self._sin_alpha = np.sin(np.radians(dh[:, 1]))
+        self._theta0 = np.radians(dh[:, 3])
+
+        self.zero = np.asarray(zero, dtype=float)
+        self.sinal = np.asarray(sinal, dtype=float)
+        self.limites = np.asarray(limites, dtype=float)
+
+    # ============================================================
+    # === CONVERSÕES =============================================
+    # ============================================================
+
+    def servo_para_juntas(self, angulos):
+        """Graus de servo (N, 5) -> ângulos de junta em radianos (N, 5)."""
+        angulos = np.atleast_2d(np.asarray(angulos, dtype=float))
+        return np.radians(self.sinal * (angulos - self.zero))
+
+    def juntas_para_servo(self, q):
+        """Ângulos de junta em radianos (N, 5) -> graus de servo (N, 5)."""
+        q = np.atleast_2d(np.asarray(q, dtype=float))
+        return np.degrees(q) * self.sinal + self.zero
+
+    # ============================================================
+    # === CINEMÁTICA DIRETA ======================================
+    # ============================================================
+
+    def fk_juntas(self, q, todos=False):
+        """
+        FK a partir dos ângulos de junta (radianos, (N, 5)).
+        Retorna (N, 4, 4) com a pose da ferramenta, ou (N, 6, 4, 4) com a base
+        e a pose de cada elo se todos=True (útil para desenhar o braço).
+        """
+        q = np.atleast_2d(np.asarray(q, dtype=float))
+        n = q.shape[0]
+
+        theta = q + self._theta0
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa = self._cos_alpha, self._sin_alpha
+
+        # matrizes DH das 5 juntas para as N poses: (N, 5, 4, 4)
+        A = np.zeros((n, NUM_JUNTAS, 4, 4))
+        A[..., 0, 0] = ct
+        A[..., 0, 1] = -st * ca
+        A[..., 0, 2] = st * sa
+        A[..., 0, 3] = self._a * ct
+        A[..., 1, 0] = st
+        A[..., 1, 1] = ct * ca
+        A[..., 1, 2] = -ct * sa
+        A[..., 1, 3] = self._a * st
+        A[..., 2, 1] = sa
+        A[..., 2, 2] = ca
+        A[..., 2, 3] = self._d
+        A[..., 3, 3] = 1.0
+
+        T = np.broadcast_to(np.eye(4), (n, 4, 4))
+        if not todos:
+            for i in range(NUM_JUNTAS):
+                T = T @ A[:, i]
+            return T
+
+        elos = [T]
+        for i in range(NUM_JUNTAS):
+            T = T @ A[:, i]
+            elos.append(T)
+        return np.stack(elos, axis=1)
+
+    def fk(self, angulos, todos=False):
+        """FK a partir dos graus de servo ((N, 5) ou (5,)). Ver fk_juntas."""
+        return self.fk_juntas(self.servo_para_juntas(angulos), todos)
+
+    def posicoes(self, angulos):
+        """Posição (x, y, z) da ferramenta em mm para cada pose: (N, 3)."""
+        return self.fk(angulos)[:, :3, 3]
+
+    def poses(self, angulos):
+        """
+        (N, 6): x, y, z em mm e a orientação da ferramenta em graus:
+        - yaw: direção do plano do braço (giro da base);
+        - pitch: inclinação da ferramenta abaixo da horizontal (90 = apontando para baixo);
+        - roll: giro da ferramenta em torno do próprio eixo (junta 5).
+        Definidos a partir dos frames dos elos, sem singularidade com a ferramenta na vertical.
+        """
+        elos = self.fk(angulos, todos=True)
+        x1 = elos[:, 1, :3, 0]          # direção radial do plano do braço
+        x4, y4 = elos[:, 4, :3, 0], elos[:, 4, :3, 1]
+        T = elos[:, -1]
+        x5, z5 = T[:, :3, 0], T[:, :3, 2]
+
+        yaw = np.degrees(np.arctan2(x1[:, 1], x1[:, 0]))
+        horizontal = np.einsum("ij,ij->i", z5, x1)
+        pitch = np.degrees(np.arctan2(-z5[:, 2], horizontal))
+        roll = np.degrees(np.arctan2(np.einsum("ij,ij->i", x5, y4), np.einsum("ij,ij->i", x5, x4)))
+        return np.column_stack([T[:, :3, 3], yaw, pitch, roll])
+
+    # ============================================================
+    # === VALIDAÇÃO ==============================================
+    # ============================================================
+
+    def dentro_limites(self, angulos):
+        """(N,) True se todos os servos da pose estão dentro dos limites."""
+        angulos = np.atleast_2d(np.asarray(angulos, dtype=float))
+        return np.all((angulos >= self.limites[:, 0]) & (angulos <= self.limites[:, 1]), axis=1)
+
+    def validar(self, angulos, z_min=0.0):
+        """
+        (N,) True se a pose respeita os limites dos servos e nenhuma junta
+        (cotovelo, pulso, ferramenta) fica abaixo de z_min (mesa).
+        """
+        angulos = np.atleast_2d(np.asarray(angulos, dtype=float))
+        elos = self.fk(angulos, todos=True)
+        acima = np.all(elos[:, 2:, 2, 3] >= z_min, axis=1)
+        return self.dentro_limites(angulos) & acima
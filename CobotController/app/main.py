@@ -1,192 +1,457 @@
+import sys
 import threading
 import time
 import json
-import webview 
-from serial_comm import SerialManager  # módulo para comunicação serial
-from controllers import Cobot
+import startup
+from serial_comm import SerialManager, JointPos, Step, SavePos  # módulo para comunicação serial
+from controllers import Cobot, MAX_STEPS
+from sequence_stream import JANELA_PADRAO
+from ui_channel import UiChannel, formatar_js, UI_HZ
+from port_watcher import PortWatcher
+from telemetry_recorder import GravadorTelemetria, CAPACIDADE_PADRAO
 from pathlib import Path
 
-# ======================
-# Inicialização do app
-# ======================
-def run_app():
-   base_dir = Path(__file__).parent
-   html_dir = base_dir / 'web'  
+window = None  # janela do pywebview, criada no run_app()
 
-   class Api ():
-      def __init__(self):
-         self._ser = SerialManager()
-         self.cobot = Cobot(self._ser)
 
-         self._ser.add_listener(self._log_serial)
-         self._ser.add_listener(self._monitorar_steps)
-         self._ser.add_listener(self._monitorar_savepos)
-         self._ser.add_listener(self._monitorar_jointpos)
+class Api ():
+   def __init__(self, ui_hz=UI_HZ, saves_path='app/saves', enviar_ui=None):
+      """enviar_ui: destino das chamadas da tela (padrão: evaluate_js do pywebview; headless: WebSocket)."""
+      self._ser = SerialManager()
+      self.cobot = Cobot(self._ser, saves_path)
 
-         self.ultima_lista = []
-         self.porta = None
-         self.conectado = False
+      # telemetria vai para a tela agrupada, no máximo ui_hz vezes por segundo
+      if enviar_ui is None:
+         enviar_ui = lambda chamadas: window.evaluate_js(formatar_js(chamadas))
+      self._ui = UiChannel(enviar_ui, hz=ui_hz)
+      self._ui.iniciar()
 
+      # log recebe todas as linhas; o resto só o tipo de mensagem que interessa
+      self._ser.add_listener(self._log_serial)
+      self._ser.subscribe(Step, self._monitorar_steps)
+      self._ser.subscribe(SavePos, self._monitorar_savepos)
+      self._ser.subscribe(JointPos, self._monitorar_jointpos)
 
-      def _resposta(self, sucesso, mensagem, dados={}):
-         return {
-            "sucesso": sucesso,
-            "mensagem": mensagem,
-            "dados": dados,
-            "timestamp": time.time()
-         }
-      
-      def _log_serial(self, data:str):
-        """Callback para exibir os dados recebidos no terminal."""
-        print(f"<<< {data}", end="\n", flush=True)
-      
-      def _monitorar_steps(self, string:str):
-         if "#STEP" in string:
-            step = dict([string.replace('#', '').lower().split(':')])
-            window.evaluate_js(f"setStep('{json.dumps(step)}')")
-            print(step)
-      
-      def _monitorar_savepos(self, string:str):
-         if "#SAVEPOS#" in string:
-            self.add_point()
-            window.evaluate_js('setPoints();')
-      
-      def _monitorar_jointpos(self, string:str):
-         if ("#J" in string):
-            joint, pos = string.replace('#', '').split(':')
-            joint = int(joint[1]) - 1
-            if (joint < 5):
-               pos = int(pos)
-               self.cobot.set_joint_pos(joint, pos)
-               window.evaluate_js(f"setJointPos({joint}, {pos})")
-
-      # ======================
-      # Monitoramento de portas
-      # ======================
-      def listar_portas(self):
-         """
-         Retorna a lista de dispositivos seriais conectados
-         para o frontend em formato de lista de dicionários.
-         """
-         try:
-            lista = self._ser.listar_portas()
-            return self._resposta(True, "Lista obtida com sucesso", lista)
-         except Exception as e:
-            return self._resposta(False, f"Erro ao listar portas: {str(e)}")
-      
-      def testar_comunicacao(self):
-         try:
-            resp = self._ser.testar_comunicacao()
-            return self._resposta(resp, "Comunicação OK" if resp else "Não foi possível comunicar com a porta")
-         except Exception as e:
-            return self._resposta(False, f"Erro: {str(e)}")
-
-      def start_monitor(self, interval=1):
-         # lista = self._ser.listar_portas()
-         # print(json.dumps(lista))
-         # window.evaluate_js(f'console.log({json.dumps(lista)})')
-         def monitor():
-            while True:
-                lista = self._ser.listar_portas()
-                if lista != self.ultima_lista:
-                  self.ultima_lista = lista
-                  # converte para JSON e chama JS
-                  # print()
-                  js_code = f"carregarPortas({json.dumps(lista)}); testarConexao()"  # testarConexao()
-                  window.evaluate_js(f"{js_code}") # type: ignore
-                time.sleep(interval)  # ajusta intervalo conforme necessário
-
-         threading.Thread(target=monitor, daemon=True).start()
-         return self._resposta(True, "Monitoramento serial iniciado", {"interval": interval})
-
-      # ======================
-      # Conexão e desconexão
-      # ======================
-      def conectar(self, porta, baudrate=115200, timeout=0):
-         """Abre conexão serial"""
-         try:
-            self._ser.conectar(porta, baudrate, timeout)
-            self.conectado = True
-            self.porta = porta
-
-            # def ler_serial():
-            #    while True:
-            #          if self._ser.ser.in_waiting:
-            #             data = self._ser.ler()
-            #             if data:
-            #                print(f"\n<<< {data}", end="", flush=True)
-            #          time.sleep(0.01)
-
-            # threading.Thread(target=ler_serial, daemon=True).start()
-            self.enviar('M:P')
-            return self._resposta(True, f"Conectado à porta {porta} com {baudrate}bps")
-         except Exception as e:
-            self.conectado = False
-            return self._resposta(False, f"Falha ao conectar: {str(e)}")
-         
-      def desconectar(self):
-         """Fecha conexão serial"""
-         try:
-            self._ser.desconectar()
-            self.conectado = False
-            return self._resposta(True, f"Porta desconectada com sucesso")
-         except Exception as e:
-            return self._resposta(False, f"Falha ao desconectar: {str(e)}")
-         
-      # ======================
-      # Envio e leitura
-      # ======================
-      def enviar(self, msg: str):
-         """Envia comando ao dispositivo"""
-         if not self.conectado:
-            return self._resposta(False, f"Nenhuma porta conectada")
-               
-         try:
-            self._ser.enviar(msg)
-            return self._resposta(True, "Dado enviado com sucesso")
-         
-         except Exception as e:
-            return self._resposta(False, f"Erro ao enviar: {str(e)}")
+      # portas enumeradas só quando o sistema avisa que algo mudou
+      self._portas = PortWatcher(SerialManager.listar_portas)
+      self._portas.add_listener(self._portas_mudaram)
+
+      self.porta = None
+      self.conectado = False
+
+      self._saves_path = Path(saves_path)
+      self._gravador = None         # GravadorTelemetria ativo (iniciar_gravacao)
+      self._reproducao = None       # (thread, Event de parada) da reprodução
+
+
+   def _resposta(self, sucesso, mensagem, dados={}):
+      return {
+         "sucesso": sucesso,
+         "mensagem": mensagem,
+         "dados": dados,
+         "timestamp": time.time()
+      }
+   
+   def _log_serial(self, data:str):
+     """Callback para exibir os dados recebidos no terminal."""
+     # sem flush por linha: o terminal descarrega no '\n' e arquivo/pipe em blocos
+     sys.stdout.write(f"<<< {data}\n")
+   
+   def _monitorar_steps(self, msg: Step):
+      self._ui.set_step(self.cobot.step_original(msg.step))
+      print({"step": msg.step})
+   
+   def _monitorar_savepos(self, msg: SavePos):
+      self.add_point()
+      self._ui.chamar('setPoints')
+   
+   def _monitorar_jointpos(self, msg: JointPos):
+      if (msg.joint < 5):
+         self.cobot.set_joint_pos(msg.joint, msg.pos)
+         self._ui.set_joint_pos(msg.joint, msg.pos)
+
+   def estado_juntas(self):
+      """Posição das juntas com a idade do último feedback de cada uma."""
+      estado = self.cobot.joint_state()
+      return self._resposta(not estado["velhas"], "Estado das juntas", estado)
+
+   def partida_stats(self):
+      """Linha do tempo da partida (fases e ms desde o início do processo)."""
+      return self._resposta(True, "Linha do tempo da partida", startup.relatorio())
+
+   def ui_stats(self):
+      """Contadores do canal de interface (recebidas, mescladas, quadros...)."""
+      return self._resposta(True, "Estatísticas da interface", self._ui.stats())
+
+   # ======================
+   # Monitoramento de portas
+   # ======================
+   def listar_portas(self):
+      """
+      Retorna a lista de dispositivos seriais conectados
+      para o frontend em formato de lista de dicionários.
+      """
+      try:
+         # usa o cache do monitor quando ele já está rodando
+         lista = self._portas.listar() if self._portas.modo else self._ser.listar_portas()
+         return self._resposta(True, "Lista obtida com sucesso", lista)
+      except Exception as e:
+         return self._resposta(False, f"Erro ao listar portas: {str(e)}")
+   
+   def testar_comunicacao(self):
+      try:
+         resp = self._ser.testar_comunicacao(self._portas.nomes() if self._portas.modo else None)
+         return self._resposta(resp, "Comunicação OK" if resp else "Não foi possível comunicar com a porta")
+      except Exception as e:
+         return self._resposta(False, f"Erro: {str(e)}")
+
+   def start_monitor(self, interval=1):
+      """
+      Inicia o monitor de portas: eventos do sistema no Linux (netlink),
+      polling a cada `interval` segundos nos demais.
+      """
+      self._portas.intervalo = interval
+      modo = self._portas.iniciar()
+      self._ui.chamar("carregarPortas", self._portas.listar())
+      startup.marcar("interativo")   # primeira chamada da tela (pywebviewready)
+      return self._resposta(True, "Monitoramento serial iniciado", {"interval": interval, "modo": modo})
+
+   def _portas_mudaram(self, evento, porta):
+      print(f"Porta {'conectada' if evento == 'add' else 'removida'}: {porta['porta']}")
+      self._ui.chamar("carregarPortas", self._portas.listar())
+      self._ui.chamar("testarConexao")
+
+   # ======================
+   # Conexão e desconexão
+   # ======================
+   def conectar(self, porta, baudrate=115200, timeout=0):
+      """Abre conexão serial"""
+      try:
+         self.parar_reproducao()
+         self._ser.conectar(porta, baudrate, timeout)
+         self.cobot.invalidar_sequencia()
+         self.conectado = True
+         self.porta = porta
+
+         # def ler_serial():
+         #    while True:
+         #          if self._ser.ser.in_waiting:
+         #             data = self._ser.ler()
+         #             if data:
+         #                print(f"\n<<< {data}", end="", flush=True)
+         #          time.sleep(0.01)
+
+         # threading.Thread(target=ler_serial, daemon=True).start()
+         # as posições vêm da resposta ao M:P do _aguardar_firmware
+         espera = self._ser.espera_firmware
+         return self._resposta(True, f"Conectado à porta {porta} com {baudrate}bps",
+                               {"espera_firmware_ms": None if espera is None else round(espera * 1000, 1)})
+      except Exception as e:
+         self.conectado = False
+         return self._resposta(False, f"Falha ao conectar: {str(e)}")
       
-      def add_point(self, pos=None):
-         self.cobot.add_point(pos)
-         window.evaluate_js('setPoints();')
-         
-      def delete_point(self, i):
-         self.cobot.delete_point(i)
-         window.evaluate_js('setPoints();')
-
-      def get_points(self):
-         return self.cobot.points
+   def desconectar(self):
+      """Fecha conexão serial"""
+      try:
+         self.cobot.stop_jog()
+         self._ser.desconectar()
+         self.cobot.invalidar_sequencia()
+         self.conectado = False
+         return self._resposta(True, f"Porta desconectada com sucesso")
+      except Exception as e:
+         return self._resposta(False, f"Falha ao desconectar: {str(e)}")
       
-      def clear_points(self):
-         self.cobot.clear_point()
-         window.evaluate_js('setPoints();')
+   # ======================
+   # Gravação de telemetria
+   # ======================
+   def iniciar_gravacao(self, capacidade=CAPACIDADE_PADRAO):
+      """Grava #Jn#, #STEP# e #SAVEPOS# em saves/telemetria.bin (anel, continua a gravação anterior)."""
+      try:
+         if self._gravador is None:
+            self._gravador = GravadorTelemetria(self._saves_path / "telemetria.bin", capacidade)
+            self._gravador.anexar(self._ser)
+         return self._resposta(True, "Gravação de telemetria ativa", self._gravador.stats())
+      except Exception as e:
+         return self._resposta(False, f"Erro ao iniciar a gravação: {str(e)}")
+
+   def parar_gravacao(self):
+      if self._gravador is None:
+         return self._resposta(False, "Nenhuma gravação ativa")
+      stats = self._gravador.stats()
+      self._gravador.fechar()
+      self._gravador = None
+      return self._resposta(True, "Gravação de telemetria encerrada", stats)
+
+   def gravacao_stats(self):
+      if self._gravador is None:
+         return self._resposta(False, "Nenhuma gravação ativa")
+      return self._resposta(True, "Estatísticas da gravação", self._gravador.stats())
+
+   def reproduzir_gravacao(self, velocidade=1.0, ultimas=None):
+      """
+      Reproduz saves/telemetria.bin pelos mesmos listeners da porta (tela, log,
+      joint_pos), em segundo plano. Só com o robô desconectado. Os #SAVEPOS#
+      gravados ficam de fora: eles adicionariam pontos ao programa aberto.
+      """
+      if self.conectado:
+         return self._resposta(False, "Desconecte o robô antes de reproduzir uma gravação")
+      if self._gravador is not None:
+         return self._resposta(False, "Pare a gravação antes de reproduzir")
+      caminho = self._saves_path / "telemetria.bin"
+      if not caminho.exists():
+         return self._resposta(False, "Nenhuma gravação encontrada")
+      self.parar_reproducao()
+
+      parar = threading.Event()
+      def reproduzir():
+         with GravadorTelemetria(caminho) as gravacao:
+            print("Reprodução:", gravacao.reproduzir(self._ser, velocidade, ultimas, parar))
+
+      thread = threading.Thread(target=reproduzir, daemon=True)
+      self._reproducao = (thread, parar)
+      thread.start()
+      return self._resposta(True, "Reprodução iniciada")
+
+   def parar_reproducao(self):
+      if self._reproducao is not None:
+         thread, parar = self._reproducao
+         parar.set()
+         thread.join(timeout=1.0)
+         self._reproducao = None
+      return self._resposta(True, "Reprodução interrompida")
+
+   # ======================
+   # Envio e leitura
+   # ======================
+   def enviar(self, msg: str):
+      """Envia comando ao dispositivo"""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
+            
+      try:
+         # S:* manual altera a sequência gravada (S:C:* só controla a execução)
+         if (msg.startswith("S:") and not msg.startswith("S:C:")) or msg == "S:C:C":
+            self.cobot.invalidar_sequencia()
+         self._ser.enviar(msg)
+         return self._resposta(True, "Dado enviado com sucesso")
       
-      def save_program(self, name, dom, id=None):
-        return self.cobot.save_program(name, dom, id)
+      except Exception as e:
+         return self._resposta(False, f"Erro ao enviar: {str(e)}")
+   
+   def mover_cartesiano(self, x, y, z, pitch=None, roll=None, speed=50):
+      """Move a ferramenta até (x, y, z) em mm, com pitch/roll opcionais (graus), via IK."""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
+
+      try:
+         r = self.cobot.ik([x, y, z, pitch, roll])
+         if not r["ok"][0]:
+            return self._resposta(False, f"Pose fora do alcance (erro {r['erro'][0]} mm)", r)
 
-      def load_program(self, id):
-         return self.cobot.load_program(id)
+         angulos = [int(round(a)) for a in r["angulos"][0]]
+         self._ser.enviar(f"M:M:{max(1, int(speed) // 10)}:#{';'.join(map(str, angulos))}#")
+         return self._resposta(True, "Movimento enviado", {"angulos": angulos})
+      except Exception as e:
+         return self._resposta(False, f"Erro ao mover: {str(e)}")
 
-      def load_slots(self):
-         return self.cobot.load_slots()
+   def mover_linear(self, inicio, fim, speed=100, perfil="trapezoidal"):
+      """Move a ferramenta em linha reta do ponto `inicio` ao ponto `fim` (speed em mm/s)."""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
 
-      def delete_slot(self, id):
-         return self.cobot.delete_slot(id)
+      try:
+         dados = self.cobot.mover_linear(int(inicio), int(fim), float(speed), perfil=perfil)
+         return self._resposta(True, "Trajetória em execução", dados)
+      except (ValueError, IndexError, RuntimeError) as e:
+         return self._resposta(False, f"Trajetória inválida: {str(e)}")
+      except Exception as e:
+         return self._resposta(False, f"Erro ao mover: {str(e)}")
 
-      def rename_slot(self, id, name):
-         return self.cobot.update_slot_name(id, name)
+   def parar_trajetoria(self):
+      self.cobot.parar_trajetoria()
+      return self._resposta(True, "Trajetória interrompida", self.cobot.trajetoria_stats())
+
+   # ======================
+   # Jog contínuo
+   # ======================
+   def start_jog(self, joint, step):
+      """Botão + / - pressionado: os passos saem do Python (jog.py), não de um setInterval."""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
+
+      try:
+         self.cobot.start_jog(int(joint), int(step))
+         return self._resposta(True, "Jog iniciado")
+      except ValueError as e:
+         return self._resposta(False, f"Jog inválido: {str(e)}")
+
+   def manter_jog(self):
+      """Sinal de vida da tela; sem ele o jog para sozinho."""
+      return self._resposta(self.cobot.manter_jog(), "Jog mantido")
+
+   def stop_jog(self):
+      self.cobot.stop_jog()
+      return self._resposta(True, "Jog parado", self.cobot.jog_stats())
+
+   def upload_sequence(self, program):
+      """Compila o programa e grava a sequência no robô (substitui os S:* do JS)."""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
+
+      try:
+         if isinstance(program, str):
+            program = json.loads(program)
+         plano, _ = self.cobot.compilar(program)
+         if len(plano.linhas) > MAX_STEPS:
+            # não cabe na memória do firmware: a interface executa em fluxo
+            return self._resposta(False, f"Programa com {len(plano.linhas)} passos (máximo {MAX_STEPS})",
+                                  {"passos": len(plano.linhas), "longo": True})
+
+         dados = self.cobot.upload_sequence(program)
+         if not dados["enviado"]:
+            return self._resposta(True, "Sequência já carregada no robô", dados)
+         otim = dados["otimizacao"]
+         return self._resposta(
+            True,
+            f"Sequência enviada em {dados['tempo_ms']} ms "
+            f"({otim['passos_economizados']} passos e ~{otim['tempo_economizado_ms']} ms economizados)",
+            dados,
+         )
+      except Exception as e:
+         return self._resposta(False, f"Erro ao enviar sequência: {str(e)}")
+
+   def executar_em_fluxo(self, program, repetir=False, janela=JANELA_PADRAO):
+      """Executa programas maiores que a memória do firmware, completando a fila pelo PC."""
+      if not self.conectado:
+         return self._resposta(False, f"Nenhuma porta conectada")
+
+      try:
+         dados = self.cobot.executar_em_fluxo(program, int(janela), bool(repetir))
+         return self._resposta(True, f"Executando {dados['passos']} passos em fluxo", dados)
+      except Exception as e:
+         return self._resposta(False, f"Erro ao executar em fluxo: {str(e)}")
+
+   def parar_fluxo(self):
+      self.cobot.parar_fluxo()
+      return self._resposta(True, "Execução em fluxo interrompida", self.cobot.fluxo_stats())
+
+   def fluxo_stats(self):
+      """Ocupação da janela e underruns da execução em fluxo."""
+      return self._resposta(True, "Estatísticas da execução em fluxo", self.cobot.fluxo_stats())
+
+   def simular_programas(self, ids=None):
+      """Tempo de ciclo previsto dos programas salvos (todos, se ids=None), do mais rápido ao mais lento."""
+      try:
+         ids = ids or [slot["id"] for slot in self.cobot.slots]
+         r = sorted(self.cobot.simular(ids), key=lambda p: p["total_ms"])
+         return self._resposta(True, f"{len(r)} programas simulados", r)
+      except Exception as e:
+         return self._resposta(False, f"Erro na simulação: {str(e)}")
+
+   def analisar_programa(self, program):
+      """Relatório do compilador (passos e tempo estimado economizados) sem enviar nada."""
+      try:
+         if isinstance(program, str):
+            program = json.loads(program)
+         plano, _ = self.cobot.compilar(program)
+         return self._resposta(True, "Programa compilado", dict(plano.relatorio))
+      except Exception as e:
+         return self._resposta(False, f"Erro ao compilar: {str(e)}")
+
+   def add_point(self, pos=None):
+      self.cobot.add_point(pos)
+      self._ui.chamar('setPoints')
       
+   def delete_point(self, i):
+      self.cobot.delete_point(i)
+      self._ui.chamar('setPoints')
+
+   def get_points(self):
+      return self.cobot.points
+
+   def preview_points(self):
+      """Pose (x, y, z, yaw, pitch, roll) e validade de cada ponto salvo."""
+      try:
+         return self._resposta(True, "Poses calculadas", self.cobot.preview_points())
+      except Exception as e:
+         return self._resposta(False, f"Erro ao calcular poses: {str(e)}")
+   
+   def clear_points(self):
+      self.cobot.clear_point()
+      self._ui.chamar('setPoints')
+   
+   def save_program(self, name, dom, id=None):
+     return self.cobot.save_program(name, dom, id)
+
+   def load_program(self, id):
+      return self.cobot.load_program(id)
+
+   def load_slots(self):
+      return self.cobot.load_slots()
+
+   def cache_stats(self):
+      """Acertos/erros do cache de programas carregados."""
+      return self._resposta(True, "Estatísticas do cache de programas", self.cobot.cache_stats())
+
+   def plan_stats(self):
+      """Acertos/erros e tamanho do cache de planos compilados."""
+      return self._resposta(True, "Estatísticas do cache de planos", self.cobot.plan_stats())
+
+   def delete_slot(self, id):
+      return self.cobot.delete_slot(id)
+
+   def rename_slot(self, id, name):
+      return self.cobot.update_slot_name(id, name)
+
+
+# ======================
+# Inicialização do app
+# ======================
+def _aquecer(api, fase=None):
+   """Carrega em segundo plano o que o Cobot adiou, depois que a tela já subiu."""
+   if fase:
+      startup.marcar(fase)
+   try:
+      api.cobot.aquecer()
+   except Exception as e:
+      print("Erro ao pré-carregar:", e)
+   startup.marcar("aquecido")
+
+
+def run_app(headless=False, host=None, porta=None):
+   """
+   Abre a janela do pywebview, ou (headless=True) serve o Api e a tela por
+   HTTP + WebSocket em host:porta, sem pywebview (ver server.py).
+   O banco de programas e o numpy ficam para depois da janela (_aquecer).
+   """
+   global window
+   base_dir = Path(__file__).parent
+   html_dir = base_dir / 'web'  
+
+   if headless:
+      from server import ServidorApi, HOST_PADRAO, PORTA_PADRAO
+      servidor = ServidorApi(html_dir)
+      api = Api(enviar_ui=servidor.publicar)
+      startup.marcar("api")
+      threading.Thread(target=_aquecer, args=(api,), daemon=True).start()
+      try:
+         servidor.executar(api, host or HOST_PADRAO, PORTA_PADRAO if porta is None else porta)
+      finally:
+         api.desconectar()
+      return
+
+   import webview
 
    api = Api()
+   startup.marcar("api")
    window = webview.create_window(
       'Cobot',
       url=f'file://{html_dir}/index.html',
       js_api=api,
       min_size=(1212, 726)
    )
-   webview.start(debug=True)
+   startup.marcar("janela")
+   webview.start(_aquecer, (api, "gui"), debug=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,160 @@
+# plan_cache.py
+"""
+Cache de planos de movimento compilados, indexado pelo hash do conteúdo.
+
+O plano de um programa (as linhas S:* de compilar_programa) só depende de
+"points", "commands", das opções e da versão do compilador. O hash SHA-256 do
+JSON canônico desses campos é a chave: o mesmo programa, salvo ou não, em
+qualquer ordem de chaves, cai no mesmo plano e não é compilado de novo.
+
+- Planos são imutáveis (tupla de linhas), podem ser compartilhados entre threads.
+- Limite por tamanho (bytes das linhas); sai primeiro o usado há mais tempo.
+- Persistido em JSON (saves/plans.json), então o primeiro ciclo depois de
+  reiniciar o app também não recompila. Um arquivo de outra COMPILADOR_VERSAO
+  é ignorado inteiro.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+TAMANHO_MAX_BYTES = 256 * 1024
+# Aumente sempre que a saída de compilar_programa (controllers.py) mudar: linhas,
+# passes, origem ou campos do relatório. Planos de outra versão não são usados.
+COMPILADOR_VERSAO = 1
+
+
+class PlanoCompilado(NamedTuple):
+    hash: str
+    linhas: tuple
+    origem: tuple = ()      # command do programa (1..N) de cada linha
+    relatorio: tuple = ()   # pares (chave, valor) do relatório do compilador
+
+    @property
+    def tamanho(self):
+        return sum(len(linha) for linha in self.linhas)
+
+
+def hash_programa(program, opcoes=None):
+    """SHA-256 (hex) do JSON canônico de points + commands (+ opções e versão do compilador)."""
+    conteudo = {
+        "compilador": COMPILADOR_VERSAO,
+        "points": program.get("points") or {},
+        "commands": program.get("commands") or [],
+    }
+    if opcoes:
+        conteudo["opcoes"] = opcoes
+    texto = json.dumps(conteudo, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    def __init__(self, caminho=None, tamanho_max=TAMANHO_MAX_BYTES):
+        """caminho: arquivo JSON de persistência (None = só em memória)."""
+        self._caminho = Path(caminho) if caminho else None
+        self.tamanho_max = tamanho_max
+        self._planos = OrderedDict()    # hash -> PlanoCompilado, do menos ao mais recente
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._lock_arquivo = threading.Lock()   # um salvar() por vez (mesmo .tmp)
+        self.hits = 0
+        self.misses = 0
+        self.evicoes = 0
+        self._carregar()
+
+    def __len__(self):
+        return len(self._planos)
+
+    def __contains__(self, hash):
+        return hash in self._planos
+
+    # ============================================================
+    # === CONSULTA ===============================================
+    # ============================================================
+
+    def obter_ou_compilar(self, program, compilar, opcoes=None):
+        """
+        Plano do programa; compila só se o hash não estiver no cache.
+        compilar(program) -> (linhas, origem, relatorio dict).
+        Retorna (PlanoCompilado, True se veio do cache).
+        """
+        hash = hash_programa(program, opcoes)
+        with self._lock:
+            plano = self._planos.get(hash)
+            if plano is not None:
+                self._planos.move_to_end(hash)
+                self.hits += 1
+                return plano, True
+            self.misses += 1
+
+        # compila fora do lock (erros de compilação não entram no cache)
+        linhas, origem, relatorio = compilar(program)
+        plano = PlanoCompilado(hash, tuple(linhas), tuple(origem), tuple(relatorio.items()))
+        with self._lock:
+            self._inserir(plano)
+        self.salvar()
+        return plano, False
+
+    def _inserir(self, plano):
+        anterior = self._planos.pop(plano.hash, None)
+        if anterior is not None:
+            self._bytes -= anterior.tamanho
+        self._planos[plano.hash] = plano
+        self._bytes += plano.tamanho
+        # mantém pelo menos o plano recém-inserido, mesmo se sozinho passar do limite
+        while self._bytes > self.tamanho_max and len(self._planos) > 1:
+            _, removido = self._planos.popitem(last=False)
+            self._bytes -= removido.tamanho
+            self.evicoes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._planos.clear()
+            self._bytes = 0
+        self.salvar()
+
+    # ============================================================
+    # === PERSISTÊNCIA ===========================================
+    # ============================================================
+
+    def _carregar(self):
+        if self._caminho is None or not self._caminho.exists():
+            return
+        try:
+            dados = json.loads(self._caminho.read_text(encoding="utf-8"))
+            if not isinstance(dados, dict) or dados.get("compilador") != COMPILADOR_VERSAO:
+                print("Cache de planos descartado (outra versão do compilador)")
+                return
+            for hash, linhas, origem, relatorio in dados["planos"]:
+                self._inserir(PlanoCompilado(hash, tuple(linhas), tuple(origem), tuple(map(tuple, relatorio))))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            print("Cache de planos ignorado (arquivo inválido):", e)
+            self._planos.clear()
+            self._bytes = 0
+
+    def salvar(self):
+        """Grava o cache (ordem LRU) num arquivo temporário e troca de uma vez."""
+        if self._caminho is None:
+            return
+        with self._lock:
+            itens = [[p.hash, list(p.linhas), list(p.origem), list(p.relatorio)] for p in self._planos.values()]
+        temp = self._caminho.with_suffix(".tmp")
+        with self._lock_arquivo:
+            temp.write_text(json.dumps({"compilador": COMPILADOR_VERSAO, "planos": itens}, separators=(",", ":")),
+                            encoding="utf-8")
+            os.replace(temp, self._caminho)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "planos": len(self._planos),
+            "bytes": self._bytes,
+            "tamanho_max": self.tamanho_max,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicoes": self.evicoes,
+            "taxa_acerto": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,152 @@
+# port_watcher.py
+"""
+Monitor de portas seriais (conectar/desconectar cabo).
+
+- Linux: escuta os eventos do kernel/udev por um socket netlink e só enumera as
+  portas quando chega um evento do subsistema tty.
+- Outros sistemas (ou sem permissão de netlink): enumera a cada `intervalo` segundos.
+
+A última enumeração fica em cache, então listar() e existe() não tocam no sistema.
+"""
+import select
+import socket
+import sys
+import threading
+
+from serial_comm import SerialManager
+
+PORTA_ADICIONADA = "add"
+PORTA_REMOVIDA = "remove"
+
+_NETLINK_KOBJECT_UEVENT = 15
+_GRUPOS_UEVENT = 1 | 2   # 1 = kernel, 2 = udev (depois do /dev/tty* existir)
+_DEBOUNCE = 0.05         # s, agrupa a rajada de eventos de um mesmo cabo
+
+
+class PortWatcher:
+    def __init__(self, enumerar=SerialManager.listar_portas, intervalo=1.0):
+        """
+        enumerar: função que devolve a lista de portas ([{"porta", "descricao"}]).
+        intervalo: período do modo polling (fallback).
+        """
+        self._enumerar = enumerar
+        self.intervalo = intervalo
+        self._portas = []               # cache da última enumeração
+        self._nomes = frozenset()       # nomes das portas, para existe() em O(1)
+        self._listeners = []            # callback(evento, porta)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._acordar_r, self._acordar_w = socket.socketpair()
+        self.modo = None                # "netlink" ou "polling", definido em iniciar()
+
+    # --- Sistema de callbacks ---
+    def add_listener(self, callback):
+        """Registra uma função chamada com (evento, porta) a cada porta adicionada/removida."""
+        self._listeners.append(callback)
+
+    def _notify_listeners(self, evento, porta):
+        for f in self._listeners:
+            try:
+                f(evento, porta)
+            except Exception as e:
+                print("Erro no listener de portas:", e)
+
+    # --- Cache ---
+    def listar(self):
+        """Última lista de portas enumerada."""
+        return self._portas
+
+    def existe(self, porta):
+        return porta in self._nomes
+
+    def nomes(self):
+        return self._nomes
+
+    def atualizar(self):
+        """Enumera as portas de novo e emite os eventos do que mudou."""
+        lista = self._enumerar()
+        with self._lock:
+            antigas = {p["porta"]: p for p in self._portas}
+            novas = {p["porta"]: p for p in lista}
+            self._portas = lista
+            self._nomes = frozenset(novas)
+
+        for nome in antigas.keys() - novas.keys():
+            self._notify_listeners(PORTA_REMOVIDA, antigas[nome])
+        for nome in novas.keys() - antigas.keys():
+            self._notify_listeners(PORTA_ADICIONADA, novas[nome])
+        return lista
+
+    # --- Thread de monitoramento ---
+    def iniciar(self):
+        if self._running:
+            return self.modo
+        # primeira enumeração só preenche o cache, sem emitir eventos
+        lista = self._enumerar()
+        self._portas, self._nomes = lista, frozenset(p["porta"] for p in lista)
+
+        sock = self._abrir_netlink()
+        if sock is not None:
+            self.modo = "netlink"
+            alvo, args = self._loop_netlink, (sock,)
+        else:
+            self.modo = "polling"
+            alvo, args = self._loop_polling, ()
+
+        self._running = True
+        self._thread = threading.Thread(target=alvo, args=args, daemon=True)
+        self._thread.start()
+        return self.modo
+
+    def parar(self):
+        self._running = False
+        self._acordar_w.send(b"\0")
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    @staticmethod
+    def _abrir_netlink():
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, _GRUPOS_UEVENT))
+            return sock
+        except (OSError, AttributeError) as e:
+            print("Netlink indisponível, usando polling:", e)
+            return None
+
+    def _loop_netlink(self, sock):
+        try:
+            while self._running:
+                # bloqueia até chegar um evento do kernel ou o pedido de parada
+                prontos, _, _ = select.select([sock, self._acordar_r], [], [])
+                if self._acordar_r in prontos:
+                    self._acordar_r.recv(64)
+                    continue
+
+                relevante = False
+                while True:
+                    if b"SUBSYSTEM=tty" in sock.recv(8192):
+                        relevante = True
+                    # drena a rajada de eventos (kernel + udev, várias interfaces USB)
+                    if not select.select([sock], [], [], _DEBOUNCE)[0]:
+                        break
+                if relevante:
+                    self.atualizar()
+        except Exception as e:
+            print("Erro no monitor de portas:", e)
+        finally:
+            sock.close()
+
+    def _loop_polling(self):
+        while self._running:
+            try:
+                self.atualizar()
+            except Exception as e:
+                print("Erro no monitor de portas:", e)
+            # espera o intervalo, mas acorda na hora se parar() for chamado
+            if select.select([self._acordar_r], [], [], self.intervalo)[0]:
+                self._acordar_r.recv(64)
@@ -0,0 +1,226 @@
+# program_store.py
+"""
+Armazenamento dos programas salvos em SQLite (saves/programs.db).
+
+- Índice id -> {"id", "name"} em memória: busca, renomear e apagar em O(1)
+  sem regravar a lista inteira (antes: slots.json completo a cada alteração).
+- Cada operação é uma transação do SQLite: um crash no meio não corrompe os saves.
+- migrar_json() importa uma única vez o formato antigo (slots.json + <id>.json);
+  a marca fica no próprio banco (tabela meta) e os arquivos antigos não são
+  tocados (o slots.json de exemplo é versionado no git).
+"""
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from time import time
+
+TAMANHO_CACHE = 16  # programas já interpretados mantidos em memória
+
+
+class ProgramStore:
+    def __init__(self, caminho):
+        self._caminho = Path(caminho)
+        self._lock = threading.Lock()
+        # a mesma conexão é usada pela thread da API e por outras threads do app
+        self._db = sqlite3.connect(str(self._caminho), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS programas (
+                   id    TEXT PRIMARY KEY,
+                   nome  TEXT NOT NULL,
+                   dados TEXT NOT NULL,
+                   mtime REAL NOT NULL
+               )"""
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+        # índice em memória, na ordem de criação (rowid)
+        self._indice = {
+            id: {"id": id, "name": nome}
+            for id, nome in self._db.execute("SELECT id, nome FROM programas ORDER BY rowid")
+        }
+
+    # ============================================================
+    # === CONSULTAS ==============================================
+    # ============================================================
+
+    def __len__(self):
+        return len(self._indice)
+
+    def __contains__(self, id):
+        return id in self._indice
+
+    def listar(self):
+        """Lista de slots (id + name), na ordem de criação."""
+        return list(self._indice.values())
+
+    def obter(self, id):
+        """Conteúdo do programa como dict, ou None se não existir."""
+        texto = self.obter_texto(id)
+        return None if texto is None else json.loads(texto)
+
+    def obter_texto(self, id):
+        if id not in self._indice:
+            return None
+        with self._lock:
+            linha = self._db.execute("SELECT dados FROM programas WHERE id = ?", (id,)).fetchone()
+        return linha[0] if linha else None
+
+    def obter_com_mtime(self, id):
+        """(conteúdo como dict, mtime) numa única consulta, ou (None, None)."""
+        if id not in self._indice:
+            return None, None
+        with self._lock:
+            linha = self._db.execute("SELECT dados, mtime FROM programas WHERE id = ?", (id,)).fetchone()
+        if not linha:
+            return None, None
+        return json.loads(linha[0]), linha[1]
+
+    def obter_mtime(self, id):
+        """Momento da última gravação do programa (time.time()), ou None."""
+        if id not in self._indice:
+            return None
+        with self._lock:
+            linha = self._db.execute("SELECT mtime FROM programas WHERE id = ?", (id,)).fetchone()
+        return linha[0] if linha else None
+
+    # ============================================================
+    # === ESCRITA ================================================
+    # ============================================================
+
+    def salvar(self, id, nome, dados: str):
+        """Cria ou atualiza um programa (dados já em JSON)."""
+        with self._lock:
+            self._db.execute(
+                """INSERT INTO programas (id, nome, dados, mtime) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET nome = excluded.nome,
+                                                 dados = excluded.dados,
+                                                 mtime = excluded.mtime""",
+                (id, nome, dados, time()),
+            )
+            self._indice[id] = {"id": id, "name": nome}
+
+    def renomear(self, id, nome):
+        if id not in self._indice:
+            return False
+        with self._lock:
+            self._db.execute("UPDATE programas SET nome = ? WHERE id = ?", (nome, id))
+            self._indice[id] = {"id": id, "name": nome}
+        return True
+
+    def remover(self, id):
+        if id not in self._indice:
+            return False
+        with self._lock:
+            self._db.execute("DELETE FROM programas WHERE id = ?", (id,))
+            del self._indice[id]
+        return True
+
+    def fechar(self):
+        with self._lock:
+            self._db.close()
+
+    # ============================================================
+    # === MIGRAÇÃO DO FORMATO ANTIGO =============================
+    # ============================================================
+
+    def migrar_json(self, pasta):
+        """
+        Importa slots.json + <id>.json de `pasta` numa única transação e marca o
+        banco como migrado (a migração não roda de novo, nem traz de volta
+        programas apagados depois). Os arquivos antigos ficam onde estão.
+        Retorna quantos programas foram importados.
+        """
+        pasta = Path(pasta)
+        slots_file = pasta / "slots.json"
+        if not slots_file.exists() or self.migrado():
+            return 0
+
+        conteudo = slots_file.read_text(encoding="utf-8").strip()
+        slots = json.loads(conteudo) if conteudo else []
+
+        registros = []
+        for slot in slots:
+            arquivo = pasta / f"{slot['id']}.json"
+            if arquivo.exists():
+                # valida e compacta (o formato antigo era indent=2)
+                dados = json.dumps(json.loads(arquivo.read_text(encoding="utf-8")), separators=(",", ":"))
+                mtime = arquivo.stat().st_mtime
+            else:
+                dados, mtime = "{}", time()
+            registros.append((slot["id"], slot.get("name", ""), dados, mtime))
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO programas (id, nome, dados, mtime) VALUES (?, ?, ?, ?)",
+                    registros,
+                )
+                self._db.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('slots_json_migrado', ?)",
+                                 (str(time()),))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            for id, nome, _, _ in registros:
+                self._indice.setdefault(id, {"id": id, "name": nome})
+        return len(registros)
+
+    def migrado(self):
+        """True se o slots.json já foi importado para este banco."""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM meta WHERE chave = 'slots_json_migrado'").fetchone() is not None
+
+
+class ProgramCache:
+    """
+    Cache LRU de programas já interpretados, por id. Cada item guarda o mtime
+    com que foi lido; se o mtime atual for outro, o item é descartado.
+    """
+    def __init__(self, tamanho=TAMANHO_CACHE):
+        self.tamanho = tamanho
+        self._itens = OrderedDict()     # id -> (mtime, program)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    def obter(self, id, mtime):
+        with self._lock:
+            item = self._itens.get(id)
+            if item is not None and item[0] != mtime:
+                del self._itens[id]
+                self.invalidacoes += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(id)
+            self.hits += 1
+            return item[1]
+
+    def guardar(self, id, mtime, program):
+        with self._lock:
+            self._itens[id] = (mtime, program)
+            self._itens.move_to_end(id)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, id):
+        with self._lock:
+            if self._itens.pop(id, None) is not None:
+                self.invalidacoes += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "tamanho": self.tamanho,
+            "itens": len(self._itens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidacoes": self.invalidacoes,
+            "taxa_acerto": round(self.hits / total, 3) if total else 0.0,
+        }
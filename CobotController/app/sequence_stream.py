@@ -0,0 +1,219 @@
+# sequence_stream.py
+"""
+Execução de programas maiores que a sequence[] do firmware (MAX_STEPS passos).
+
+No modo fluxo (S:C:S) o firmware usa a sequence[] como fila circular: cada
+passo concluído libera uma posição. O ExecutorSequencia mantém no robô só uma
+janela dos próximos passos e, a cada #STEP:n# (início do passo n, numeração
+contínua desde o S:C:S), completa a janela em segundo plano. Quando todos os
+passos foram enviados manda S:C:E e o firmware responde #STEP:END# ao terminar.
+
+Se a fila esvaziar antes do fim o firmware avisa com #STEP:UNDERRUN# e espera;
+o executor conta esses eventos e a ocupação da janela para ajuste.
+"""
+import threading
+from time import perf_counter
+
+from serial_comm import SerialManager, Step
+
+JANELA_PADRAO = 8       # passos mantidos no robô (até MAX_STEPS)
+
+
+class ExecutorSequencia:
+    def __init__(self, ser: SerialManager, max_passos=30):
+        self._ser = ser
+        self.max_passos = max_passos
+        self._thread = None
+        self._acordar = threading.Event()
+        # guarda o estado lido/escrito pela thread de leitura (_ao_step), pela do
+        # executor e pelo stats(); nunca fica preso durante E/S da serial
+        self._lock = threading.Lock()
+        self._rodando = False
+
+        self._linhas = ()
+        self._repetir = False
+        self._janela = JANELA_PADRAO
+        self._enviados = 0          # passos já confirmados pelo firmware
+        self._iniciado = 0          # último #STEP:n# recebido
+        self._fim = False
+
+        self.underruns = 0
+        self._amostras_ocupacao = 0
+        self._soma_ocupacao = 0
+        self.ocupacao_min = None
+        self.erro = None
+        self._inicio = 0.0
+        self._duracao = 0.0
+
+        # inscrito uma vez: fora de uma execução os eventos são ignorados
+        ser.subscribe(Step, self._ao_step)
+
+    @property
+    def ativo(self):
+        return self._rodando
+
+    # ============================================================
+    # === EXECUÇÃO ===============================================
+    # ============================================================
+
+    def executar(self, linhas, janela=JANELA_PADRAO, repetir=False, timeout=1.0):
+        """
+        Começa a executar as linhas S:M/S:MS/S:W/S:G (qualquer quantidade).
+        A janela inicial é enviada antes de retornar; o resto segue em segundo plano.
+        Gera ValueError/TimeoutError se não der para começar.
+        """
+        if not linhas:
+            raise ValueError("Sequência vazia")
+        if not 1 <= janela <= self.max_passos:
+            raise ValueError(f"Janela deve ser de 1 a {self.max_passos} passos")
+
+        with self._lock:
+            # testa e reserva juntos: dois executar() ao mesmo tempo não passam os dois
+            if self._rodando:
+                raise RuntimeError("Já existe uma sequência em execução")
+            self._rodando = True
+            self._linhas = tuple(linhas)
+            self._repetir = repetir
+            self._janela = janela
+            self._enviados = 0
+            self._iniciado = 0
+            self._fim = False
+            self.underruns = 0
+            self._amostras_ocupacao = self._soma_ocupacao = 0
+            self.ocupacao_min = None
+            self.erro = None
+
+        self._timeout = timeout
+        if self._ser.enviar_e_aguardar_linha("S:C:S", "#STEP:INIT", timeout) is None:
+            self._rodando = False
+            raise TimeoutError("Firmware não entrou no modo fluxo (S:C:S)")
+        with self._lock:
+            # #STEP# atrasado da execução anterior, chegado antes do #STEP:INIT#
+            self._iniciado = 0
+            self._fim = False
+            self.underruns = 0
+
+        if not self._completar():
+            self._rodando = False
+            raise TimeoutError(self.erro)
+
+        self._inicio = perf_counter()
+        self._ser.enviar("S:C:R")
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def parar(self, imediato=True):
+        """
+        imediato: pausa e limpa a fila do robô na hora.
+        Senão, para de enviar e deixa o robô terminar os passos que já tem.
+        """
+        with self._lock:
+            if not self._rodando:
+                return
+            self._rodando = False
+        self._acordar.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        if imediato:
+            self._ser.enviar("S:C:P")
+            self._ser.enviar("S:C:C")
+        else:
+            self._ser.enviar("S:C:E")
+
+    def aguardar(self, timeout=None):
+        """Espera o #STEP:END#. True se terminou."""
+        if self._thread:
+            self._thread.join(timeout)
+        return not self._rodando
+
+    # ============================================================
+    # === JANELA =================================================
+    # ============================================================
+
+    def _ao_step(self, msg: Step):
+        # roda na thread de leitura: só registra e acorda a thread do executor
+        with self._lock:
+            if not self._rodando:
+                return
+            if msg.step == "underrun":
+                self.underruns += 1
+            elif msg.step == "end":
+                self._fim = True
+            elif msg.step.isdigit():
+                self._iniciado = int(msg.step)
+        self._acordar.set()
+
+    def _terminou(self):
+        with self._lock:
+            return not self._rodando or self._fim
+
+    def _no_robo(self):
+        """Passos enviados que ainda não terminaram (o passo em execução ocupa a fila). Chamar com _lock."""
+        return self._enviados - max(self._iniciado - 1, 0)
+
+    def _completar(self):
+        """Envia passos até a janela encher (ou acabarem). False se o firmware não confirmou."""
+        total = len(self._linhas)
+        with self._lock:
+            quantos = self._janela - self._no_robo()
+            inicio = self._enviados
+        if not self._repetir:
+            quantos = min(quantos, total - inicio)
+        if quantos <= 0:
+            return True
+
+        lote = [self._linhas[(inicio + i) % total] for i in range(quantos)]
+        confirmacoes = [f"{inicio + i + 1} - " for i in range(quantos)]
+        # sem o lock: as confirmações chegam pela thread de leitura, que também o usa
+        confirmados = self._ser.enviar_em_fluxo(lote, confirmacoes, min(quantos, 4), self._timeout)
+        with self._lock:
+            self._enviados += confirmados
+            if confirmados < quantos:
+                self.erro = f"Firmware confirmou só {confirmados} de {quantos} passos"
+                return False
+
+        if not self._repetir and inicio + confirmados == total:
+            self._ser.enviar("S:C:E")
+        return True
+
+    def _loop(self):
+        try:
+            while not self._terminou():
+                self._acordar.wait()
+                self._acordar.clear()
+                if self._terminou():
+                    break
+                # ocupação antes de completar; no fim do programa a fila esvazia de propósito
+                with self._lock:
+                    if self._repetir or self._enviados < len(self._linhas):
+                        ocupacao = self._no_robo()
+                        self._amostras_ocupacao += 1
+                        self._soma_ocupacao += ocupacao
+                        self.ocupacao_min = ocupacao if self.ocupacao_min is None else min(self.ocupacao_min, ocupacao)
+                if not self._completar():
+                    print("Erro no envio da sequência:", self.erro)
+                    break
+        finally:
+            with self._lock:
+                self._duracao = perf_counter() - self._inicio
+                self._rodando = False
+
+    def stats(self):
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        media = self._soma_ocupacao / self._amostras_ocupacao if self._amostras_ocupacao else 0.0
+        return {
+            "ativo": self._rodando,
+            "passos": len(self._linhas),
+            "janela": self._janela,
+            "enviados": self._enviados,
+            "executando": self._iniciado,
+            "ocupacao": self._no_robo(),
+            "ocupacao_media": round(media, 2),
+            "ocupacao_min": self.ocupacao_min,
+            "underruns": self.underruns,
+            "duracao_s": round(self._duracao if not self._rodando else perf_counter() - self._inicio, 3),
+            "erro": self.erro,
+        }
@@ -0,0 +1,231 @@
+# serial_async.py
+"""
+Versão asyncio do SerialManager, baseada em transporte (pyserial-asyncio).
+
+Cada porta é um transporte no event loop, então vários braços podem ser
+controlados de um único loop, sem uma thread por porta. O tratamento das
+linhas e a extração das respostas #...# são os mesmos do SerialManager.
+
+Exemplo:
+    ser = AsyncSerialManager()
+    await ser.conectar("COM3")
+    await ser.send("M:P")
+    resp = await ser.request("S:C:C", timeout=1.0)
+    async for linha in ser.lines():
+        print(linha)
+"""
+import asyncio
+from collections import deque
+from time import perf_counter
+
+import serial_asyncio
+
+from serial_comm import (SeparadorLinhas, TabelaRotas, extrator_delimitado, TAMANHO_HISTORICO,
+                         ESPERA_FIRMWARE, _linha_do_firmware, _banner_do_firmware)
+
+
+class _ProtocoloSerial(asyncio.Protocol):
+    """Liga os eventos do transporte ao AsyncSerialManager."""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def connection_made(self, transport):
+        self._manager._transport = transport
+
+    def data_received(self, data):
+        self._manager._processar_dados(data.decode(errors="ignore"))
+
+    def connection_lost(self, exc):
+        self._manager._conexao_perdida(exc)
+
+    def pause_writing(self):
+        self._manager._pode_escrever.clear()
+
+    def resume_writing(self):
+        self._manager._pode_escrever.set()
+
+
+class AsyncSerialManager:
+    def __init__(self):
+        """
+        Inicializa o gerenciador serial assíncrono (sem abrir porta).
+        """
+        self._transport = None
+        self._separador = SeparadorLinhas()
+        self._buffer = deque(maxlen=TAMANHO_HISTORICO)  # últimas linhas lidas
+        self._listeners = []        # callbacks síncronos, mesmo contrato do SerialManager
+        self._rotas = TabelaRotas()  # callbacks por tipo de mensagem
+        self._pedidos = []          # (extrair, future) na ordem de envio
+        self._filas = set()         # filas dos iteradores lines() ativos
+        self._pode_escrever = asyncio.Event()
+        self._pode_escrever.set()
+        self.espera_firmware = None  # s até o ESP32 responder na última conexão (None = não respondeu)
+
+    # --- Sistema de callbacks ---
+    def add_listener(self, callback):
+        """Registra uma função que será chamada com cada linha lida."""
+        self._listeners.append(callback)
+
+    def subscribe(self, tipo, callback):
+        """Registra uma função chamada só com as mensagens de um tipo (ver serial_comm)."""
+        self._rotas.inscrever(tipo, callback)
+
+    def _notify_listeners(self, data):
+        for f in self._listeners:
+            try:
+                f(data)
+            except Exception as e:
+                print("Erro no listener:", e)
+        if self._rotas:
+            self._rotas.despachar(data)
+
+    # --- Comunicação Serial ---
+    @property
+    def conectado(self):
+        return self._transport is not None and not self._transport.is_closing()
+
+    async def conectar(self, porta, baudrate=115200, espera=ESPERA_FIRMWARE):
+        """
+        Abre a porta no event loop atual. espera: segundos máximos esperando
+        o ESP32 responder (ver SerialManager._aguardar_firmware); 0 não espera.
+        """
+        if self.conectado:
+            await self.desconectar()
+        self._separador.limpar()
+        loop = asyncio.get_running_loop()
+        # o connection_made só roda na próxima volta do loop: guarda o transporte já
+        self._transport, _ = await serial_asyncio.create_serial_connection(
+            loop, lambda: _ProtocoloSerial(self), porta, baudrate=baudrate
+        )
+        self.espera_firmware = await self._aguardar_firmware(espera) if espera else None
+
+    async def _aguardar_firmware(self, timeout):
+        """Mesma sondagem do SerialManager: M:P e a primeira linha do firmware."""
+        inicio = perf_counter()
+        resposta = await self._pedir(_linha_do_firmware, "M:P", timeout)
+        if resposta is None:
+            print(f"ESP32 não respondeu em {timeout} s; seguindo com a porta aberta")
+            return None
+        if _banner_do_firmware(resposta):
+            await self.send("M:P")  # o M:P da sondagem se perdeu no boot
+        return perf_counter() - inicio
+
+    async def desconectar(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+            await asyncio.sleep(0)  # deixa o connection_lost rodar
+
+    def _conexao_perdida(self, exc):
+        self._transport = None
+        if exc is not None:
+            print("Erro na leitura serial:", exc)
+        # acorda quem está esperando resposta e encerra os iteradores
+        for _, futuro in self._pedidos:
+            if not futuro.done():
+                futuro.set_result(None)
+        self._pedidos.clear()
+        for fila in self._filas:
+            self._colocar(fila, None)
+        self._pode_escrever.set()
+
+    def _processar_dados(self, data: str):
+        for linha in self._separador.alimentar(data):
+            self._buffer.append(linha)
+            if self._pedidos:
+                self._resolver_pedidos(linha)
+            for fila in self._filas:
+                self._colocar(fila, linha)
+            self._notify_listeners(linha)
+
+    def _resolver_pedidos(self, linha):
+        """Entrega a linha ao pedido pendente mais antigo que a reconhecer."""
+        for i, (extrair, futuro) in enumerate(self._pedidos):
+            if futuro.done():
+                continue
+            resposta = extrair(linha)
+            if resposta is not None:
+                del self._pedidos[i]
+                futuro.set_result(resposta)
+                return
+
+    def _transporte_aberto(self):
+        """
+        Transporte para escrever depois de um await. Se a conexão caiu no meio
+        da espera, falha os pedidos pendentes e levanta ConnectionError.
+        """
+        if self._transport is None or self._transport.is_closing():
+            erro = ConnectionError("porta serial desconectada")
+            for _, futuro in self._pedidos:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            self._pedidos.clear()
+            raise erro
+        return self._transport
+
+    @staticmethod
+    def _colocar(fila, item):
+        """Coloca na fila descartando a linha mais antiga se o consumidor atrasar."""
+        if fila.full():
+            fila.get_nowait()
+        fila.put_nowait(item)
+
+    # --- API assíncrona ---
+    async def send(self, msg: str):
+        """
+        Envia uma linha, respeitando o controle de fluxo do transporte.
+        Levanta ConnectionError se a porta cair durante essa espera.
+        """
+        if not self.conectado:
+            return
+        await self._pode_escrever.wait()
+        self._transporte_aberto().write((msg + "\n").encode())
+
+    async def request(self, cmd, timeout=1.0, start="#", end="#"):
+        """
+        Envia o comando e aguarda a primeira linha com um trecho start...end.
+        Retorna o trecho, ou None em caso de timeout/desconexão. Levanta
+        ConnectionError se a porta cair enquanto espera o controle de fluxo.
+        """
+        if not self.conectado:
+            return None
+        return await self._pedir(extrator_delimitado(start, end), cmd, timeout)
+
+    async def _pedir(self, extrair, cmd, timeout):
+        """Envia o comando e aguarda a primeira linha que extrair(linha) reconhecer."""
+        await self._pode_escrever.wait()
+        transporte = self._transporte_aberto()
+
+        futuro = asyncio.get_running_loop().create_future()
+        item = (extrair, futuro)
+        # registra e escreve sem await no meio: a ordem da fila é a ordem no fio
+        self._pedidos.append(item)
+        transporte.write((cmd + "\n").encode())
+        try:
+            return await asyncio.wait_for(futuro, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if item in self._pedidos:
+                self._pedidos.remove(item)
+
+    async def lines(self, tamanho_fila=TAMANHO_HISTORICO):
+        """Iterador assíncrono das linhas recebidas a partir de agora."""
+        fila = asyncio.Queue(maxsize=tamanho_fila)
+        self._filas.add(fila)
+        try:
+            while True:
+                linha = await fila.get()
+                if linha is None:
+                    return
+                yield linha
+        finally:
+            self._filas.discard(fila)
+
+    def __aiter__(self):
+        return self.lines()
+
+    def ler_buffer(self):
+        """Lê as últimas linhas recebidas (sem apagar)."""
+        return "\n".join(self._buffer)
@@ -1,30 +1,220 @@
 # serial_comm.py
-import serial
-import serial.tools.list_ports
 import threading
-from time import sleep, time
+from collections import deque
+from time import perf_counter, sleep
+from typing import NamedTuple
+
+# Modos da thread de leitura
+LEITURA_EVENTOS = "eventos"   # read() bloqueante, acorda só quando chegam bytes
+LEITURA_POLLING = "polling"   # laço antigo: in_waiting + sleep(1 ms)
+LEITURA_EXTERNA = "externa"   # sem thread: quem chama ler_disponivel() (ex: fleet.MultiplexadorSerial)
+
+TAMANHO_HISTORICO = 256       # últimas linhas guardadas para ler_buffer()
+TAMANHO_MAX_LINHA = 4096      # descarta lixo sem '\n' maior que isso
+TIMEOUT_NEGOCIACAO = 0.5      # s esperando o #PROTO:BIN# (firmware antigo não responde)
+ESPERA_FIRMWARE = 3.0         # s máximos esperando o ESP32 dar sinal de vida no conectar()
+CABECALHO_RESPOSTA = "=" * 40  # primeira linha de toda resposta do loop() do Cobot.ino
+
+serial = None                 # pyserial, importado no primeiro uso (_pyserial)
+
+
+def _pyserial():
+    """Importa o pyserial só na primeira conexão/listagem (fora da partida do app)."""
+    global serial
+    if serial is None:
+        import serial.tools.list_ports  # com o global acima, liga o pacote `serial` do módulo
+    return serial
+
+
+def _linha_do_firmware(linha):
+    """Banner do setup() ou resposta a um comando (cabeçalho, #...#, DONE) do Cobot.ino."""
+    return linha if linha.startswith(("=", "#", "DONE")) else None
+
+
+def _banner_do_firmware(linha):
+    """Banner do setup() (o ESP32 acabou de reiniciar), e não o cabeçalho de uma resposta."""
+    return linha.startswith("=") and linha != CABECALHO_RESPOSTA
+
+
+def extrator_delimitado(start, end):
+    """Cria uma função que devolve o trecho entre start e end de uma linha (ou None)."""
+    def extrair(linha):
+        ini = linha.find(start)
+        if ini == -1:
+            return None
+        fim = linha.find(end, ini + len(start))
+        if fim == -1:
+            return None
+        return linha[ini + len(start):fim]
+    return extrair
+
+
+def extrator_prefixo(prefixo):
+    """Cria uma função que devolve a linha inteira se ela começar com prefixo (ou None)."""
+    def extrair(linha):
+        return linha if linha.startswith(prefixo) else None
+    return extrair
+
+
+class SeparadorLinhas:
+    """
+    Junta os blocos lidos da porta e devolve as linhas completas, sem '\r' e sem
+    linhas vazias. Compartilhado pelo SerialManager e pelo AsyncSerialManager.
+    """
+    def __init__(self, tamanho_max=TAMANHO_MAX_LINHA):
+        self._parcial = ""
+        self._tamanho_max = tamanho_max
+
+    def alimentar(self, data: str):
+        self._parcial += data
+        if "\n" not in data:
+            if len(self._parcial) > self._tamanho_max:
+                self._parcial = ""
+            return []
+
+        # um único split por bloco lido
+        *linhas, self._parcial = self._parcial.split("\n")
+        return [l for l in (linha.strip("\r") for linha in linhas) if l]
+
+    def limpar(self):
+        self._parcial = ""
+
+
+# ============================================================
+# === MENSAGENS DO FIRMWARE ==================================
+# ============================================================
+
+class JointPos(NamedTuple):
+    """#J1:90# -> JointPos(joint=0, pos=90). joint é o índice (J1 = 0)."""
+    joint: int
+    pos: int
+
+
+class Step(NamedTuple):
+    """#STEP:3# / #STEP:INIT# / #STEP:END# -> Step("3") / Step("init") / Step("end")."""
+    step: str
+
+
+class SavePos(NamedTuple):
+    """#SAVEPOS# (botão de teach do robô)."""
+
+
+class Texto(NamedTuple):
+    """Qualquer outra linha (log do firmware)."""
+    linha: str
+
+
+SAVEPOS = SavePos()
+
+
+def interpretar_linha(linha: str):
+    """Converte uma linha do firmware em uma mensagem tipada, numa única passada."""
+    if linha[:1] == "#":
+        corpo = linha.strip("#")  # "#STEP:INIT" (sem # final) também é aceito
+        inicial = corpo[:1]
+        if inicial == "J":
+            sep = corpo.find(":")
+            if sep > 1:
+                try:
+                    return JointPos(int(corpo[1:sep]) - 1, int(corpo[sep + 1:]))
+                except ValueError:
+                    pass
+        elif inicial == "S":
+            if corpo.startswith("STEP:"):
+                return Step(corpo[5:].lower())
+            if corpo == "SAVEPOS":
+                return SAVEPOS
+    return Texto(linha)
+
+
+class TabelaRotas:
+    """
+    Tabela tipo de mensagem -> callbacks. Cada linha é interpretada uma única vez
+    e entregue só para quem se inscreveu naquele tipo.
+    """
+    def __init__(self):
+        self._rotas = {}
+
+    def __bool__(self):
+        return bool(self._rotas)
+
+    def inscrever(self, tipo, callback):
+        # tupla imutável: o despacho não precisa de lock nem de cópia
+        self._rotas[tipo] = self._rotas.get(tipo, ()) + (callback,)
+
+    def remover(self, tipo, callback):
+        restantes = tuple(f for f in self._rotas.get(tipo, ()) if f != callback)
+        if restantes:
+            self._rotas[tipo] = restantes
+        else:
+            self._rotas.pop(tipo, None)
+
+    def despachar(self, linha: str, msg=None):
+        """msg já tipada (quadro binário) dispensa a interpretação da linha."""
+        if msg is None:
+            msg = interpretar_linha(linha)
+        for f in self._rotas.get(type(msg), ()):
+            try:
+                f(msg)
+            except Exception as e:
+                print("Erro no listener:", e)
+        return msg
+
+
+class _Pedido:
+    """Pedido aguardando resposta. extrair(linha) devolve a resposta ou None."""
+    __slots__ = ("extrair", "evento", "resposta")
+
+    def __init__(self, extrair):
+        self.extrair = extrair
+        self.evento = threading.Event()
+        self.resposta = None
+
 
 class SerialManager:
     def __init__(self):
         """
         Inicializa o gerenciador de comunicação serial.
         """
-        self.ser = serial.Serial()  # objeto Serial
+        self.ser = None             # serial.Serial, aberto no conectar()
         self._running = False
-        self._buffer = ""           # guarda dados lidos (para comandos)
+        self._thread = None         # thread de leitura ativa
+        self._buffer = deque(maxlen=TAMANHO_HISTORICO)  # últimas linhas lidas (limitado)
+        self._separador = SeparadorLinhas()  # acumula até encontrar '\n'
         self._listeners = []        # callbacks para log e interface
+        self._rotas = TabelaRotas()  # callbacks por tipo de mensagem
+        self._pedidos = []          # pedidos aguardando resposta (ordem de envio)
+        self._lock_pedidos = threading.Lock()
+        self._lock_escrita = threading.Lock()
+        self.binario = False        # protocolo binário negociado (framing.py)
+        self.espera_firmware = None  # s até o ESP32 responder na última conexão (None = não respondeu)
+        self._quadros = None        # DecodificadorQuadros no modo binário
+        self._codificar_quadro = None
+        self._seq_tx = 0
 
     # --- Sistema de callbacks ---
     def add_listener(self, callback):
         """Registra uma função que será chamada com cada linha lida."""
         self._listeners.append(callback)
 
-    def _notify_listeners(self, data):
+    def subscribe(self, tipo, callback):
+        """
+        Registra uma função chamada só com as mensagens de um tipo
+        (JointPos, Step, SavePos ou Texto), já interpretadas.
+        """
+        self._rotas.inscrever(tipo, callback)
+
+    def unsubscribe(self, tipo, callback):
+        self._rotas.remover(tipo, callback)
+
+    def _notify_listeners(self, data, msg=None):
         for f in self._listeners:
             try:
                 f(data)
             except Exception as e:
                 print("Erro no listener:", e)
+        if self._rotas:
+            self._rotas.despachar(data, msg)
 
     @staticmethod
     def listar_portas():
@@ -38,7 +228,7 @@ class SerialManager:
         ]
         """
         dispositivos = []
-        for port in serial.tools.list_ports.comports():
+        for port in _pyserial().tools.list_ports.comports():
             # descricao = f"({port.device}) " + " ".join(port.description.split(" ")[:-1]) or port.description
             if 'USB' in port.description:
                 descricao = "Dispositivo Serial (USB)"
@@ -53,35 +243,177 @@ class SerialManager:
         return dispositivos
 
      # --- Comunicação Serial ---
-    def conectar(self, porta, baudrate=115200, timeout=0):
+    def conectar(self, porta, baudrate=115200, timeout=0, modo_leitura=LEITURA_EVENTOS, binario=False,
+                 espera=ESPERA_FIRMWARE):
+        """
+        Abre a porta e inicia a thread de leitura.
+        - modo_leitura="eventos": leitura bloqueante, a thread só acorda quando chegam bytes.
+        - modo_leitura="polling": laço antigo que consulta in_waiting a cada 1 ms.
+        - modo_leitura="externa": porta não bloqueante e nenhuma thread; um seletor
+          de fora chama ler_disponivel() quando a porta tem dados.
+        - binario=True: pede o protocolo binário (P:B, ver framing.py); se o
+          firmware não confirmar, continua em texto. Ver self.binario.
+        - espera: segundos máximos esperando o ESP32 responder (ver _aguardar_firmware);
+          0 não espera.
+        """
         if self.ser and self.ser.is_open:
             self.desconectar()
-        self.ser = serial.Serial(porta, baudrate=baudrate, timeout=timeout)
-        sleep(2)
+
+        _pyserial()
+        if modo_leitura == LEITURA_EVENTOS:
+            # timeout=None -> read() bloqueia até chegar dado ou até cancel_read()
+            self.ser = serial.Serial(porta, baudrate=baudrate, timeout=None)
+            leitor = self._leitor_eventos
+        elif modo_leitura == LEITURA_EXTERNA:
+            self.ser = serial.Serial(porta, baudrate=baudrate, timeout=0)
+            leitor = None
+        else:
+            self.ser = serial.Serial(porta, baudrate=baudrate, timeout=timeout)
+            leitor = self._leitor_serial
+        self._separador.limpar()
         self._running = True
-        threading.Thread(target=self._leitor_serial, daemon=True).start()
+        if leitor is not None:
+            self._thread = threading.Thread(target=leitor, daemon=True)
+            self._thread.start()
+        self.espera_firmware = self._aguardar_firmware(espera, externo=leitor is None) if espera else None
+        if binario:
+            self._negociar_binario(externo=leitor is None)
+
+    def _aguardar_firmware(self, timeout, externo=False):
+        """
+        Espera a primeira linha do firmware em vez de um tempo fixo. Abrir a
+        porta reinicia o ESP32 (DTR/RTS) e o setup() manda o banner ~1 s depois;
+        se a placa não reiniciar, ela responde na hora ao M:P enviado aqui, e
+        as posições já chegam aos listeners. Se veio o banner, o M:P se perdeu
+        no boot e é reenviado. Retorna os segundos esperados, ou None se nada
+        veio no timeout (segue com a porta aberta, como antes).
+        """
+        inicio = perf_counter()
+        pedido = self._registrar(_linha_do_firmware, "M:P")
+        resposta = self._esperar(pedido, timeout, externo)
+        if resposta is None:
+            print(f"ESP32 não respondeu em {timeout} s; seguindo com a porta aberta")
+            return None
+        if _banner_do_firmware(resposta):
+            self.enviar("M:P")
+        return perf_counter() - inicio
+
+    def _esperar(self, pedido, timeout, externo=False):
+        """Resposta do pedido (ou None no timeout); externo: sem thread de leitura, lê aqui mesmo."""
+        try:
+            if externo:
+                fim = perf_counter() + timeout
+                while not pedido.evento.is_set() and perf_counter() < fim:
+                    if not self.ler_disponivel():
+                        break
+                    sleep(0.001)
+            else:
+                pedido.evento.wait(timeout)
+        finally:
+            self._cancelar(pedido)
+        return pedido.resposta
+
+    def _negociar_binario(self, externo=False):
+        """Troca para quadros se o firmware responder #PROTO:BIN# ao P:B."""
+        from framing import DecodificadorQuadros, codificar_comando
+
+        # o decodificador também separa texto: pode entrar antes da resposta
+        self._quadros = DecodificadorQuadros()
+        pedido = self._registrar(extrator_prefixo("#PROTO:BIN"), "P:B")
+        if self._esperar(pedido, TIMEOUT_NEGOCIACAO, externo) is None:
+            self._quadros = None    # firmware sem suporte: fica no texto
+            return False
+        with self._lock_escrita:
+            self._codificar_quadro = codificar_comando
+            self._seq_tx = 0
+        self.binario = True
+        return True
+
+    def fileno(self):
+        """Descritor da porta aberta (para selectors; só POSIX)."""
+        return self.ser.fileno()
+
+    def ler_disponivel(self):
+        """
+        Modo externo: lê o que já chegou e despacha as linhas, sem bloquear.
+        Retorna False se a porta fechou ou falhou (o seletor deve largá-la).
+        """
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except (serial.SerialException, OSError, TypeError) as e:
+            if self._running:
+                print("Erro na leitura serial:", e)
+            return False
+        if data:
+            try:
+                self._processar_bytes(data)
+            except Exception as e:
+                print("Erro na leitura serial:", e)
+        return True
+
+    def _processar_bytes(self, data: bytes):
+        """Separa texto e (no modo binário) quadros; quadros chegam já tipados."""
+        if self._quadros is None:
+            self._processar_dados(data.decode(errors="ignore"))
+            return
+        for linha, msg in self._quadros.alimentar(data):
+            self._entregar(linha, msg)
+
+    def _processar_dados(self, data: str):
+        """Acumula os dados recebidos e despacha cada linha completa."""
+        for linha in self._separador.alimentar(data):
+            self._entregar(linha)
+
+    def injetar(self, linha, msg=None):
+        """
+        Entrega uma linha como se tivesse chegado da porta (histórico, pedidos,
+        listeners e rotas). Usado na reprodução de gravações de telemetria.
+        """
+        self._entregar(linha, msg)
+
+    def _entregar(self, linha, msg=None):
+        self._buffer.append(linha)
+        if self._pedidos:
+            self._resolver_pedidos(linha)
+        # notifica os listeners (ex: log em UI)
+        self._notify_listeners(linha, msg)
+
+    def _resolver_pedidos(self, linha):
+        """Entrega a linha ao pedido pendente mais antigo que a reconhecer."""
+        with self._lock_pedidos:
+            for i, pedido in enumerate(self._pedidos):
+                resposta = pedido.extrair(linha)
+                if resposta is not None:
+                    del self._pedidos[i]
+                    pedido.resposta = resposta
+                    pedido.evento.set()
+                    return
+
+    def _leitor_eventos(self):
+        """Thread que fica bloqueada em read() e só processa quando chegam bytes."""
+        while self._running:
+            try:
+                # bloqueia até o primeiro byte e depois pega o que já estiver no buffer do SO
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except (serial.SerialException, OSError, TypeError) as e:
+                # porta fechada/removida: encerra a thread em vez de ficar girando no erro
+                if self._running:
+                    print("Erro na leitura serial:", e)
+                break
+            if data:
+                try:
+                    self._processar_bytes(data)
+                except Exception as e:
+                    print("Erro na leitura serial:", e)
 
     def _leitor_serial(self):
-        """Thread contínua que lê e armazena dados sem perder bytes ou quebrar linhas."""
-        line_buffer = ""  # acumula até encontrar '\n'
+        """Thread contínua (modo polling) que consulta a porta a cada 1 ms."""
         while self._running:
             if self.ser and self.ser.is_open and self.ser.in_waiting:
                 try:
-                    data = self.ser.read(self.ser.in_waiting).decode(errors="ignore")
+                    data = self.ser.read(self.ser.in_waiting)
                     if data:
-                        self._buffer += data  # mantém compatibilidade com enviar_e_aguardar
-                        line_buffer += data
-
-                        # processa linhas completas
-                        while "\n" in line_buffer:
-                            linha, line_buffer = line_buffer.split("\n", 1)
-                            linha = linha.strip("\r")
-                            if linha:
-                                # notifica os listeners (ex: log em UI)
-                                self._notify_listeners(linha)
-                                # imprime no terminal, se estiver rodando no modo direto
-                                # if __name__ == "__main__":
-                                #     print(f"<<< {linha}")
+                        self._processar_bytes(data)
                 except Exception as e:
                     print("Erro na leitura serial:", e)
 
@@ -89,47 +421,131 @@ class SerialManager:
 
 
     def ler_buffer(self):
-        """Lê o buffer acumulado (sem apagar)."""
-        return self._buffer
+        """Lê as últimas linhas recebidas (sem apagar)."""
+        return "\n".join(list(self._buffer))
 
     def limpar_buffer(self):
         """Limpa o buffer interno."""
-        self._buffer = ""
+        self._buffer.clear()
+
+    def _codificar(self, msg: str):
+        """Bytes do comando: quadro se houver um para ele no modo binário. Chamar com _lock_escrita."""
+        if self._codificar_quadro is not None:
+            quadro = self._codificar_quadro(msg, self._seq_tx)
+            if quadro is not None:
+                self._seq_tx = (self._seq_tx + 1) & 0xFF
+                return quadro
+        return (msg + "\n").encode()
 
     def enviar(self, msg: str):
         if self.ser and self.ser.is_open:
-            self.ser.write((msg + "\n").encode())
+            with self._lock_escrita:  # não intercala linhas de threads diferentes
+                self.ser.write(self._codificar(msg))
 
     def enviar_e_aguardar(self, comando, start="#", end="#", timeout=1.0):
-        """Usa o buffer interno sem interferir na thread."""
+        """
+        Envia o comando e aguarda a primeira linha com um trecho start...end.
+        Cada chamada registra seu próprio pedido antes de enviar, então chamadas
+        concorrentes não apagam a resposta uma da outra. A thread de leitura
+        acorda quem está esperando assim que a linha chega.
+        """
         if not (self.ser and self.ser.is_open):
             return None
+        return self._aguardar(extrator_delimitado(start, end), comando, timeout)
 
-        self.limpar_buffer()
-        self.enviar(comando)
-
-        start_time = time() 
-        while time() - start_time < timeout:
-            data = self.ler_buffer()
-            if start in data and end in data:
-                ini = data.find(start)
-                fim = data.find(end, ini + 1)
-                if fim != -1:
-                    return data[ini + 1:fim]
-            sleep(0.001)
-        return None
+    def enviar_e_aguardar_linha(self, comando, prefixo, timeout=1.0):
+        """Envia o comando e devolve a primeira linha que começar com prefixo (ou None)."""
+        if not (self.ser and self.ser.is_open):
+            return None
+        return self._aguardar(extrator_prefixo(prefixo), comando, timeout)
+
+    def enviar_em_fluxo(self, comandos, confirmacoes, janela=4, timeout=1.0):
+        """
+        Envia os comandos um atrás do outro, sem pausas fixas: no máximo `janela`
+        ficam aguardando confirmação ao mesmo tempo. confirmacoes[i] é o início da
+        linha que o firmware imprime ao aceitar comandos[i].
+        Retorna quantos comandos foram confirmados (para no primeiro timeout).
+        """
+        if not (self.ser and self.ser.is_open):
+            return 0
+
+        pendentes = deque()
+        confirmados = 0
+
+        def confirmar():
+            pedido = pendentes.popleft()
+            ok = pedido.evento.wait(timeout)
+            self._cancelar(pedido)
+            return ok
+
+        try:
+            for comando, prefixo in zip(comandos, confirmacoes):
+                if len(pendentes) >= janela:
+                    if not confirmar():
+                        return confirmados
+                    confirmados += 1
+                pendentes.append(self._registrar(extrator_prefixo(prefixo), comando))
+            while pendentes:
+                if not confirmar():
+                    return confirmados
+                confirmados += 1
+            return confirmados
+        finally:
+            for pedido in pendentes:
+                self._cancelar(pedido)
+
+    def _registrar(self, extrair, comando):
+        """Registra um pedido e envia o comando."""
+        pedido = _Pedido(extrair)
+        # registra e envia sob o mesmo lock: a ordem da fila é a ordem no fio
+        with self._lock_escrita:
+            with self._lock_pedidos:
+                self._pedidos.append(pedido)
+            try:
+                self.ser.write(self._codificar(comando))
+            except Exception:
+                self._cancelar(pedido)
+                raise
+        return pedido
+
+    def _cancelar(self, pedido):
+        with self._lock_pedidos:
+            if pedido in self._pedidos:
+                self._pedidos.remove(pedido)
+
+    def _aguardar(self, extrair, comando, timeout):
+        pedido = self._registrar(extrair, comando)
+        try:
+            pedido.evento.wait(timeout)
+        finally:
+            self._cancelar(pedido)
+        return pedido.resposta
 
     def desconectar(self):
         self._running = False
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.cancel_read()  # acorda o leitor bloqueado em read()
+            except Exception:
+                pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
         if self.ser and self.ser.is_open:
             self.ser.close()
+        self.binario = False
+        self._quadros = None
+        self._codificar_quadro = None
     
-    def testar_comunicacao(self):
+    def testar_comunicacao(self, portas_disponiveis=None):
         """
         Verifica se a conexão está aberta e se a porta ainda está listada entre as disponíveis.
+        portas_disponiveis: conjunto de nomes já enumerados (ex: PortWatcher.nomes());
+        se não for passado, enumera as portas agora.
         """
         if self.ser and self.ser.is_open:
-            portas_disponiveis = [p["porta"] for p in self.listar_portas()]
+            if portas_disponiveis is None:
+                portas_disponiveis = {p["porta"] for p in self.listar_portas()}
             return self.ser.port in portas_disponiveis
         return False
 
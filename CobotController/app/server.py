@@ -0,0 +1,423 @@
+# server.py
+"""
+Modo headless: o mesmo Api servido por HTTP + WebSocket (asyncio, só stdlib),
+sem pywebview. Para o PC da célula sem tela e para estações de operação remotas.
+
+    python -m app --headless [--host 0.0.0.0] [--porta 8765]
+
+- GET /            -> web/index.html com o js/pywebviewShim.js injetado: o shim cria
+                      window.pywebview.api e dispara 'pywebviewready', então a
+                      tela roda sem mudanças;
+- GET /<arquivo>   -> arquivos de web/;
+- GET /ws          -> WebSocket. Chamada: {"id", "metodo", "args"} ->
+                      {"id", "resultado"} ou {"id", "erro"}. O servidor empurra
+                      as atualizações da tela como {"chamadas": [[fn, args], ...]}
+                      (as mesmas do UiChannel, no lugar do evaluate_js);
+- POST /api/<metodo> com corpo JSON [args...] -> resultado em JSON (scripts, testes de carga);
+- GET /api         -> lista dos métodos.
+
+Os métodos do Api bloqueiam (esperam o robô), então rodam num pool de
+threads; o event loop só faz E/S. Clientes lentos perdem quadros de
+telemetria (a fila de cada um é limitada), nunca respostas.
+
+Outra página aberta no navegador do operador não pode mexer no braço:
+- cada execução tem um token (ServidorApi.token, impresso na partida). Em
+  loopback a página o recebe no index.html (data-token do shim); escutando em
+  outro endereço ele não é entregue a ninguém: o operador abre /?token=<token>
+  (a URL impressa na partida), senão qualquer cliente da rede ou site com DNS
+  rebinding leria o token do index.html. O /ws pede ?token= e o
+  POST /api/<metodo> pede o header X-Cobot-Token e Content-Type application/json
+  (o header próprio força o preflight de CORS, que o servidor não atende);
+- o handshake do /ws com Origin de outro site é recusado;
+- escutando em loopback, só aceita Host localhost/127.0.0.1/::1 (DNS rebinding).
+Por padrão só escuta em 127.0.0.1.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import mimetypes
+import secrets
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import startup
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+TRABALHADORES = 16              # chamadas do Api em paralelo
+FILA_MAX_CLIENTE = 256          # quadros de telemetria pendentes por cliente antes de descartar
+TAMANHO_MAX_MENSAGEM = 1 << 20
+SHIM = "js/pywebviewShim.js"
+HEADER_TOKEN = "x-cobot-token"
+HOSTS_LOOPBACK = {"127.0.0.1", "localhost", "::1"}
+
+_GUID_WS = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_STATUS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+           415: "Unsupported Media Type", 500: "Internal Server Error"}
+
+OP_CONTINUACAO, OP_TEXTO, OP_BINARIO, OP_FECHAR, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+# ============================================================
+# === WEBSOCKET (RFC 6455) ===================================
+# ============================================================
+
+def aceite_ws(chave):
+    return base64.b64encode(hashlib.sha1((chave + _GUID_WS).encode()).digest()).decode()
+
+
+def quadro_ws(dados: bytes, opcode=OP_TEXTO):
+    """Quadro do servidor (sem máscara, sem fragmentação)."""
+    n = len(dados)
+    if n < 126:
+        cabecalho = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        cabecalho = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        cabecalho = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return cabecalho + dados
+
+
+def desmascarar(dados, mascara):
+    n = len(dados)
+    if not n:
+        return dados
+    chave = (mascara * (n // 4 + 1))[:n]
+    return (int.from_bytes(dados, "big") ^ int.from_bytes(chave, "big")).to_bytes(n, "big")
+
+
+async def ler_quadro_ws(reader):
+    """(fim, opcode, dados) de um quadro, já sem máscara."""
+    b1, b2 = await reader.readexactly(2)
+    n = b2 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if n > TAMANHO_MAX_MENSAGEM:
+        raise ValueError("Mensagem WebSocket grande demais")
+    mascara = await reader.readexactly(4) if b2 & 0x80 else None
+    dados = await reader.readexactly(n)
+    if mascara:
+        dados = desmascarar(dados, mascara)
+    return b1 & 0x80, b1 & 0x0F, dados
+
+
+class _Cliente:
+    """Uma conexão WebSocket: a fila alimenta a tarefa que escreve no socket."""
+    __slots__ = ("writer", "fila", "descartados", "chamadas")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.fila = asyncio.Queue()
+        self.descartados = 0
+        self.chamadas = 0
+
+
+# ============================================================
+# === SERVIDOR ===============================================
+# ============================================================
+
+class ServidorApi:
+    def __init__(self, web_dir, trabalhadores=TRABALHADORES, token=None):
+        """token: segredo da sessão (padrão: um novo a cada execução)."""
+        self.web_dir = Path(web_dir).resolve()
+        self.token = token or secrets.token_urlsafe(24)
+        self.api = None
+        self._host = None
+        self._metodos = {}
+        self._clientes = set()
+        self._loop = None
+        self._servidor = None
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="api")
+        self.chamadas = 0
+        self.publicados = 0
+        self.descartados = 0
+
+    def registrar(self, api):
+        """Expõe os métodos públicos do Api (como o js_api do pywebview)."""
+        self.api = api
+        self._metodos = {
+            nome: getattr(api, nome) for nome in dir(type(api))
+            if not nome.startswith("_") and callable(getattr(api, nome))
+        }
+
+    # --- Telemetria para as telas ---
+    def publicar(self, chamadas):
+        """
+        Destino do UiChannel: envia [(fn, args), ...] para todas as telas.
+        Chamado de qualquer thread; o JSON e o quadro são montados uma vez só.
+        """
+        if not self._clientes or self._loop is None:
+            return
+        dados = quadro_ws(json.dumps({"chamadas": chamadas}, separators=(",", ":")).encode())
+        self._loop.call_soon_threadsafe(self._distribuir, dados)
+
+    def _distribuir(self, dados):
+        self.publicados += 1
+        for cliente in self._clientes:
+            if cliente.fila.qsize() >= FILA_MAX_CLIENTE:
+                cliente.descartados += 1
+                self.descartados += 1
+                continue
+            cliente.fila.put_nowait(dados)
+
+    # --- Ciclo de vida ---
+    async def iniciar(self, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        self._loop = asyncio.get_running_loop()
+        self._host = host
+        self._servidor = await asyncio.start_server(self._conexao, host, porta)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def fechar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            for cliente in list(self._clientes):
+                cliente.writer.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def executar(self, api, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        """Bloqueia servindo o Api até Ctrl+C."""
+        self.registrar(api)
+
+        async def principal():
+            endereco = await self.iniciar(host, porta)
+            print(f"Servidor headless em http://{endereco[0]}:{endereco[1]}/ (Ctrl+C para sair)")
+            print(f"Token da sessão (header X-Cobot-Token / ?token=): {self.token}")
+            if not self._loopback:
+                print(f"Estações remotas: abra http://<este PC>:{endereco[1]}/?token={self.token}")
+            startup.marcar("servidor")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await self.fechar()
+
+        try:
+            asyncio.run(principal())
+        except KeyboardInterrupt:
+            pass
+
+    def stats(self):
+        return {
+            "clientes": len(self._clientes),
+            "chamadas": self.chamadas,
+            "publicados": self.publicados,
+            "descartados": self.descartados,
+        }
+
+    # ============================================================
+    # === HTTP ===================================================
+    # ============================================================
+
+    async def _conexao(self, reader, writer):
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                try:
+                    metodo, alvo, versao = linhas[0].split(" ", 2)
+                except ValueError:
+                    await self._responder(writer, 400, b"", fechar=True)
+                    return
+                headers = {}
+                for linha in linhas[1:]:
+                    nome, sep, valor = linha.partition(":")
+                    if sep:
+                        headers[nome.strip().lower()] = valor.strip()
+
+                if not self._host_permitido(headers):
+                    await self._responder(writer, 403, b"", fechar=True)
+                    return
+                url = urlsplit(alvo)
+                caminho = unquote(url.path)
+                if caminho == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, headers, parse_qs(url.query).get("token", [""])[0])
+                    return
+
+                corpo = b""
+                tamanho = int(headers.get("content-length", 0) or 0)
+                if tamanho:
+                    if tamanho > TAMANHO_MAX_MENSAGEM:
+                        await self._responder(writer, 400, b"", fechar=True)
+                        return
+                    corpo = await reader.readexactly(tamanho)
+
+                manter = versao == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, tipo, dados = await self._rota(metodo, caminho, corpo, headers)
+                await self._responder(writer, status, dados, tipo, fechar=not manter)
+                if not manter:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _responder(self, writer, status, dados, tipo="text/plain; charset=utf-8", fechar=False):
+        cabecalho = (f"HTTP/1.1 {status} {_STATUS.get(status, '')}\r\n"
+                     f"Content-Type: {tipo}\r\nContent-Length: {len(dados)}\r\n"
+                     f"Cache-Control: no-cache\r\n"
+                     f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n")
+        writer.write(cabecalho.encode("latin-1") + dados)
+        await writer.drain()
+
+    # --- Origem das requisições ---
+    @property
+    def _loopback(self):
+        return self._host in HOSTS_LOOPBACK
+
+    def _host_permitido(self, headers):
+        """Escutando em loopback, o Host tem que ser loopback (senão é DNS rebinding)."""
+        if not self._loopback:
+            return True
+        return urlsplit("//" + headers.get("host", "")).hostname in HOSTS_LOOPBACK
+
+    def _token_valido(self, token):
+        return hmac.compare_digest(token.encode(), self.token.encode())
+
+    @staticmethod
+    def _mesma_origem(headers):
+        """Origin ausente (cliente fora do navegador) ou igual à origem do próprio servidor."""
+        origem = headers.get("origin")
+        if origem is None:
+            return True
+        host = headers.get("host", "")
+        return origem in (f"http://{host}", f"https://{host}")
+
+    async def _rota(self, metodo, caminho, corpo, headers):
+        """(status, content-type, corpo) da requisição HTTP."""
+        if caminho == "/api" and metodo == "GET":
+            return 200, "application/json", json.dumps(sorted(self._metodos)).encode()
+        if caminho.startswith("/api/"):
+            nome = caminho[5:]
+            if nome not in self._metodos:
+                return 404, "text/plain; charset=utf-8", f"Método {nome} não existe".encode()
+            if metodo != "POST":
+                return 405, "text/plain; charset=utf-8", b""
+            if headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+                return 415, "text/plain; charset=utf-8", b"Content-Type deve ser application/json"
+            if not self._token_valido(headers.get(HEADER_TOKEN, "")):
+                return 403, "text/plain; charset=utf-8", b"Token ausente ou errado"
+            try:
+                args = json.loads(corpo) if corpo else []
+                resultado = await self._chamar(nome, args if isinstance(args, list) else [args])
+                return 200, "application/json", json.dumps(resultado, default=str).encode()
+            except Exception as e:
+                return 500, "application/json", json.dumps({"erro": str(e)}).encode()
+        if metodo != "GET":
+            return 405, "text/plain; charset=utf-8", b""
+        return self._arquivo(caminho)
+
+    def _arquivo(self, caminho):
+        relativo = caminho.lstrip("/") or "index.html"
+        arquivo = (self.web_dir / relativo).resolve()
+        if not arquivo.is_relative_to(self.web_dir) or not arquivo.is_file():
+            return 404, "text/plain; charset=utf-8", b"404"
+        dados = arquivo.read_bytes()
+        if arquivo.name == "index.html":
+            # o shim precisa existir antes dos scripts da página usarem pywebview.api.
+            # Fora de loopback o token não vai na página: o shim o lê do ?token= da URL
+            token = f' data-token="{self.token}"' if self._loopback else ""
+            shim = f'<script src="{SHIM}"{token}></script>\n    <script'
+            dados = dados.replace(b"<script", shim.encode(), 1)
+        tipo = mimetypes.guess_type(arquivo.name)[0] or "application/octet-stream"
+        if tipo.startswith("text/") or tipo == "application/javascript":
+            tipo += "; charset=utf-8"
+        return 200, tipo, dados
+
+    async def _chamar(self, nome, args):
+        funcao = self._metodos[nome]
+        self.chamadas += 1
+        return await self._loop.run_in_executor(self._executor, lambda: funcao(*args))
+
+    # ============================================================
+    # === WEBSOCKET ==============================================
+    # ============================================================
+
+    async def _websocket(self, reader, writer, headers, token):
+        chave = headers.get("sec-websocket-key")
+        if not chave:
+            await self._responder(writer, 400, b"", fechar=True)
+            return
+        if not self._mesma_origem(headers) or not self._token_valido(token):
+            await self._responder(writer, 403, b"", fechar=True)
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {aceite_ws(chave)}\r\n\r\n").encode())
+        await writer.drain()
+
+        cliente = _Cliente(writer)
+        self._clientes.add(cliente)
+        escritor = asyncio.create_task(self._escrever(cliente))
+        tarefas = set()
+        partes = []
+        try:
+            while True:
+                fim, opcode, dados = await ler_quadro_ws(reader)
+                if opcode == OP_FECHAR:
+                    cliente.fila.put_nowait(quadro_ws(dados[:2], OP_FECHAR))
+                    break
+                if opcode == OP_PING:
+                    cliente.fila.put_nowait(quadro_ws(dados, OP_PONG))
+                    continue
+                if opcode == OP_PONG:
+                    continue
+                partes.append(dados)
+                if not fim:
+                    continue
+                mensagem, partes = b"".join(partes), []
+                tarefa = asyncio.create_task(self._atender(cliente, mensagem))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._clientes.discard(cliente)
+            cliente.fila.put_nowait(None)
+            await escritor
+            writer.close()
+
+    async def _atender(self, cliente, mensagem):
+        """Uma chamada do pywebview.api vinda do shim."""
+        try:
+            pedido = json.loads(mensagem)
+            id_ = pedido.get("id")
+        except (ValueError, AttributeError):
+            return
+        cliente.chamadas += 1
+        nome = pedido.get("metodo", "")
+        try:
+            if nome not in self._metodos:
+                raise ValueError(f"Método {nome} não existe")
+            resultado = await self._chamar(nome, pedido.get("args") or [])
+            resposta = {"id": id_, "resultado": resultado}
+        except Exception as e:
+            resposta = {"id": id_, "erro": str(e)}
+        cliente.fila.put_nowait(quadro_ws(json.dumps(resposta, default=str).encode()))
+
+    async def _escrever(self, cliente):
+        writer = cliente.writer
+        while True:
+            dados = await cliente.fila.get()
+            if dados is None:
+                return
+            try:
+                writer.write(dados)
+                # junta o que já estiver na fila num único drain
+                while not cliente.fila.empty():
+                    dados = cliente.fila.get_nowait()
+                    if dados is None:
+                        await writer.drain()
+                        return
+                    writer.write(dados)
+                await writer.drain()
+            except (ConnectionError, RuntimeError):
+                return
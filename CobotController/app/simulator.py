@@ -0,0 +1,169 @@
+# simulator.py
+"""
+Simulador do tempo de ciclo das sequências, sem o braço.
+
+Reproduz o que o firmware faz em cada passo (Cobot.ino / servo.cpp):
+- S:M: cada junta anda 1 grau a cada calcularSleep(vel) ms; o passo termina
+  quando a junta mais lenta chega;
+- S:MS: igual até a metade do caminho, depois a velocidade cai a cada grau
+  (map(dif, 1, metade, vel - 6, vel - 1)), com a divisão inteira do firmware;
+- S:W: espera (0 ou menos vira 1000 ms, como no firmware);
+- S:G: garra a 26 (fechar) / 110 (abrir) na velocidade 10 + 100 ms de assentamento;
+- depois de todo passo, MOVE_DELAY.
+
+O tempo de cada (modo, sentido, velocidade, distância) sai de uma tabela
+calculada uma vez; a simulação de N programas é só indexação em arrays (N, passos).
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+MOVE_DELAY_MS = 150             # pausa fixa depois de cada passo
+GARRA_FECHADA, GARRA_ABERTA = 26, 110
+GARRA_INICIAL = 40              # posição da garra ao ligar
+GARRA_ASSENTAMENTO_MS = 100     # espera da garra depois de chegar
+ESPERA_PADRAO_MS = 1000         # S:W com 0 ou menos
+POSICAO_INICIAL = (90, 0, 180, 90, 84)  # juntas ao ligar (servos[] do Cobot.ino)
+NUM_JUNTAS = 5
+
+# códigos dos passos (os mesmos do protocolo: S:M, S:MS, S:W, S:G)
+_CODIGOS = {"M": 0, "MS": 1, "W": 2, "G": 3}
+
+
+def map_esp32(x, in_min, in_max, out_min, out_max):
+    """map() do core ESP32 (aceita arrays): divisão inteira truncada e -1 se in_min == in_max."""
+    if in_max == in_min:
+        return np.full_like(x, -1) if isinstance(x, np.ndarray) else -1
+    q = (x - in_min) * (out_max - out_min)
+    return np.trunc(q / (in_max - in_min)).astype(int) + out_min
+
+
+def calcular_sleep(speed):
+    """ms por grau (calcularSleep do servo.cpp; o parâmetro é uint8_t). Aceita arrays."""
+    speed = np.clip(np.asarray(speed, dtype=int) & 0xFF, 1, 10)
+    sleep = np.clip(map_esp32(speed, 1, 10, 20, 0), 3, 20)
+    return int(sleep) if sleep.ndim == 0 else sleep
+
+
+def _tempo_suave(dist, vel, subindo):
+    """Tempo (ms) de um moveSmooth de `dist` graus, simulado grau a grau como em Servo::update()."""
+    if dist == 0:
+        return 0
+    # posAtivacao = target - dist * 0.5 * direction, truncado para uint8_t
+    alvo = 180 if subindo else 0
+    atual = alvo - dist if subindo else alvo + dist
+    ativacao = int(alvo - dist * 0.5) if subindo else int(alvo + dist * 0.5)
+    metade = abs(alvo - ativacao)
+    vel8 = vel if vel < 128 else vel - 256      # initialSpeed é int8_t
+    baixa = min(max(vel8 - 6, 1), 10)
+
+    # posição antes de cada grau; o sleep recalculado num grau vale para o grau seguinte
+    posicoes = atual + np.arange(dist) * (1 if subindo else -1)
+    ativado = posicoes >= ativacao if subindo else posicoes <= ativacao
+    recalculado = calcular_sleep(map_esp32(np.abs(alvo - posicoes), 1, metade, baixa, vel8 - 1))
+    inicial = calcular_sleep(vel)
+    return inicial + int(np.where(ativado, recalculado, inicial)[:-1].sum())
+
+
+@lru_cache(maxsize=1)
+def tabela_tempos():
+    """(2 modos, 2 sentidos, 11 velocidades, 181 distâncias) -> ms. Calculada uma vez."""
+    t = np.zeros((2, 2, 11, 181))
+    dist = np.arange(181)
+    for vel in range(11):
+        t[0, :, vel] = dist * calcular_sleep(vel)
+        for sentido in (0, 1):
+            t[1, sentido, vel] = [_tempo_suave(d, vel, sentido == 0) for d in dist]
+    return t
+
+
+class Resultado(NamedTuple):
+    tempos: np.ndarray      # (P, S) ms de cada passo (0 depois do fim do programa)
+    total: np.ndarray       # (P,) ms do ciclo
+    passos: np.ndarray      # (P,) passos de cada programa
+
+
+# ============================================================
+# === SIMULAÇÃO EM LOTE ======================================
+# ============================================================
+
+def _preencher(valores, validos, inicial):
+    """
+    Para cada passo, o último valor válido até ele (exclusive), ao longo do eixo 1.
+    valores: (P, S, ...); validos: (P, S); inicial: (P, ...) usado antes do primeiro.
+    """
+    p, s = validos.shape
+    idx = np.where(validos, np.arange(s), -1)
+    idx = np.maximum.accumulate(idx, axis=1)
+    anterior = np.concatenate([np.full((p, 1), -1), idx[:, :-1]], axis=1)
+    saida = valores[np.arange(p)[:, None], np.maximum(anterior, 0)]
+    return np.where((anterior < 0).reshape(anterior.shape + (1,) * (valores.ndim - 2)),
+                    inicial[:, None], saida)
+
+
+def simular_lote(irs, inicio=None):
+    """
+    Simula N sequências de uma vez. irs: lista de listas de passos com os campos
+    op ("M", "MS", "W", "G"), pos, vel, ms e acao (Instrucao do controllers).
+    inicio: posição das juntas antes do primeiro passo; None = regime de loop
+    (o braço começa onde o último movimento do programa termina).
+    """
+    n = len(irs)
+    s = max((len(ir) for ir in irs), default=0)
+    passos = np.array([len(ir) for ir in irs], dtype=int)
+    if n == 0 or s == 0:
+        return Resultado(np.zeros((n, s)), np.zeros(n), passos)
+
+    op = np.full((n, s), -1, dtype=np.int8)
+    pos = np.zeros((n, s, NUM_JUNTAS), dtype=np.int16)
+    vel = np.zeros((n, s), dtype=np.int16)
+    ms = np.zeros((n, s))
+    acao = np.zeros((n, s), dtype=np.int8)
+    for i, ir in enumerate(irs):
+        for j, inst in enumerate(ir):
+            op[i, j] = _CODIGOS[inst.op]
+            if inst.pos:
+                pos[i, j] = inst.pos[:NUM_JUNTAS]
+            vel[i, j] = inst.vel
+            ms[i, j] = inst.ms
+            acao[i, j] = inst.acao
+
+    movimento = (op == 0) | (op == 1)
+    garra = op == 3
+    pos = np.clip(pos, 0, 180)
+    # S:M/S:MS com velocidade 0 ou menos vira 10 no firmware
+    vel = np.where(vel <= 0, 10, np.minimum(vel, 10))
+
+    # posição inicial: a dada, ou a do último movimento (regime de loop)
+    if inicio is not None:
+        pos0 = np.broadcast_to(np.asarray(inicio, dtype=np.int16), (n, NUM_JUNTAS))
+    else:
+        ultimo = np.where(movimento, np.arange(s), -1).max(axis=1)
+        pos0 = np.where((ultimo >= 0)[:, None], pos[np.arange(n), np.maximum(ultimo, 0)],
+                        np.asarray(POSICAO_INICIAL, dtype=np.int16))
+    antes = _preencher(pos, movimento, pos0)
+
+    # movimento: junta mais lenta
+    delta = pos.astype(int) - antes
+    sentido = (delta < 0).astype(int)
+    modo = np.clip(op, 0, 1)[..., None]
+    t_juntas = tabela_tempos()[modo, sentido, vel[..., None], np.abs(delta)]
+    tempos = np.where(movimento, t_juntas.max(axis=2), 0.0)
+
+    # garra: curso desde o último estado + assentamento
+    alvo_garra = np.where(acao == 1, GARRA_FECHADA, GARRA_ABERTA)
+    if inicio is not None:
+        garra0 = np.full(n, GARRA_INICIAL)
+    else:
+        ultima = np.where(garra, np.arange(s), -1).max(axis=1)
+        garra0 = np.where(ultima >= 0, alvo_garra[np.arange(n), np.maximum(ultima, 0)], GARRA_INICIAL)
+    garra_antes = _preencher(alvo_garra, garra, garra0)
+    t_garra = np.abs(alvo_garra - garra_antes) * calcular_sleep(10) + GARRA_ASSENTAMENTO_MS
+    tempos = np.where(garra, t_garra, tempos)
+
+    # espera
+    tempos = np.where(op == 2, np.where(ms <= 0, ESPERA_PADRAO_MS, ms), tempos)
+
+    tempos = np.where(op >= 0, tempos + MOVE_DELAY_MS, 0.0)
+    return Resultado(tempos, tempos.sum(axis=1), passos)
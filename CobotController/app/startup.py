@@ -0,0 +1,45 @@
+# startup.py
+"""
+Linha do tempo da partida do app (tempo até a tela responder).
+
+marcar(fase) registra o instante de cada fase, contado a partir do import
+deste módulo (a primeira coisa que o __main__.py faz), e imprime uma linha
+no log com o total e a duração da fase. A partida termina em "interativo":
+a primeira chamada da tela ao Api (start_monitor, no pywebviewready).
+
+Fases marcadas pelo app: imports, api, janela / servidor, gui, interativo,
+aquecido (o que o Cobot adiou foi carregado em segundo plano).
+"""
+import threading
+from time import perf_counter
+
+_inicio = perf_counter()
+_fases = []                     # [(fase, perf_counter)], na ordem em que aconteceram
+_lock = threading.Lock()
+
+
+def marcar(fase, unica=True):
+    """Registra a fase agora. unica: ignora se ela já foi marcada (ex: start_monitor de novo)."""
+    agora = perf_counter()
+    with _lock:
+        if unica and any(nome == fase for nome, _ in _fases):
+            return
+        anterior = _fases[-1][1] if _fases else _inicio
+        _fases.append((fase, agora))
+    print(f"[partida] {fase:<12} {(agora - _inicio) * 1000:8.1f} ms  (+{(agora - anterior) * 1000:.1f} ms)")
+
+
+def relatorio():
+    """[{"fase", "ms", "duracao_ms"}] na ordem, com o tempo desde o início da partida."""
+    with _lock:
+        fases = list(_fases)
+    saida = []
+    anterior = _inicio
+    for fase, t in fases:
+        saida.append({
+            "fase": fase,
+            "ms": round((t - _inicio) * 1000, 1),
+            "duracao_ms": round((t - anterior) * 1000, 1),
+        })
+        anterior = t
+    return saida
@@ -0,0 +1,289 @@
+# telemetry_recorder.py
+"""
+Gravador de telemetria em arquivo mapeado na memória (caixa-preta do braço).
+
+Cada amostra (#Jn:angle#, #STEP:n#, #SAVEPOS#) vira um registro de tamanho
+fixo num anel: quando enche, a mais antiga é sobrescrita. O arquivo é colunar
+- um cabeçalho e depois as colunas tempos (float64), valores (int32),
+juntas (uint8) e tipos (uint8), cada uma contígua - e é escrito por views
+tipadas do mmap (memoryview.cast): gravar uma amostra são quatro atribuições
+de item e nenhum objeto Python novo (nem tupla, nem registro, nem bytes).
+
+- tempos: segundos na escala do time.time(), mas medidos com perf_counter
+  (monotônico dentro da sessão);
+- valores: ângulo da junta, ou o número do passo (int32, satura em 2^31 - 1);
+  os eventos da sequência usam códigos que nenhum passo tem (0 init, -1 end, -2 underrun);
+- um único escritor (a thread de leitura do SerialManager), sob um lock que
+  fechar() também pega: fechar de outra thread não pega uma escrita no meio;
+  quem lê de outro processo pode ver o registro mais recente pela metade.
+
+reproduzir() devolve uma gravação pelo caminho dos listeners do SerialManager
+(SerialManager.injetar), em tempo real (velocidade=1.0) ou o mais rápido possível;
+os #SAVEPOS# gravados só são reproduzidos se pedidos (eles adicionam pontos).
+
+Uso (a partir de CobotController/):
+    python app/telemetry_recorder.py app/saves/telemetria.bin [--csv saida.csv] [--reproduzir] [--velocidade 0]
+"""
+import mmap
+import os
+import struct
+import time
+from array import array
+from pathlib import Path
+from threading import Event, Lock
+from time import perf_counter
+
+from serial_comm import JointPos, Step, SavePos, SAVEPOS
+
+MAGICO = b"COBOTTEL"
+VERSAO = 1
+CAPACIDADE_PADRAO = 1 << 18         # amostras (~3,5 MB; minutos de telemetria contínua)
+
+TIPO_JUNTA = 0
+TIPO_STEP = 1
+TIPO_SAVEPOS = 2
+
+STEP_ESPECIAL = {0: "init", -1: "end", -2: "underrun"}     # código na coluna de valores -> evento
+STEP_CODIGO = {v: k for k, v in STEP_ESPECIAL.items()}
+_PASSO_MAX = 0x7FFFFFFF
+
+_CABECALHO = struct.Struct("<8sQQQd")   # mágico, versão, capacidade, total, criação (time.time)
+TAMANHO_CABECALHO = 64
+_CAMPO_TOTAL = 3                        # índice do total na view "Q" do cabeçalho
+_BYTES_POR_AMOSTRA = 8 + 4 + 1 + 1      # tempo, valor, junta, tipo
+
+
+def tamanho_arquivo(capacidade):
+    return TAMANHO_CABECALHO + capacidade * _BYTES_POR_AMOSTRA
+
+
+class GravadorTelemetria:
+    def __init__(self, caminho, capacidade=CAPACIDADE_PADRAO):
+        """
+        Abre (ou cria) a gravação. Um arquivo existente continua de onde parou,
+        com a capacidade dele; capacidade é arredondada para múltiplo de 8
+        (alinhamento das colunas).
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        capacidade = max(8, (int(capacidade) + 7) // 8 * 8)
+
+        existente = self.caminho.exists() and self.caminho.stat().st_size >= TAMANHO_CABECALHO
+        self._arquivo = open(self.caminho, "r+b" if existente else "w+b")
+        try:
+            if existente:
+                magico, versao, capacidade, total, criado = _CABECALHO.unpack(self._arquivo.read(_CABECALHO.size))
+                if magico != MAGICO or versao != VERSAO or \
+                        self.caminho.stat().st_size != tamanho_arquivo(capacidade):
+                    raise ValueError(f"{self.caminho} não é uma gravação de telemetria válida")
+            else:
+                total, criado = 0, time.time()
+                self._arquivo.truncate(tamanho_arquivo(capacidade))
+                self._arquivo.write(_CABECALHO.pack(MAGICO, VERSAO, capacidade, 0, criado))
+                self._arquivo.flush()
+            self._mm = mmap.mmap(self._arquivo.fileno(), tamanho_arquivo(capacidade))
+        except Exception:
+            self._arquivo.close()
+            raise
+
+        self.capacidade = capacidade
+        self.criado = criado
+        self._total = total
+        self._pos = total % capacidade
+        # perf_counter() - _origem ~ time.time(), sem os saltos do relógio de parede
+        self._origem = perf_counter() - time.time()
+
+        mv = memoryview(self._mm)
+        inicio = TAMANHO_CABECALHO
+        self._cab = mv[:TAMANHO_CABECALHO].cast("Q")
+        self._tempos = mv[inicio:inicio + 8 * capacidade].cast("d")
+        inicio += 8 * capacidade
+        self._valores = mv[inicio:inicio + 4 * capacidade].cast("i")
+        inicio += 4 * capacidade
+        self._juntas = mv[inicio:inicio + capacidade]
+        inicio += capacidade
+        self._tipos = mv[inicio:inicio + capacidade]
+        self._views = (self._cab, self._tempos, self._valores, self._juntas, self._tipos, mv)
+
+        self._inscritos = []        # (ser, tipo, callback) para desanexar()
+        self._lock = Lock()         # _gravar() x fechar()
+
+    def __len__(self):
+        return min(self._total, self.capacidade)
+
+    @property
+    def total(self):
+        """Amostras gravadas desde a criação do arquivo (inclusive as já sobrescritas)."""
+        return self._total
+
+    # ============================================================
+    # === GRAVAÇÃO ===============================================
+    # ============================================================
+
+    def _gravar(self, tipo, junta, valor):
+        with self._lock:
+            if self._mm.closed:
+                return              # callback que já estava em curso quando fechar() desanexou
+            i = self._pos
+            self._tempos[i] = perf_counter() - self._origem
+            self._valores[i] = valor
+            self._juntas[i] = junta
+            self._tipos[i] = tipo
+            self._pos = i + 1 if i + 1 < self.capacidade else 0
+            self._total += 1
+            self._cab[_CAMPO_TOTAL] = self._total
+
+    def junta(self, msg: JointPos):
+        self._gravar(TIPO_JUNTA, msg.joint, msg.pos)
+
+    def step(self, msg: Step):
+        codigo = STEP_CODIGO.get(msg.step)
+        self._gravar(TIPO_STEP, 0, min(int(msg.step), _PASSO_MAX) if codigo is None else codigo)
+
+    def savepos(self, msg: SavePos):
+        self._gravar(TIPO_SAVEPOS, 0, 0)
+
+    def anexar(self, ser):
+        """Grava as mensagens tipadas que chegam pelo SerialManager."""
+        for tipo, callback in ((JointPos, self.junta), (Step, self.step), (SavePos, self.savepos)):
+            ser.subscribe(tipo, callback)
+            self._inscritos.append((ser, tipo, callback))
+
+    def desanexar(self):
+        for ser, tipo, callback in self._inscritos:
+            ser.unsubscribe(tipo, callback)
+        self._inscritos.clear()
+
+    def sincronizar(self):
+        """Força a escrita das páginas no disco (o SO já faz isso sozinho)."""
+        self._mm.flush()
+
+    def fechar(self):
+        self.desanexar()            # primeiro: nenhuma amostra nova entra
+        with self._lock:
+            if self._mm.closed:
+                return
+            for view in self._views:
+                view.release()
+            self._mm.flush()
+            self._mm.close()
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # ============================================================
+    # === LEITURA ================================================
+    # ============================================================
+
+    def colunas(self, ultimas=None):
+        """
+        Cópia das colunas em ordem cronológica (arrays "d", "i", "B", "B"):
+        {"tempos", "valores", "juntas", "tipos"}. ultimas: só as N mais recentes.
+        """
+        n = len(self) if ultimas is None else min(int(ultimas), len(self))
+        fim = self._pos
+        inicio = (fim - n) % self.capacidade
+        trechos = [(inicio, fim)] if n == 0 or inicio < fim else [(inicio, self.capacidade), (0, fim)]
+
+        saida = {}
+        for nome, view, codigo in (("tempos", self._tempos, "d"), ("valores", self._valores, "i"),
+                                   ("juntas", self._juntas, "B"), ("tipos", self._tipos, "B")):
+            coluna = array(codigo)
+            for a, b in trechos:
+                coluna.frombytes(view[a:b].tobytes())
+            saida[nome] = coluna
+        return saida
+
+    @staticmethod
+    def mensagem(tipo, junta, valor):
+        """(linha, msg) equivalentes ao que o firmware mandou."""
+        if tipo == TIPO_JUNTA:
+            return f"#J{junta + 1}:{valor}#", JointPos(junta, valor)
+        if tipo == TIPO_STEP:
+            step = STEP_ESPECIAL.get(valor, str(valor))
+            return f"#STEP:{step.upper()}#", Step(step)
+        return "#SAVEPOS#", SAVEPOS
+
+    def reproduzir(self, ser, velocidade=1.0, ultimas=None, parar: Event = None, savepos=False):
+        """
+        Entrega a gravação pelo caminho de leitura do ser (listeners, rotas,
+        histórico), como se as linhas chegassem da porta. velocidade: 1.0 = tempo
+        real, 2.0 = o dobro; None/0 = o mais rápido possível. parar: Event que
+        interrompe a reprodução. savepos: também entrega os #SAVEPOS# (no app eles
+        adicionam pontos ao programa aberto). Retorna {"amostras", "duracao_s", "atraso_max_ms"}.
+        """
+        c = self.colunas(ultimas)
+        tempos = c["tempos"]
+        inicio = perf_counter()
+        atraso_max = 0.0
+        enviadas = 0
+        for t, valor, junta, tipo in zip(tempos, c["valores"], c["juntas"], c["tipos"]):
+            if parar is not None and parar.is_set():
+                break
+            if tipo == TIPO_SAVEPOS and not savepos:
+                continue
+            if velocidade:
+                alvo = inicio + (t - tempos[0]) / velocidade
+                espera = alvo - perf_counter()
+                if espera > 0:
+                    if parar is not None:
+                        if parar.wait(espera):
+                            break
+                    else:
+                        time.sleep(espera)
+                else:
+                    atraso_max = max(atraso_max, -espera)
+            ser.injetar(*self.mensagem(tipo, junta, valor))
+            enviadas += 1
+        return {
+            "amostras": enviadas,
+            "duracao_s": round(perf_counter() - inicio, 3),
+            "atraso_max_ms": round(atraso_max * 1000, 3),
+        }
+
+    def exportar_csv(self, destino, ultimas=None):
+        c = self.colunas(ultimas)
+        nomes = {TIPO_JUNTA: "junta", TIPO_STEP: "step", TIPO_SAVEPOS: "savepos"}
+        with open(destino, "w", encoding="utf-8", newline="") as f:
+            f.write("tempo,tipo,junta,valor\n")
+            for t, valor, junta, tipo in zip(c["tempos"], c["valores"], c["juntas"], c["tipos"]):
+                f.write(f"{t:.6f},{nomes.get(tipo, tipo)},{junta + 1 if tipo == TIPO_JUNTA else ''},{valor}\n")
+        return len(c["tempos"])
+
+    def stats(self):
+        return {
+            "caminho": str(self.caminho),
+            "capacidade": self.capacidade,
+            "amostras": len(self),
+            "total": self._total,
+            "sobrescritas": max(0, self._total - self.capacidade),
+            "bytes": tamanho_arquivo(self.capacidade),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from serial_comm import SerialManager
+
+    parser = argparse.ArgumentParser(description="Informações, exportação e reprodução de uma gravação de telemetria")
+    parser.add_argument("arquivo")
+    parser.add_argument("--csv", help="exporta as amostras para este CSV")
+    parser.add_argument("--reproduzir", action="store_true", help="reproduz pelo SerialManager e imprime as linhas")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="1 = tempo real, 0 = o mais rápido possível")
+    parser.add_argument("--ultimas", type=int, default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.arquivo):
+        parser.error(f"{args.arquivo} não existe")
+    with GravadorTelemetria(args.arquivo) as gravacao:
+        print(gravacao.stats())
+        if args.csv:
+            print(f"{gravacao.exportar_csv(args.csv, args.ultimas)} amostras em {args.csv}")
+        if args.reproduzir:
+            ser = SerialManager()
+            ser.add_listener(lambda linha: print(f"<<< {linha}"))
+            print(gravacao.reproduzir(ser, args.velocidade or None, args.ultimas, savepos=True))
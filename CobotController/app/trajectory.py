@@ -0,0 +1,209 @@
+# trajectory.py
+"""
+Movimento linear cartesiano planejado no PC.
+
+No firmware o modo "Linear" vira S:M, que move cada junta independente: a ponta
+da ferramenta não anda em linha reta. Aqui a reta entre dois pontos é amostrada
+a uma taxa fixa, com perfil de velocidade trapezoidal ou em S, e cada amostra
+vira ângulos de servo pela IK em lote (uma chamada para a trajetória toda).
+
+Tudo é calculado antes do movimento começar; durante o movimento o
+StreamerTrajetoria só envia as linhas M:M já prontas, no ritmo do relógio.
+"""
+import threading
+from time import perf_counter
+from typing import NamedTuple
+
+import numpy as np
+
+from inverse_kinematics import SolverIK, ESCALA_ANGULO
+from kinematics import ModeloBraco
+
+TAXA_STREAM = 50            # Hz, amostras enviadas por segundo
+VELOCIDADE_STREAM = 10      # velocidade do M:M (10 = 3 ms/grau no firmware)
+VEL_MAX_JUNTA = 250.0       # graus/s; o firmware segue até ~330 graus/s na velocidade 10
+
+PERFIL_TRAPEZOIDAL = "trapezoidal"
+PERFIL_S = "s"
+
+
+class Trajetoria(NamedTuple):
+    tempos: np.ndarray      # (M,) s desde o início
+    angulos: np.ndarray     # (M, 5) graus de servo
+    alvos: np.ndarray       # (M, 5) [x, y, z, pitch, roll] pedidos
+    erro: np.ndarray        # (M,) erro da IK em mm
+    dt: float
+
+    @property
+    def duracao(self):
+        return float(self.tempos[-1]) if len(self.tempos) else 0.0
+
+    def comandos(self, velocidade=VELOCIDADE_STREAM):
+        """Linhas M:M com ângulos inteiros, uma por amostra."""
+        inteiros = np.rint(self.angulos).astype(int)
+        return [f"M:M:{velocidade}:#{';'.join(map(str, a))}#" for a in inteiros]
+
+
+# ============================================================
+# === PERFIL DE VELOCIDADE ===================================
+# ============================================================
+
+def perfil(distancia, v_max, a_max, dt, tipo=PERFIL_TRAPEZOIDAL):
+    """
+    Amostra o deslocamento s(t) de 0 a `distancia` a cada dt.
+    - trapezoidal: aceleração constante a_max até v_max;
+    - s: aceleração senoidal (pico a_max), sem degrau de aceleração.
+    Se a distância for curta demais para chegar a v_max, o pico de velocidade é reduzido.
+    Retorna (tempos, s), ambos (M,), com o último ponto exatamente em `distancia`.
+    """
+    if distancia <= 0:
+        return np.zeros(1), np.zeros(1)
+    if tipo not in (PERFIL_TRAPEZOIDAL, PERFIL_S):
+        raise ValueError(f"Perfil desconhecido: {tipo}")
+
+    # duração da aceleração: Ta = k * v / a (k = 1 trapezoidal, pi/2 senoidal)
+    k = 1.0 if tipo == PERFIL_TRAPEZOIDAL else np.pi / 2
+    v = min(v_max, np.sqrt(distancia * a_max / k))
+    ta = k * v / a_max
+    d_acel = v * ta / 2                         # percorrido na aceleração (igual nos dois)
+    tc = (distancia - 2 * d_acel) / v           # tempo em velocidade constante
+    total = 2 * ta + tc
+
+    n = int(np.ceil(total / dt))
+    t = np.arange(n + 1) * dt
+    t[-1] = total
+
+    def acelerando(tau):
+        if tipo == PERFIL_TRAPEZOIDAL:
+            return 0.5 * (v / ta) * tau ** 2
+        return 0.5 * v * (tau - ta / np.pi * np.sin(np.pi * tau / ta))
+
+    s = np.where(
+        t < ta, acelerando(np.minimum(t, ta)),
+        np.where(t <= ta + tc, d_acel + v * (t - ta),
+                 distancia - acelerando(np.clip(total - t, 0.0, ta))),
+    )
+    return t, s
+
+
+# ============================================================
+# === PLANEJADOR =============================================
+# ============================================================
+
+def planejar_linear(inicio, fim, velocidade=100.0, aceleracao=400.0, tipo=PERFIL_TRAPEZOIDAL,
+                    taxa=TAXA_STREAM, solver: SolverIK = None, vel_max_junta=VEL_MAX_JUNTA):
+    """
+    Reta cartesiana de `inicio` a `fim` (graus de servo, 5 juntas).
+    velocidade em mm/s e aceleracao em mm/s² da ponta da ferramenta; pitch e roll
+    são interpolados junto (1 grau conta como ESCALA_ANGULO mm).
+    Se alguma junta passar de vel_max_junta, a trajetória é refeita mais devagar.
+    Gera ValueError se algum ponto da reta não tiver solução.
+    """
+    solver = solver or SolverIK(ModeloBraco())
+    inicio = np.asarray(inicio, dtype=float)
+    fim = np.asarray(fim, dtype=float)
+    dt = 1.0 / taxa
+
+    p = solver.modelo.poses(np.stack([inicio, fim]))[:, [0, 1, 2, 4, 5]]
+    delta = p[1] - p[0]
+    delta[3:] = (delta[3:] + 180.0) % 360.0 - 180.0     # menor giro de pitch/roll
+    comprimento = max(np.linalg.norm(delta[:3]), np.abs(delta[3:]).max() * ESCALA_ANGULO)
+
+    for _ in range(4):
+        tempos, s = perfil(comprimento, velocidade, aceleracao, dt, tipo)
+        frac = s / comprimento if comprimento > 0 else np.ones_like(s)
+        alvos = p[0] + frac[:, None] * delta
+        # semente: interpolação linear das juntas (mantém o mesmo ramo da IK)
+        semente = inicio + frac[:, None] * (fim - inicio)
+
+        angulos, erro, ok = solver.resolver(alvos, semente)
+        if not np.all(ok):
+            i = int(np.argmin(ok))
+            raise ValueError(f"Ponto {i} da reta fora do alcance: {np.round(alvos[i], 1).tolist()}")
+        angulos[-1] = fim
+
+        pico = np.abs(np.diff(angulos, axis=0)).max(initial=0.0) / dt
+        if pico <= vel_max_junta:
+            break
+        # perto de singularidade a junta dispara: reduz a velocidade da ponta na mesma proporção
+        fator = vel_max_junta / pico * 0.95
+        velocidade *= fator
+        aceleracao *= fator
+    else:
+        raise ValueError(f"Junta a {pico:.0f} graus/s mesmo com a ponta a {velocidade:.1f} mm/s")
+
+    return Trajetoria(tempos, angulos, alvos, erro, dt)
+
+
+# ============================================================
+# === ENVIO EM TAXA FIXA =====================================
+# ============================================================
+
+class StreamerTrajetoria:
+    """
+    Envia as linhas de uma Trajetoria pelo SerialManager, uma a cada dt, numa
+    thread com horário absoluto (o atraso de um envio não se acumula nos seguintes).
+    Amostras que repetem a anterior (mesmos ângulos inteiros) não são enviadas.
+    """
+    def __init__(self, ser):
+        self._ser = ser
+        self._thread = None
+        self._parar = threading.Event()
+        self.enviados = 0
+        self.repetidos = 0
+        self.atraso_max_ms = 0.0
+
+    @property
+    def ativo(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def executar(self, trajetoria: Trajetoria, velocidade=VELOCIDADE_STREAM):
+        if self.ativo:
+            raise RuntimeError("Já existe uma trajetória em execução")
+        linhas = trajetoria.comandos(velocidade)
+        self._parar.clear()
+        self.enviados = self.repetidos = 0
+        self.atraso_max_ms = 0.0
+        self._thread = threading.Thread(
+            target=self._loop, args=(linhas, trajetoria.tempos.tolist()), daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def aguardar(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+        return not self.ativo
+
+    def _loop(self, linhas, tempos):
+        anterior = None
+        inicio = perf_counter()
+        for linha, t in zip(linhas, tempos):
+            resto = inicio + t - perf_counter()
+            if resto > 0 and self._parar.wait(resto):
+                return
+            if self._parar.is_set():
+                return
+            self.atraso_max_ms = max(self.atraso_max_ms, -resto * 1000)
+            if linha == anterior:
+                self.repetidos += 1
+                continue
+            try:
+                self._ser.enviar(linha)
+            except Exception as e:
+                print("Erro ao enviar trajetória:", e)
+                return
+            anterior = linha
+            self.enviados += 1
+
+    def stats(self):
+        return {
+            "ativo": self.ativo,
+            "enviados": self.enviados,
+            "repetidos": self.repetidos,
+            "atraso_max_ms": round(self.atraso_max_ms, 3),
+        }
@@ -0,0 +1,124 @@
+# ui_channel.py
+"""
+Canal de atualização da interface com coalescência e limite de taxa.
+
+A telemetria (#Jn:angle#, #STEP:n#) chega muito mais rápido do que a tela
+precisa. Em vez de um evaluate_js por linha, o canal guarda só o último valor
+de cada junta e o último step, e a cada quadro (ex: 30 Hz) envia tudo numa
+única chamada. Chamadas avulsas (setPoints, carregarPortas...) são enviadas na hora.
+
+As chamadas são passadas ao destino como lista de (função, argumentos);
+formatar_js() converte para o código JS usado pelo pywebview.
+"""
+import json
+import threading
+from time import monotonic, sleep
+
+UI_HZ = 30  # quadros por segundo padrão
+
+
+def formatar_js(chamadas):
+    """[("setJointPos", (0, 90)), ("setPoints", ())] -> 'setJointPos(0, 90);setPoints()'"""
+    return ";".join(
+        f"{fn}({', '.join(json.dumps(a) for a in args)})" for fn, args in chamadas
+    )
+
+
+class UiChannel:
+    def __init__(self, enviar, hz=UI_HZ):
+        """
+        enviar: função que recebe a lista de chamadas [(fn, args), ...] e entrega
+        para a interface (ex: lambda c: window.evaluate_js(formatar_js(c))).
+        """
+        self._enviar = enviar
+        self.hz = hz
+        self._juntas = {}           # junta -> última posição ainda não enviada
+        self._step = None           # último step ainda não enviado
+        self._lock = threading.Lock()
+        self._pendente = threading.Event()
+        self._running = False
+        self._thread = None
+
+        # contadores para ajuste da taxa
+        self.recebidas = 0          # atualizações de telemetria recebidas
+        self.mescladas = 0          # sobrescritas antes de irem para a tela
+        self.descartadas = 0        # perdidas por erro no envio
+        self.quadros = 0            # chamadas agrupadas enviadas
+
+    # --- Ciclo de envio ---
+    def iniciar(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._running = False
+        self._pendente.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _loop(self):
+        while self._running:
+            # dorme até existir algo para enviar (nada de CPU com o braço parado)
+            self._pendente.wait()
+            if not self._running:
+                break
+            inicio = monotonic()
+            self.flush()
+            # limita a taxa: no máximo um quadro a cada 1/hz segundos
+            resto = 1.0 / self.hz - (monotonic() - inicio)
+            if resto > 0:
+                sleep(resto)
+
+    def flush(self):
+        """Envia numa única chamada tudo o que estiver pendente."""
+        with self._lock:
+            self._pendente.clear()
+            juntas, self._juntas = self._juntas, {}
+            step, self._step = self._step, None
+
+        chamadas = [("setJointPos", (j, pos)) for j, pos in juntas.items()]
+        if step is not None:
+            chamadas.append(("setStep", (json.dumps({"step": step}),)))
+        if not chamadas:
+            return
+        try:
+            self._enviar(chamadas)
+            self.quadros += 1
+        except Exception as e:
+            self.descartadas += len(chamadas)
+            print("Erro ao atualizar interface:", e)
+
+    # --- Atualizações coalescidas ---
+    def set_joint_pos(self, joint, pos):
+        with self._lock:
+            self.recebidas += 1
+            if joint in self._juntas:
+                self.mescladas += 1
+            self._juntas[joint] = pos
+        self._pendente.set()
+
+    def set_step(self, step):
+        with self._lock:
+            self.recebidas += 1
+            if self._step is not None:
+                self.mescladas += 1
+            self._step = step
+        self._pendente.set()
+
+    # --- Chamadas imediatas ---
+    def chamar(self, fn, *args):
+        """Chama uma função JS na hora (eventos raros, fora da telemetria)."""
+        self._enviar([(fn, args)])
+
+    def stats(self):
+        return {
+            "hz": self.hz,
+            "recebidas": self.recebidas,
+            "mescladas": self.mescladas,
+            "descartadas": self.descartadas,
+            "quadros": self.quadros,
+        }
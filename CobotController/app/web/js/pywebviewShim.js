@@ -0,0 +1,66 @@
+// pywebviewShim.js
+// Modo headless (python -m app --headless, ver server.py): cria o mesmo
+// window.pywebview.api do pywebview, mas cada chamada vai pelo WebSocket.
+// As atualizações da tela (setJointPos, setStep, setPoints...) chegam pelo
+// mesmo socket e chamam as funções globais da página, como o evaluate_js fazia.
+(() => {
+    // token da sessão: posto pelo servidor no <script> que carrega este arquivo
+    // (loopback) ou, numa estação remota, no ?token= da URL aberta pelo operador
+    const token = document.currentScript.dataset.token
+        || new URLSearchParams(location.search).get('token') || '';
+    const pendentes = new Map();
+    let proximoId = 1;
+    let socket = null;
+    let fila = [];          // chamadas feitas antes do socket abrir
+    let pronto = false;
+
+    function conectar() {
+        const protocolo = location.protocol === 'https:' ? 'wss' : 'ws';
+        socket = new WebSocket(`${protocolo}://${location.host}/ws?token=${encodeURIComponent(token)}`);
+
+        socket.onopen = () => {
+            fila.forEach((msg) => socket.send(msg));
+            fila = [];
+            if (!pronto) {
+                pronto = true;
+                window.dispatchEvent(new Event('pywebviewready'));
+            }
+        };
+
+        socket.onmessage = (evento) => {
+            const msg = JSON.parse(evento.data);
+            if (msg.chamadas) {
+                for (const [fn, args] of msg.chamadas) {
+                    if (typeof window[fn] === 'function') window[fn](...args);
+                }
+                return;
+            }
+            const pedido = pendentes.get(msg.id);
+            if (!pedido) return;
+            pendentes.delete(msg.id);
+            if ('erro' in msg) pedido.reject(new Error(msg.erro));
+            else pedido.resolve(msg.resultado);
+        };
+
+        socket.onclose = () => {
+            for (const pedido of pendentes.values()) pedido.reject(new Error('Conexão com o servidor perdida'));
+            pendentes.clear();
+            setTimeout(conectar, 1000);
+        };
+    }
+
+    function chamar(metodo, args) {
+        return new Promise((resolve, reject) => {
+            const id = proximoId++;
+            pendentes.set(id, { resolve, reject });
+            const msg = JSON.stringify({ id, metodo, args });
+            if (socket && socket.readyState === WebSocket.OPEN) socket.send(msg);
+            else fila.push(msg);
+        });
+    }
+
+    window.pywebview = {
+        api: new Proxy({}, { get: (_, metodo) => (...args) => chamar(metodo, args) }),
+    };
+    conectar();
+})();
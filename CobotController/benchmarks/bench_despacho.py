@@ -0,0 +1,118 @@
+# bench_despacho.py
+"""
+Microbenchmark do caminho linha -> callbacks do Api, sem porta serial.
+
+- "antes": os 4 listeners antigos do Api recebem todas as linhas e cada um
+  faz sua própria busca/replace/split (log com print(flush=True)).
+- "depois": a linha é interpretada uma vez (interpretar_linha) e entregue pela
+  tabela de rotas só para quem se inscreveu no tipo.
+
+A saída do log vai para os.devnull e evaluate_js é um no-op, para medir só o Python.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_despacho.py [--linhas 200000]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from serial_comm import SerialManager, JointPos, Step, SavePos  # noqa: E402
+
+
+class _JanelaFalsa:
+    def evaluate_js(self, code):
+        pass
+
+
+window = _JanelaFalsa()
+joint_pos = [90, 30, 152, 90, 84]
+
+
+def gerar_linhas(n):
+    """Telemetria típica com M:LM:1: muitas #Jn, alguns steps e texto de log."""
+    base = [f"#J{j}:{90 + j}#" for j in range(1, 7)]
+    base += ["#STEP:3#", "J1 | Ang: 90 | Feedback: 91", "DONE"]
+    return [base[i % len(base)] for i in range(n)]
+
+
+# --- Listeners antigos (cópia do Api antes da tabela de rotas) ---
+def antigo_log(data):
+    print(f"<<< {data}", end="\n", flush=True)
+
+
+def antigo_steps(string):
+    if "#STEP" in string:
+        step = dict([string.replace('#', '').lower().split(':')])
+        window.evaluate_js(f"setStep('{json.dumps(step)}')")
+
+
+def antigo_savepos(string):
+    if "#SAVEPOS#" in string:
+        window.evaluate_js('setPoints();')
+
+
+def antigo_jointpos(string):
+    if ("#J" in string):
+        joint, pos = string.replace('#', '').split(':')
+        joint = int(joint[1]) - 1
+        if (joint < 5):
+            pos = int(pos)
+            joint_pos[joint] = pos
+            window.evaluate_js(f"setJointPos({joint}, {pos})")
+
+
+# --- Listeners novos ---
+def novo_log(data):
+    sys.stdout.write(f"<<< {data}\n")
+
+
+def novo_steps(msg):
+    step = {"step": msg.step}
+    window.evaluate_js(f"setStep('{json.dumps(step)}')")
+
+
+def novo_savepos(msg):
+    window.evaluate_js('setPoints();')
+
+
+def novo_jointpos(msg):
+    if msg.joint < 5:
+        joint_pos[msg.joint] = msg.pos
+        window.evaluate_js(f"setJointPos({msg.joint}, {msg.pos})")
+
+
+def medir(ser, linhas):
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        t0 = perf_counter()
+        for linha in linhas:
+            ser._notify_listeners(linha)
+        dt = perf_counter() - t0
+    return len(linhas) / dt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=200000)
+    args = parser.parse_args()
+    linhas = gerar_linhas(args.linhas)
+
+    antes = SerialManager()
+    for f in (antigo_log, antigo_steps, antigo_savepos, antigo_jointpos):
+        antes.add_listener(f)
+
+    depois = SerialManager()
+    depois.add_listener(novo_log)
+    depois.subscribe(Step, novo_steps)
+    depois.subscribe(SavePos, novo_savepos)
+    depois.subscribe(JointPos, novo_jointpos)
+
+    a = medir(antes, linhas)
+    d = medir(depois, linhas)
+    print(f"antes : {a:12,.0f} linhas/s")
+    print(f"depois: {d:12,.0f} linhas/s  ({d / a:.2f}x)")
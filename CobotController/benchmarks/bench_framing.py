@@ -0,0 +1,93 @@
+# bench_framing.py
+"""
+Decodificação do protocolo binário (framing.py) contra o texto, sem porta serial.
+
+O mesmo fluxo de mensagens (telemetria #Jn#, passos e respostas do M:P) é
+gerado nos dois formatos e entregue em blocos, como a thread de leitura recebe:
+- texto: SeparadorLinhas + interpretar_linha (o caminho do SerialManager);
+- binário: DecodificadorQuadros.alimentar (quadros já saem tipados, com CRC e seq).
+Mede mensagens/s e bytes por mensagem; também o tamanho dos comandos M:M.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_framing.py [--mensagens 200000] [--bloco 256]
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from framing import DecodificadorQuadros, codificar_comando, quadro_junta, quadro_juntas, quadro_step  # noqa: E402
+from serial_comm import SeparadorLinhas, interpretar_linha  # noqa: E402
+
+
+def gerar(n):
+    """(texto, binário, mensagens) do mesmo fluxo: a cada 50 #Jn, um passo e um M:P."""
+    texto, binario = [], []
+    mensagens = seq = i = 0
+    while mensagens < n:
+        if i % 50 == 49:
+            texto.append(f"#STEP:{i // 50 + 1}#\r\n")
+            binario.append(quadro_step(i // 50 + 1, seq))
+            angulos = [90, 30, 152, 90, 84, 110]
+            texto.extend(f"#J{j + 1}:{a}#\r\n" for j, a in enumerate(angulos))
+            binario.append(quadro_juntas(angulos, seq + 1))
+            mensagens += 7
+            seq += 2
+        else:
+            junta, angulo = i % 5 + 1, i % 181
+            texto.append(f"#J{junta}:{angulo}#\r\n")
+            binario.append(quadro_junta(junta, angulo, seq))
+            mensagens += 1
+            seq += 1
+        i += 1
+    return "".join(texto).encode(), b"".join(binario), mensagens
+
+
+def blocos(dados, tamanho):
+    return [dados[i:i + tamanho] for i in range(0, len(dados), tamanho)]
+
+
+def medir_texto(dados, bloco):
+    separador = SeparadorLinhas()
+    partes = blocos(dados, bloco)
+    n = 0
+    t0 = perf_counter()
+    for parte in partes:
+        for linha in separador.alimentar(parte.decode(errors="ignore")):
+            interpretar_linha(linha)
+            n += 1
+    return n, perf_counter() - t0
+
+
+def medir_binario(dados, bloco):
+    decodificador = DecodificadorQuadros()
+    partes = blocos(dados, bloco)
+    n = 0
+    t0 = perf_counter()
+    for parte in partes:
+        n += len(decodificador.alimentar(parte))
+    dt = perf_counter() - t0
+    assert decodificador.erros_crc == 0 and decodificador.perdidos == 0, decodificador.stats()
+    return n, dt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mensagens", type=int, default=200000)
+    parser.add_argument("--bloco", type=int, default=256, help="bytes por read() simulado")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    texto, binario, total = gerar(args.mensagens)
+    resultados = {}
+    for nome, dados, medir in (("texto", texto, medir_texto), ("binario", binario, medir_binario)):
+        melhor = min((medir(dados, args.bloco) for _ in range(args.repeticoes)), key=lambda r: r[1])
+        n, dt = melhor
+        resultados[nome] = n / dt
+        print(f"{nome:8s}: {n / dt:12,.0f} mensagens/s  {len(dados) / total:5.2f} bytes/mensagem")
+    print(f"binário/texto: {resultados['binario'] / resultados['texto']:.2f}x")
+
+    comando = "M:M:10:#90;30;152;90;84#"
+    print(f"M:M (5 juntas): texto {len(comando) + 1} bytes, quadro {len(codificar_comando(comando, 0))} bytes")
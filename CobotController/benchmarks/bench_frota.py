@@ -0,0 +1,111 @@
+# bench_frota.py
+"""
+Custo da Frota (fleet.py) com N braços emulados, no modo seletor (uma thread
+para todas as portas) e no modo threads (uma thread de leitura por porta).
+
+Os emuladores rodam num processo filho (este mesmo script com --filho), para
+que a CPU medida seja só a do controlador. Cada braço manda telemetria
+contínua; mede-se a CPU do processo por segundo, as threads, a memória Python
+alocada pela frota (tracemalloc) e a defasagem do início sincronizado.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_frota.py [--bracos 1,2,4,8,16] [--taxa 500] [--segundos 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+from time import perf_counter, process_time, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fleet import Frota, MODO_SELETOR, MODO_THREADS  # noqa: E402
+from serial_comm import JointPos  # noqa: E402
+
+PROGRAMA = {
+    "points": {"0": [90, 40, 150, 90, 84], "1": [100, 30, 152, 80, 84]},
+    "commands": [{"type": "mover", "params": {"point": i % 2, "mode": "Linear", "speed": 100}} for i in range(10)],
+}
+
+
+def filho(n, taxa):
+    """Processo dos emuladores: imprime as portas e roda até o stdin fechar."""
+    from fake_esp32 import EmuladorESP32
+    emuladores = [EmuladorESP32() for _ in range(n)]
+    print(json.dumps([e.porta for e in emuladores]), flush=True)
+    sys.stdin.readline()    # espera o pai pedir a telemetria
+    for e in emuladores:
+        e.transmitir_telemetria(taxa)
+    sys.stdin.readline()
+    for e in emuladores:
+        e.fechar()
+
+
+def medir(modo, n, taxa, segundos, pasta):
+    proc = subprocess.Popen([sys.executable, __file__, "--filho", str(n), "--taxa", str(taxa)],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    portas = json.loads(proc.stdout.readline())
+
+    threads_antes = threading.active_count()
+    tracemalloc.start()
+    frota = Frota(pasta, modo)
+    frota.adicionar_varias(portas, 500000)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    carregados = frota.carregar(PROGRAMA)
+    recebidas = [0]
+
+    def contar(porta, msg):
+        recebidas[0] += 1
+
+    frota.barramento.inscrever(JointPos, contar)
+    sincronia = frota.iniciar_sincronizado()
+    frota.parar()
+
+    proc.stdin.write("\n")
+    proc.stdin.flush()
+    sleep(0.5)
+    recebidas[0] = 0
+    cpu, t = process_time(), perf_counter()
+    sleep(segundos)
+    cpu, t = process_time() - cpu, perf_counter() - t
+    linhas = recebidas[0]
+    threads = threading.active_count() - threads_antes
+
+    frota.fechar()
+    proc.stdin.write("\n")
+    proc.stdin.flush()
+    proc.wait(timeout=10)
+    return {
+        "cpu_pct": round(cpu / t * 100, 1),
+        "linhas_s": round(linhas / t),
+        "threads": threads,
+        "memoria_kb": round(memoria / 1024),
+        "upload_ok": sum(r["enviado"] for r in carregados.values()),
+        "defasagem_us": sincronia["defasagem_us"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bracos", default="1,2,4,8,16")
+    parser.add_argument("--taxa", type=int, default=500, help="linhas de telemetria por segundo por braço")
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--filho", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        filho(args.filho, args.taxa)
+        sys.exit(0)
+
+    print(f"telemetria: {args.taxa} linhas/s por braço")
+    for n in map(int, args.bracos.split(",")):
+        for modo in (MODO_THREADS, MODO_SELETOR):
+            with tempfile.TemporaryDirectory() as pasta:
+                r = medir(modo, n, args.taxa, args.segundos, pasta)
+            print(f"{n:3d} braços {modo:8s}: {r}")
@@ -0,0 +1,93 @@
+# bench_ik.py
+"""
+Mede a IK (SolverIK) com N poses alcançáveis geradas por FK de ângulos aleatórios.
+
+- analítica: solução fechada (caminho normal com a tabela DH padrão);
+- dls: só o Jacobiano amortecido, semente = ângulos reais + ruído;
+- grade: a busca de app/testes/interpolação.py (a abordagem que a IK substitui),
+  portada para o braço: todos os ângulos inteiros de semente - 10 a semente + 9
+  nas juntas variadas e fica a combinação de menor soma dos erros absolutos.
+  "grade 2" varia só ombro e cotovelo (como o script, braço planar de 2 elos,
+  400 FK por pose); "grade 5" varia as 5 juntas (20^5 = 3,2 milhões de FK por
+  pose, em blocos vetorizados). Os ângulos ficam dentro dos limites dos servos.
+
+Reporta poses/s, erro mediano/máximo (mm) e a fração dentro da tolerância.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_ik.py [--poses 5000] [--ruido 10]
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from kinematics import ModeloBraco, NUM_JUNTAS  # noqa: E402
+from inverse_kinematics import SolverIK, TOL_MM, ESCALA_ANGULO  # noqa: E402
+
+OMBRO_COTOVELO = (1, 2)     # as duas juntas do braço planar de interpolação.py
+
+
+def busca_grade(modelo, solver, alvo, semente, juntas=range(NUM_JUNTAS), raio=10):
+    """
+    Busca de interpolação.py: para cada junta variada, range(original - raio,
+    original + raio) (as outras ficam na semente); score = soma dos erros
+    absolutos (lá |x3 - x3_target| + |y3 - y3_orig|; aqui x, y, z, pitch, roll).
+    """
+    base = np.round(semente)
+    faixas = [np.clip(np.arange(base[j] - raio, base[j] + raio), *modelo.limites[j]) if j in juntas
+              else base[j:j + 1] for j in range(NUM_JUNTAS)]
+    faixas = [np.unique(f) for f in faixas]
+    alvo = alvo.copy()
+    alvo[3:] *= ESCALA_ANGULO
+    melhor_score, melhor = np.inf, base
+    for a0 in faixas[0]:    # um bloco por ângulo da primeira junta (limita a memória)
+        grade = np.stack(np.meshgrid([a0], *faixas[1:], indexing="ij"), -1).reshape(-1, NUM_JUNTAS)
+        score = np.abs(solver._diferenca(alvo[None], solver._tarefa(grade))).sum(axis=1)
+        i = int(np.argmin(score))
+        if score[i] < melhor_score:
+            melhor_score, melhor = score[i], grade[i]
+    return melhor
+
+
+def resumo(nome, n, dt, erro):
+    print(f"{nome:10s} | {n / dt:10.1f} poses/s | erro mediano {np.median(erro):8.3f} mm"
+          f" | máximo {np.max(erro):8.3f} mm | dentro de {TOL_MM} mm: {np.mean(erro <= TOL_MM):.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--poses", type=int, default=5000)
+    parser.add_argument("--ruido", type=float, default=10.0, help="desvio da semente em graus")
+    parser.add_argument("--grade2", type=int, default=200, help="poses para a grade de 2 juntas")
+    parser.add_argument("--grade5", type=int, default=3, help="poses para a grade de 5 juntas (~10 s cada)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    modelo = ModeloBraco()
+    reais = rng.uniform(0, 180, (args.poses, NUM_JUNTAS))
+    alvos = modelo.poses(reais)[:, [0, 1, 2, 4, 5]]
+    semente = np.clip(reais + rng.normal(0, args.ruido, reais.shape), 0, 180)
+
+    solver = SolverIK(modelo)
+    t0 = perf_counter()
+    _, erro, _ = solver.resolver(alvos, semente)
+    resumo("analítica", args.poses, perf_counter() - t0, erro)
+
+    solver_dls = SolverIK(modelo)
+    solver_dls._analitica = False
+    t0 = perf_counter()
+    _, erro, _ = solver_dls.resolver(alvos, semente)
+    resumo("dls", args.poses, perf_counter() - t0, erro)
+
+    for nome, n, juntas in (("grade 2", args.grade2, OMBRO_COTOVELO), ("grade 5", args.grade5, range(NUM_JUNTAS))):
+        n = min(n, args.poses)
+        if not n:
+            continue
+        t0 = perf_counter()
+        q = np.array([busca_grade(modelo, solver, alvos[i], semente[i], juntas) for i in range(n)])
+        dt = perf_counter() - t0
+        resumo(nome, n, dt, solver._erro(q, alvos[:n]))
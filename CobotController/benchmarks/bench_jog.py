@@ -0,0 +1,112 @@
+# bench_jog.py
+"""
+Compara o jog antigo (a tela reenviando J<n>:S:<passo> com um timer relativo
+de 30 ms, aqui uma thread com sleep(0.03) chamando o Api.enviar) com o
+JogController (jog.py), com e sem carga de CPU em outras threads (a tela e a
+telemetria disputando o GIL).
+
+Mede, no lado do firmware (EmuladorESP32), o intervalo entre os comandos de
+jog recebidos e quantos graus a junta andou em cada segundo de botão pressionado.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_jog.py [--segundos 3] [--carga 4]
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+from fake_esp32 import EmuladorESP32  # noqa: E402
+
+
+class _JanelaFalsa:
+    def evaluate_js(self, code):
+        pass
+
+
+class _Emulador(EmuladorESP32):
+    """Guarda o horário de chegada de cada comando de jog."""
+    def __init__(self):
+        super().__init__()
+        self.jogs = []
+
+    def _processar_linha(self, linha):
+        if linha.startswith("J1:S:"):
+            self.jogs.append(perf_counter())
+        super()._processar_linha(linha)
+
+
+def _carga(parar):
+    while not parar.is_set():
+        sum(i * i for i in range(2000))
+
+
+def medir(modo, segundos, carga, pasta):
+    main.window = _JanelaFalsa()
+    fake = _Emulador()
+    api = main.Api(saves_path=pasta)
+    api.conectar(fake.porta, 500000)
+    api.enviar("J1:M:10:10")        # longe do limite nos dois sentidos
+    sleep(2.0)
+
+    parar = threading.Event()
+    cargas = [threading.Thread(target=_carga, args=(parar,), daemon=True) for _ in range(carga)]
+    for t in cargas:
+        t.start()
+
+    inicio_pos = api.cobot.joint_pos[0]
+    inicio = perf_counter()
+    if modo == "antigo":
+        def setinterval():
+            api.enviar("J1:S:1")
+            sleep(0.2)
+            while not parar.is_set() and perf_counter() - inicio < segundos:
+                api.enviar("J1:S:1")
+                sleep(0.03)
+        t = threading.Thread(target=setinterval, daemon=True)
+        t.start()
+        t.join()
+    else:
+        api.start_jog(1, 1)
+        while perf_counter() - inicio < segundos:
+            sleep(0.15)
+            api.manter_jog()
+        api.stop_jog()
+    parar.set()
+    sleep(0.3)
+
+    intervalos = [(b - a) * 1000 for a, b in zip(fake.jogs[1:], fake.jogs[2:])]  # depois do atraso inicial
+    graus = api.cobot.joint_pos[0] - inicio_pos
+    api.desconectar()
+    api._ui.parar()
+    fake.fechar()
+    ordenados = sorted(intervalos)
+    return {
+        "comandos": len(fake.jogs),
+        "graus_s": round(graus / segundos, 1),
+        "intervalo_medio_ms": round(statistics.mean(intervalos), 2),
+        "intervalo_p95_ms": round(ordenados[int(0.95 * len(ordenados))], 2),
+        "intervalo_max_ms": round(ordenados[-1], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--carga", type=int, default=4, help="threads de carga de CPU")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for carga in (0, args.carga):
+            for modo in ("antigo", "jog"):
+                with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+                    r = medir(modo, args.segundos, carga, os.path.join(pasta, f"{modo}{carga}"))
+                print(f"{modo:6s} carga={carga}: {r}")
@@ -0,0 +1,78 @@
+# bench_leitor_serial.py
+"""
+Compara o leitor por polling (in_waiting + sleep 1 ms) com o leitor por eventos
+(read() bloqueante) do SerialManager, usando um ESP32 falso em pty.
+
+Mede:
+- CPU do processo com o braço parado (nenhum byte chegando);
+- CPU e latência por linha (envio no pty -> listener) com telemetria contínua.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_leitor_serial.py [--linhas 5000] [--taxa 1000] [--ocioso 3]
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter, process_time, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from serial_comm import SerialManager, LEITURA_EVENTOS, LEITURA_POLLING  # noqa: E402
+from fake_esp32 import FakeESP32  # noqa: E402
+
+
+def medir(modo, linhas, taxa, ocioso):
+    fake = FakeESP32()
+    ser = SerialManager()
+
+    enviados = {}
+    latencias = []
+
+    def on_linha(linha):
+        t = perf_counter()
+        i = int(linha.strip("#").split(":")[1])
+        latencias.append(t - enviados[i])
+
+    ser.add_listener(on_linha)
+    ser.conectar(fake.porta, modo_leitura=modo, espera=0)   # o FakeESP32 não responde ao M:P
+
+    # --- Ocioso ---
+    cpu0, t0 = process_time(), perf_counter()
+    sleep(ocioso)
+    cpu_ocioso = (process_time() - cpu0) / (perf_counter() - t0)
+
+    # --- Telemetria contínua ---
+    cpu0, t0 = process_time(), perf_counter()
+    fake.transmitir_telemetria(taxa, linhas, on_envio=enviados.__setitem__).join()
+    limite = perf_counter() + 2.0
+    while len(latencias) < linhas and perf_counter() < limite:
+        sleep(0.01)
+    cpu_stream = (process_time() - cpu0) / (perf_counter() - t0)
+
+    ser.desconectar()
+    fake.fechar()
+
+    latencias.sort()
+    ms = [x * 1000 for x in latencias] or [float("nan")]
+    return {
+        "modo": modo,
+        "cpu_ocioso_%": round(cpu_ocioso * 100, 2),
+        "cpu_stream_%": round(cpu_stream * 100, 2),
+        "linhas_recebidas": len(latencias),
+        "lat_p50_ms": round(statistics.median(ms), 3),
+        "lat_p99_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 3),
+        "lat_max_ms": round(ms[-1], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=5000)
+    parser.add_argument("--taxa", type=int, default=1000, help="linhas por segundo")
+    parser.add_argument("--ocioso", type=float, default=3.0, help="segundos medindo CPU parado")
+    args = parser.parse_args()
+
+    for modo in (LEITURA_POLLING, LEITURA_EVENTOS):
+        r = medir(modo, args.linhas, args.taxa, args.ocioso)
+        print(" | ".join(f"{k}: {v}" for k, v in r.items()))
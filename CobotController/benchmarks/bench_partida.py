@@ -0,0 +1,112 @@
+# bench_partida.py
+"""
+Partida a frio do app: cada rodada é um processo Python novo (este script com
+--filho), sem nada em cache de import, com os saves numa pasta temporária.
+
+Modos:
+- adiado: como o app parte hoje (numpy, banco de programas e cache de planos
+  só no primeiro uso; Cobot.aquecer() depois que a tela responde);
+- ansioso: tudo carregado antes do Api ficar pronto (como antes da carga adiada).
+
+Mede, pela linha do tempo de startup.py: imports, Api criado, "interativo"
+(start_monitor, a primeira chamada da tela) e o aquecimento em segundo plano;
+e o conectar() num EmuladorESP32, que responde ao M:P na hora (sem o reset da
+placa real; lá a espera é o boot até o banner do setup(), ~1 s, no lugar
+do sleep(2) fixo).
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_partida.py [--rodadas 5] [--programas 200]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+MODOS = ("ansioso", "adiado")
+
+
+def filho(modo, pasta, porta):
+    """Uma partida; a última linha do stdout é o JSON com as fases."""
+    import startup
+    if modo == "ansioso":
+        import inverse_kinematics, trajectory, simulator  # noqa: F401, E401
+    import main
+    startup.marcar("imports")
+
+    api = main.Api(saves_path=pasta, enviar_ui=lambda chamadas: None)
+    if modo == "ansioso":
+        api.cobot.aquecer()
+    startup.marcar("api")
+    api.start_monitor()                 # marca "interativo"
+    if modo == "adiado":
+        main._aquecer(api)              # no app roda em segundo plano; aqui, em série para medir
+    api.load_slots()
+    startup.marcar("slots")
+
+    conexao = api.conectar(porta, 500000)
+    startup.marcar("conectado")
+    fases = {f["fase"]: f for f in startup.relatorio()}
+    api.desconectar()
+    api.cobot._store.fechar()
+    print(json.dumps({
+        "fases": fases,
+        "espera_firmware_ms": conexao["dados"].get("espera_firmware_ms"),
+    }))
+
+
+def preparar(pasta, programas):
+    """Banco com `programas` slots, para a abertura/migração ter o que ler."""
+    from controllers import Cobot
+    from serial_comm import SerialManager
+    cobot = Cobot(SerialManager(), pasta)
+    dom = json.dumps({"points": {str(i): [90, 40 + i % 10, 150, 90, 84] for i in range(10)},
+                      "commands": [{"type": "mover", "params": {"point": i % 10, "mode": "Linear", "speed": 100}}
+                                   for i in range(30)]})
+    for i in range(programas):
+        cobot.create_slot(f"programa {i}", dom)
+    cobot._store.fechar()
+
+
+def rodar(modo, pasta, porta):
+    saida = subprocess.run([sys.executable, __file__, "--filho", modo, "--pasta", pasta, "--porta", porta],
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--programas", type=int, default=200)
+    parser.add_argument("--filho", choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument("--pasta", help=argparse.SUPPRESS)
+    parser.add_argument("--porta", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        filho(args.filho, args.pasta, args.porta)
+        sys.exit(0)
+
+    from fake_esp32 import EmuladorESP32
+    fake = EmuladorESP32()
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            preparar(pasta, args.programas)
+            print(f"{args.rodadas} partidas a frio por modo, {args.programas} programas salvos (mediana, ms)")
+            for modo in MODOS:
+                rodadas = [rodar(modo, pasta, fake.porta) for _ in range(args.rodadas)]
+
+                def mediana(fase, campo="ms"):
+                    valores = [r["fases"][fase][campo] for r in rodadas if fase in r["fases"]]
+                    return round(statistics.median(valores), 1) if valores else None
+
+                print(f"{modo:8s}: imports {mediana('imports')}  api {mediana('api')}  "
+                      f"interativo {mediana('interativo')}  aquecido {mediana('aquecido')}  "
+                      f"slots {mediana('slots')}  conectar {mediana('conectado', 'duracao_ms')} "
+                      f"(espera do firmware {statistics.median(r['espera_firmware_ms'] for r in rodadas)})")
+    finally:
+        fake.fechar()
@@ -0,0 +1,135 @@
+# bench_program_store.py
+"""
+Compara o formato antigo (slots.json reescrito a cada alteração + <id>.json com
+indent=2) com o ProgramStore (SQLite + índice em memória) com N programas salvos.
+
+Para cada formato: cria N programas, e com N já gravados mede o tempo médio
+de criar, renomear, carregar e apagar.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_program_store.py [--programas 10000] [--ops 200]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from program_store import ProgramStore  # noqa: E402
+
+PROGRAMA = json.dumps({
+    "points": {str(i): [90, 30, 152, 90, 84] for i in range(10)},
+    "commands": [{"type": "mover", "params": {"point": i, "mode": "Linear", "speed": 50}} for i in range(10)],
+})
+
+
+class FormatoAntigo:
+    """Cópia das operações do Cobot antes do ProgramStore."""
+
+    def __init__(self, pasta):
+        self.pasta = Path(pasta)
+        self.slots = []
+        self.slots_file = self.pasta / "slots.json"
+
+    def _save_slots(self):
+        self.slots_file.write_text(json.dumps(self.slots, indent=2), encoding="utf-8")
+
+    def gerar_id(self):
+        existente = {item["id"] for item in self.slots}
+        while True:
+            novo_id = uuid.uuid4().hex
+            if novo_id not in existente:
+                return novo_id
+
+    def criar(self, nome, dom, salvar_lista=True):
+        new_id = self.gerar_id()
+        (self.pasta / f"{new_id}.json").write_text(json.dumps(json.loads(dom), indent=2), encoding="utf-8")
+        self.slots.append({"id": new_id, "name": nome})
+        if salvar_lista:
+            self._save_slots()
+        return new_id
+
+    def renomear(self, id, nome):
+        for slot in self.slots:
+            if slot["id"] == id:
+                slot["name"] = nome
+                self._save_slots()
+                return True
+        return False
+
+    def carregar(self, id):
+        return json.loads((self.pasta / f"{id}.json").read_text(encoding="utf-8"))
+
+    def apagar(self, id):
+        (self.pasta / f"{id}.json").unlink()
+        self.slots = [s for s in self.slots if s["id"] != id]
+        self._save_slots()
+
+
+class FormatoNovo:
+    def __init__(self, pasta):
+        self.store = ProgramStore(Path(pasta) / "programs.db")
+
+    def criar(self, nome, dom, salvar_lista=True):
+        new_id = uuid.uuid4().hex
+        json.loads(dom)
+        self.store.salvar(new_id, nome, dom)
+        return new_id
+
+    def renomear(self, id, nome):
+        return self.store.renomear(id, nome)
+
+    def carregar(self, id):
+        return self.store.obter(id)
+
+    def apagar(self, id):
+        return self.store.remover(id)
+
+
+def cronometrar(f, args_list):
+    t0 = perf_counter()
+    for args in args_list:
+        f(*args)
+    return (perf_counter() - t0) / len(args_list) * 1000
+
+
+def medir(formato_cls, n, ops):
+    with tempfile.TemporaryDirectory() as pasta:
+        fmt = formato_cls(pasta)
+
+        # popula (o formato antigo grava a lista só no fim, senão levaria minutos)
+        t0 = perf_counter()
+        ids = [fmt.criar(f"prog {i}", PROGRAMA, salvar_lista=False) for i in range(n)]
+        if isinstance(fmt, FormatoAntigo):
+            fmt._save_slots()
+        popular = perf_counter() - t0
+
+        alvos = random.sample(ids, ops)
+        r = {
+            "formato": formato_cls.__name__,
+            "popular_s": round(popular, 2),
+            "criar_ms": cronometrar(fmt.criar, [("novo", PROGRAMA)] * ops),
+            "renomear_ms": cronometrar(fmt.renomear, [(i, "renomeado") for i in alvos]),
+            "carregar_ms": cronometrar(fmt.carregar, [(i,) for i in alvos]),
+            "apagar_ms": cronometrar(fmt.apagar, [(i,) for i in alvos]),
+        }
+        if isinstance(fmt, FormatoNovo):
+            fmt.store.fechar()
+        return r
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--programas", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.programas} programas salvos, {args.ops} operações de cada tipo (tempo médio por operação)")
+    for cls in (FormatoAntigo, FormatoNovo):
+        r = medir(cls, args.programas, args.ops)
+        print(" | ".join(f"{k}: {v:.3f}" if isinstance(v, float) else f"{k}: {v}" for k, v in r.items()))
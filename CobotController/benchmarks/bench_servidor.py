@@ -0,0 +1,160 @@
+# bench_servidor.py
+"""
+Carga no servidor headless (server.py) com muitos clientes WebSocket.
+
+O servidor roda num processo filho (este script com --filho), com um Api sem
+robô conectado e os saves numa pasta temporária; ele também empurra quadros
+de telemetria para as telas (setJointPos) na taxa pedida. O pai abre N
+clientes e mede:
+- chamadas/s e latência (p50/p99) de um método leve do Api (ui_stats);
+- quadros de telemetria recebidos por cliente por segundo e descartados.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_servidor.py [--clientes 1,10,50,100] [--segundos 3] [--telemetria 30]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from server import ServidorApi, ler_quadro_ws, desmascarar  # noqa: E402
+
+
+def filho(hz):
+    """Processo do servidor: imprime a porta e o token e roda até o stdin fechar."""
+    from main import Api
+    with tempfile.TemporaryDirectory() as pasta:
+        servidor = ServidorApi(Path(__file__).resolve().parents[1] / "app" / "web")
+        api = Api(saves_path=pasta, enviar_ui=servidor.publicar)
+        servidor.registrar(api)
+        pronto = threading.Event()
+        porta = []
+
+        def telemetria():
+            pronto.wait()
+            i = 0
+            while True:
+                servidor.publicar([("setJointPos", (j, (i + j) % 180)) for j in range(5)])
+                i += 1
+                sleep(1 / hz)
+
+        async def principal():
+            porta.append((await servidor.iniciar("127.0.0.1", 0))[1])
+            print(json.dumps({"porta": porta[0], "token": servidor.token}), flush=True)
+            pronto.set()
+            await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+            await servidor.fechar()
+
+        if hz:
+            threading.Thread(target=telemetria, daemon=True).start()
+        asyncio.run(principal())
+
+
+class ClienteWS:
+    def __init__(self, reader, writer):
+        self.r, self.w = reader, writer
+        self.proximo = 1
+        self.pendentes = {}
+        self.telemetria = 0
+
+    @classmethod
+    async def conectar(cls, porta, token):
+        r, w = await asyncio.open_connection("127.0.0.1", porta)
+        chave = base64.b64encode(os.urandom(16)).decode()
+        w.write((f"GET /ws?token={token} HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 f"Sec-WebSocket-Key: {chave}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await r.readuntil(b"\r\n\r\n")
+        cliente = cls(r, w)
+        cliente.tarefa = asyncio.create_task(cliente._ler())
+        return cliente
+
+    async def _ler(self):
+        try:
+            while True:
+                _, _, dados = await ler_quadro_ws(self.r)
+                msg = json.loads(dados)
+                if "chamadas" in msg:
+                    self.telemetria += 1
+                else:
+                    self.pendentes.pop(msg["id"]).set_result(msg)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def chamar(self, metodo, *args):
+        id_ = self.proximo
+        self.proximo += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes[id_] = futuro
+        dados = json.dumps({"id": id_, "metodo": metodo, "args": list(args)}).encode()
+        mascara = os.urandom(4)
+        tamanho = bytes([0x80 | len(dados)]) if len(dados) < 126 else bytes([0xFE]) + len(dados).to_bytes(2, "big")
+        self.w.write(bytes([0x81]) + tamanho + mascara + desmascarar(dados, mascara))
+        return await futuro
+
+    def fechar(self):
+        self.tarefa.cancel()
+        self.w.close()
+
+
+async def medir(porta, token, n, segundos):
+    clientes = await asyncio.gather(*(ClienteWS.conectar(porta, token) for _ in range(n)))
+    latencias = []
+    fim = perf_counter() + segundos
+
+    async def rodar(cliente):
+        while perf_counter() < fim:
+            t = perf_counter()
+            await cliente.chamar("ui_stats")
+            latencias.append(perf_counter() - t)
+
+    telemetria0 = sum(c.telemetria for c in clientes)
+    t0 = perf_counter()
+    await asyncio.gather(*(rodar(c) for c in clientes))
+    dt = perf_counter() - t0
+    telemetria = sum(c.telemetria for c in clientes) - telemetria0
+    for c in clientes:
+        c.fechar()
+    latencias.sort()
+    ms = [x * 1000 for x in latencias]
+    return {
+        "chamadas_s": round(len(latencias) / dt),
+        "lat_p50_ms": round(statistics.median(ms), 3),
+        "lat_p99_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 3),
+        "telemetria_por_cliente_s": round(telemetria / n / dt, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clientes", default="1,10,50,100")
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--telemetria", type=int, default=30, help="quadros de tela por segundo empurrados")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        filho(args.telemetria)
+        sys.exit(0)
+
+    proc = subprocess.Popen([sys.executable, __file__, "--filho", "--telemetria", str(args.telemetria)],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        servidor = json.loads(proc.stdout.readline())
+        porta = servidor["porta"]
+        print(f"servidor na porta {porta}, telemetria {args.telemetria} quadros/s")
+        for n in map(int, args.clientes.split(",")):
+            print(f"{n:4d} clientes: {asyncio.run(medir(porta, servidor['token'], n, args.segundos))}")
+    finally:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+        proc.wait(timeout=10)
@@ -0,0 +1,76 @@
+# bench_simulator.py
+"""
+Simula o tempo de ciclo de N variantes de um programa salvas no ProgramStore
+(pontos, velocidades e modos aleatórios), carregadas por Cobot.load_program,
+e mostra as mais rápidas. Mede o tempo da simulação em lote contra a mesma
+simulação programa a programa.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_simulator.py [--programas 500] [--passos 30]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from controllers import Cobot, compilar_programa  # noqa: E402
+from simulator import simular_lote, tabela_tempos  # noqa: E402
+
+
+def variante(rng, passos):
+    pontos = {str(i): [rng.randint(0, 180) for _ in range(5)] for i in range(8)}
+    comandos = []
+    for _ in range(passos):
+        r = rng.random()
+        if r < 0.7:
+            comandos.append({"type": "mover", "params": {
+                "point": rng.randrange(8), "mode": rng.choice(["Linear", "Suave"]),
+                "speed": rng.choice([30, 50, 80, 100])}})
+        elif r < 0.85:
+            comandos.append({"type": "delay", "params": {"delay": rng.choice([0.2, 0.5, 1.0])}})
+        else:
+            comandos.append({"type": "garra", "params": {"acao": rng.randint(0, 1)}})
+    return {"points": pontos, "commands": comandos}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--programas", type=int, default=500)
+    parser.add_argument("--passos", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as pasta:
+        cobot = Cobot(None, pasta)
+        ids = [cobot.save_program(f"variante {i}", json.dumps(variante(rng, args.passos)))
+               for i in range(args.programas)]
+
+        t0 = perf_counter()
+        tabela_tempos()
+        print(f"tabela de tempos: {(perf_counter() - t0) * 1000:.0f} ms (uma vez por processo)")
+
+        t0 = perf_counter()
+        resultado = cobot.simular(ids, otimizar=False)
+        lote = perf_counter() - t0
+        print(f"{args.programas} programas (carregar + compilar + simular): {lote * 1000:.0f} ms")
+
+        irs = [compilar_programa(cobot.load_program(i), otimizar=False)[0] for i in ids]
+        t0 = perf_counter()
+        simular_lote(irs)
+        so_lote = perf_counter() - t0
+        t0 = perf_counter()
+        for ir in irs:
+            simular_lote([ir])
+        um_a_um = perf_counter() - t0
+        print(f"só a simulação: lote {so_lote * 1000:.1f} ms | um a um {um_a_um * 1000:.1f} ms"
+              f" ({um_a_um / so_lote:.1f}x)")
+
+        print("mais rápidas:")
+        for r in sorted(resultado, key=lambda r: r["total_ms"])[:5]:
+            print(f"  {r['id']}  {r['total_ms'] / 1000:7.2f} s  {r['passos']} passos")
+        cobot._store.fechar()
@@ -0,0 +1,305 @@
+# bench_suite.py
+"""
+Suíte de benchmarks de ponta a ponta do controlador, sem hardware: o robô é o
+EmuladorESP32 (fake_esp32.py) num pty e a janela do pywebview é um no-op.
+
+Cenários:
+- leitor: linhas/s pela thread de leitura do SerialManager (eventos e polling)
+  até os listeners do Api (log, steps, savepos, posição das juntas);
+- rtt: ida e volta de enviar_e_aguardar("M:P") no baud do ESP32;
+- api_enviar: custo do Api.enviar sobre o SerialManager.enviar puro;
+- upload: gravação de programas de 10 e 30 passos (upload_sequence) e de
+  100 passos no modo fluxo (executar_em_fluxo, relógio do emulador acelerado);
+- programas: save/load do Cobot com muitos slots.
+
+Os resultados vão para um JSON (com commit, Python e parâmetros) e, com
+--comparar, cada métrica é comparada com um resultado anterior.
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_suite.py [--rapido] [--cenarios leitor,rtt] [--saida r.json] [--comparar antigo.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+from serial_comm import LEITURA_EVENTOS, LEITURA_POLLING  # noqa: E402
+from controllers import Cobot  # noqa: E402
+from fake_esp32 import EmuladorESP32  # noqa: E402
+
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+# métricas em que maior é melhor (o resto é tempo: menor é melhor)
+MAIOR_MELHOR = ("linhas_s", "ops_s")
+
+
+class _JanelaFalsa:
+    def evaluate_js(self, code):
+        pass
+
+
+def _percentis(amostras_ms):
+    ordenadas = sorted(amostras_ms)
+
+    def p(q):
+        return round(ordenadas[min(int(q * len(ordenadas)), len(ordenadas) - 1)], 3)
+
+    return {"mediana_ms": round(statistics.median(ordenadas), 3), "p95_ms": p(0.95), "p99_ms": p(0.99),
+            "max_ms": round(ordenadas[-1], 3)}
+
+
+@contextlib.contextmanager
+def _api_conectada(pasta, **emulador):
+    """Api real (listeners, UiChannel, Cobot) ligada a um emulador."""
+    main.window = _JanelaFalsa()
+    fake = EmuladorESP32(**emulador)
+    api = main.Api(saves_path=pasta)
+    try:
+        api.conectar(fake.porta, 500000)
+        sleep(0.2)      # resposta do M:P do conectar
+        yield api, fake
+    finally:
+        api.desconectar()
+        api._ui.parar()
+        fake.fechar()
+
+
+def _programa(passos, rng):
+    pontos = {str(i): [rng.randint(20, 160) for _ in range(5)] for i in range(6)}
+    comandos = []
+    for i in range(passos):
+        if i % 5 == 4:
+            comandos.append({"type": "delay", "params": {"delay": 0.05}})
+        else:
+            comandos.append({"type": "mover", "params": {
+                "point": i % 6, "mode": "Linear" if i % 2 else "Suave", "speed": 100}})
+    return {"points": pontos, "commands": comandos}
+
+
+# ============================================================
+# === CENÁRIOS ===============================================
+# ============================================================
+
+def cenario_leitor(pasta, linhas):
+    """Telemetria sem limite de baud; conta o que chega ao último listener do Api."""
+    resultado = {}
+    for modo in (LEITURA_EVENTOS, LEITURA_POLLING):
+        main.window = _JanelaFalsa()
+        fake = EmuladorESP32(baudrate=None)
+        api = main.Api(saves_path=pasta)
+        api._ser.conectar(fake.porta, 500000, modo_leitura=modo, espera=0)  # sem o eco do M:P na contagem
+        recebidas = [0]
+        fim = [0.0]
+
+        def contar(data):
+            recebidas[0] += 1
+            fim[0] = perf_counter()
+
+        api._ser.add_listener(contar)
+        inicio = perf_counter()
+        fake.transmitir_telemetria(10 ** 7, total=linhas).join()
+        limite = perf_counter() + 10
+        while recebidas[0] < linhas and perf_counter() < limite:
+            sleep(0.01)
+        api._ser.desconectar()
+        api._ui.parar()
+        fake.fechar()
+        duracao = fim[0] - inicio
+        resultado[modo] = {"linhas": recebidas[0], "perdidas": linhas - recebidas[0],
+                           "linhas_s": round(recebidas[0] / duracao) if duracao > 0 else 0}
+    return resultado
+
+
+def cenario_rtt(pasta, repeticoes):
+    with _api_conectada(pasta) as (api, fake):
+        ser = api._ser
+        amostras = []
+        for _ in range(repeticoes):
+            t = perf_counter()
+            if ser.enviar_e_aguardar("M:P", "#J6:", "#", timeout=1.0) is not None:
+                amostras.append((perf_counter() - t) * 1000)
+        return {"M:P": {**_percentis(amostras), "falhas": repeticoes - len(amostras)}}
+
+
+def cenario_api_enviar(pasta, repeticoes):
+    """Mesmo comando (sem resposta do protocolo) pelo Api e direto no SerialManager."""
+    with _api_conectada(pasta, eco=False) as (api, fake):
+        t = perf_counter()
+        for _ in range(repeticoes):
+            api._ser.enviar("J1:D")
+        direto = (perf_counter() - t) / repeticoes
+        t = perf_counter()
+        for _ in range(repeticoes):
+            api.enviar("J1:D")
+        via_api = (perf_counter() - t) / repeticoes
+        return {"serial_enviar_us": round(direto * 1e6, 2), "api_enviar_us": round(via_api * 1e6, 2),
+                "sobrecarga_us": round((via_api - direto) * 1e6, 2)}
+
+
+def cenario_upload(pasta, repeticoes):
+    rng = random.Random(0)
+    resultado = {}
+    with _api_conectada(pasta, escala_tempo=50.0) as (api, fake):
+        cobot = api.cobot
+        for passos in (10, 30):
+            programa = _programa(passos, rng)
+            cobot.compilar(programa)        # o compilador/cache de planos não entra na medida
+            amostras = []
+            for _ in range(repeticoes):
+                t = perf_counter()
+                r = cobot.upload_sequence(programa, forcar=True)
+                if r["enviado"]:
+                    amostras.append((perf_counter() - t) * 1000)
+            resultado[f"{passos}_passos"] = {**_percentis(amostras), "falhas": repeticoes - len(amostras)}
+
+        # 100 passos não cabem na sequence[]: modo fluxo até o #STEP:END#.
+        # Com o relógio acelerado, os #Jn# de cada grau passariam do baud real: sem limite aqui.
+        fake.baudrate = None
+        programa = _programa(100, rng)
+        cobot.compilar(programa)
+        t = perf_counter()
+        cobot.executar_em_fluxo(programa, janela=8)
+        inicio = (perf_counter() - t) * 1000
+        cobot._executor.aguardar(60)
+        stats = cobot.fluxo_stats()
+        resultado["100_passos_fluxo"] = {"inicio_ms": round(inicio, 3),
+                                         "total_ms": round(stats["duracao_s"] * 1000 + inicio, 1),
+                                         "underruns": stats["underruns"], "erro": stats["erro"]}
+    return resultado
+
+
+def cenario_programas(pasta, slots, ops):
+    rng = random.Random(0)
+    cobot = Cobot(None, pasta)
+    dom = json.dumps(_programa(30, rng))
+
+    t = perf_counter()
+    ids = [cobot.save_program(f"programa {i}", dom) for i in range(slots)]
+    criar = perf_counter() - t
+
+    t = perf_counter()
+    for _ in range(ops):
+        cobot.save_program("renomeado", dom, rng.choice(ids))
+    atualizar = perf_counter() - t
+
+    # ids diferentes a cada leitura: mede o caminho do banco, não o cache
+    escolhidos = rng.sample(ids, min(ops, len(ids)))
+    t = perf_counter()
+    for i in escolhidos:
+        cobot.load_program(i)
+    frio = perf_counter() - t
+
+    t = perf_counter()
+    for _ in range(ops):
+        cobot.load_program(escolhidos[0])
+    quente = perf_counter() - t
+
+    t = perf_counter()
+    cobot.load_slots()
+    listar = perf_counter() - t
+    cobot._store.fechar()
+    return {
+        "slots": slots,
+        "criar_ops_s": round(slots / criar),
+        "atualizar_ops_s": round(ops / atualizar),
+        "carregar_frio_ops_s": round(len(escolhidos) / frio),
+        "carregar_cache_ops_s": round(ops / quente),
+        "listar_slots_ms": round(listar * 1000, 3),
+    }
+
+
+# ============================================================
+# === RESULTADOS =============================================
+# ============================================================
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _achatar(dados, prefixo=""):
+    for chave, valor in dados.items():
+        nome = f"{prefixo}{chave}"
+        if isinstance(valor, dict):
+            yield from _achatar(valor, nome + ".")
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            yield nome, valor
+
+
+def comparar(atual, anterior, limite=0.10):
+    """Imprime as métricas que pioraram mais que `limite` (fração). Retorna quantas."""
+    antes = dict(_achatar(anterior["cenarios"]))
+    pioras = 0
+    for nome, valor in _achatar(atual["cenarios"]):
+        if nome not in antes or not antes[nome] or not nome.endswith(("_ms", "_us") + MAIOR_MELHOR):
+            continue
+        razao = valor / antes[nome]
+        piorou = razao < 1 - limite if nome.endswith(MAIOR_MELHOR) else razao > 1 + limite
+        pioras += piorou
+        print(f"{'PIOROU' if piorou else '      '}  {nome:45s} {antes[nome]:>12} -> {valor:<12} ({razao:.2f}x)")
+    return pioras
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cenarios", default="leitor,rtt,api_enviar,upload,programas")
+    parser.add_argument("--rapido", action="store_true", help="menos repetições (checagem rápida)")
+    parser.add_argument("--saida", type=Path, default=None)
+    parser.add_argument("--comparar", type=Path, default=None)
+    args = parser.parse_args()
+
+    escala = 0.1 if args.rapido else 1.0
+    n = lambda valor: max(int(valor * escala), 10)  # noqa: E731
+
+    executar = {
+        "leitor": lambda pasta: cenario_leitor(pasta, n(100000)),
+        "rtt": lambda pasta: cenario_rtt(pasta, n(1000)),
+        "api_enviar": lambda pasta: cenario_api_enviar(pasta, n(20000)),
+        "upload": lambda pasta: cenario_upload(pasta, n(20)),
+        "programas": lambda pasta: cenario_programas(pasta, n(10000), n(500)),
+    }
+    nomes = args.cenarios.split(",")
+    for nome in nomes:
+        if nome not in executar:
+            parser.error(f"cenário desconhecido: {nome}")
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome in nomes:
+            t = perf_counter()
+            # o log do Api (<<< linha) e os prints do app não entram na saída nem na medida
+            with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+                resultados[nome] = executar[nome](os.path.join(pasta, nome))
+            print(f"{nome} ({perf_counter() - t:.1f} s): {json.dumps(resultados[nome])}")
+
+    saida = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "rapido": args.rapido,
+        "cenarios": resultados,
+    }
+    caminho = args.saida or PASTA_RESULTADOS / f"{datetime.now():%Y%m%d-%H%M%S}-{saida['commit'] or 'local'}.json"
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(saida, indent=2), encoding="utf-8")
+    print(f"Resultados em {caminho}")
+
+    if args.comparar:
+        pioras = comparar(saida, json.loads(args.comparar.read_text(encoding="utf-8")))
+        sys.exit(1 if pioras else 0)
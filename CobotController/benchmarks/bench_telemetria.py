@@ -0,0 +1,92 @@
+# bench_telemetria.py
+"""
+Gravador de telemetria (telemetry_recorder.py): custo por amostra, gravação
+com telemetria contínua pelo SerialManager e reprodução.
+
+- gravar: amostras/s chamando o callback de JointPos direto e blocos de
+  memória alocados por amostra (sys.getallocatedblocks; deve ficar em ~0);
+- porta: FakeESP32 em pty mandando #Jn# na taxa pedida, SerialManager com
+  o gravador anexado; compara amostras gravadas com linhas enviadas;
+- reproduzir: a gravação de volta pelo caminho dos listeners, o mais rápido
+  possível e em tempo real (atraso máximo em relação ao horário gravado).
+
+Uso (a partir de CobotController/):
+    python benchmarks/bench_telemetria.py [--amostras 500000] [--taxa 5000] [--linhas 20000]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from serial_comm import SerialManager, JointPos  # noqa: E402
+from telemetry_recorder import GravadorTelemetria  # noqa: E402
+from fake_esp32 import FakeESP32  # noqa: E402
+
+
+def medir_gravacao(pasta, amostras):
+    mensagens = [JointPos(j % 5, a) for j, a in zip(range(1000), range(1000))]
+    with GravadorTelemetria(Path(pasta) / "gravar.bin", capacidade=amostras // 4) as g:
+        gravar = g.junta
+        for msg in mensagens:     # aquece (páginas do mmap já tocadas uma vez)
+            gravar(msg)
+        blocos = sys.getallocatedblocks()
+        t0 = perf_counter()
+        for i in range(amostras):
+            gravar(mensagens[i % 1000])
+        dt = perf_counter() - t0
+        blocos = sys.getallocatedblocks() - blocos
+    return {"amostras_s": round(amostras / dt), "us_amostra": round(dt / amostras * 1e6, 3),
+            "blocos_por_amostra": round(blocos / amostras, 4)}
+
+
+def medir_porta(pasta, linhas, taxa):
+    fake = FakeESP32()
+    ser = SerialManager()
+    g = GravadorTelemetria(Path(pasta) / "porta.bin", capacidade=linhas * 2)
+    g.anexar(ser)
+    ser.conectar(fake.porta, espera=0)    # o FakeESP32 não responde ao M:P
+    t0 = perf_counter()
+    fake.transmitir_telemetria(taxa, linhas).join()
+    limite = perf_counter() + 2.0
+    while len(g) < linhas and perf_counter() < limite:
+        sleep(0.01)
+    dt = perf_counter() - t0
+    ser.desconectar()
+    fake.fechar()
+    gravadas = len(g)
+    g.fechar()
+    return {"enviadas": linhas, "gravadas": gravadas, "perdidas": linhas - gravadas,
+            "linhas_s": round(gravadas / dt)}
+
+
+def medir_reproducao(pasta, velocidade):
+    ser = SerialManager()
+    recebidas = [0]
+
+    def contar(msg):
+        recebidas[0] += 1
+
+    ser.subscribe(JointPos, contar)
+    with GravadorTelemetria(Path(pasta) / "porta.bin") as g:
+        r = g.reproduzir(ser, velocidade)
+    r["recebidas"] = recebidas[0]
+    if not velocidade:
+        r["amostras_s"] = round(r["amostras"] / r["duracao_s"]) if r["duracao_s"] else None
+    return r
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--amostras", type=int, default=500000)
+    parser.add_argument("--taxa", type=int, default=5000, help="linhas #Jn# por segundo no pty")
+    parser.add_argument("--linhas", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print("gravar     :", medir_gravacao(pasta, args.amostras))
+        print("porta      :", medir_porta(pasta, args.linhas, args.taxa))
+        print("reproduzir :", medir_reproducao(pasta, None))
+        print("tempo real :", medir_reproducao(pasta, 1.0))
@@ -0,0 +1,637 @@
+# fake_esp32.py
+"""
+ESP32 falso sobre um pseudo-terminal (pty), para rodar o SerialManager sem hardware.
+
+O SerialManager abre `fake.porta` (ex: /dev/pts/3) como se fosse a porta do robô;
+o lado "firmware" escreve/lê pelo descritor mestre do pty.
+Somente POSIX (Linux/macOS).
+
+- FakeESP32: só o pty; o teste escreve as linhas que quiser (escrever) e
+  gera telemetria em ritmo fixo (transmitir_telemetria).
+- EmuladorESP32: responde como o Cobot.ino (loop de 1 ms com as juntas,
+  sequência e garra), com limite de baud, latência e telemetria configuráveis;
+  aceita o protocolo binário (P:B, framing.py) como o firmware.
+"""
+import os
+import select
+import sys
+import tty
+import threading
+from collections import deque
+from pathlib import Path
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from framing import (DecodificadorQuadros, Mover, quadro_junta, quadro_juntas,  # noqa: E402
+                     quadro_savepos, quadro_step)
+from simulator import calcular_sleep, map_esp32  # noqa: E402
+
+
+class FakeESP32:
+    def __init__(self):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # sem eco e sem tradução de fim de linha
+        self.porta = os.ttyname(self._slave)
+        self._running = False
+        self._thread = None
+
+    # --- Lado "firmware" ---
+    def escrever(self, linha: str):
+        """Envia uma linha para o host, no mesmo formato do serialPrintln (\\r\\n)."""
+        os.write(self._master, (linha + "\r\n").encode())
+
+    def transmitir_telemetria(self, linhas_por_segundo=1000, total=None, on_envio=None):
+        """
+        Inicia uma thread que envia linhas #Jn:angle# em ritmo fixo.
+        on_envio(i, t) é chamado com o índice e o perf_counter de cada linha enviada.
+        """
+        intervalo = 1.0 / linhas_por_segundo
+
+        def run():
+            i = 0
+            proximo = perf_counter()
+            while self._running and (total is None or i < total):
+                t = perf_counter()
+                if on_envio:
+                    on_envio(i, t)
+                self._telemetria(i)
+                i += 1
+                proximo += intervalo
+                espera = proximo - perf_counter()
+                if espera > 0:
+                    sleep(espera)
+
+        self._running = True
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _telemetria(self, i):
+        self.escrever(self._linha_telemetria(i))
+
+    def _linha_telemetria(self, i):
+        return f"#J{i % 5 + 1}:{i}#"
+
+    def parar(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def fechar(self):
+        self.parar()
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+# ============================================================
+# === EMULADOR DO FIRMWARE ===================================
+# ============================================================
+
+MAX_STEPS = 30
+MOVE_DELAY = 150                                # ms entre passos da sequência
+HOME = (90, 30, 152, 90, 84)                    # M:H
+POSICAO_INICIAL = (90, 30, 152, 90, 82, 110)    # depois do homing do setup() (garra aberta)
+LIMITES = ((0, 180),) * 5 + ((26, 110),)
+SEPARADOR = "=" * 40
+
+_SLEEP = [calcular_sleep(v) for v in range(256)]   # calcularSleep(uint8_t)
+
+
+class _Junta:
+    """
+    Servo::move / moveSmooth / update do servo.cpp, com o relógio em ms.
+    Como o write() do firmware, cada grau andado é reportado (#Jn:angle# ou quadro).
+    """
+    __slots__ = ("numero", "reportar", "atual", "alvo", "minimo", "maximo", "vel", "sleep",
+                 "direcao", "movendo", "suave", "ativacao", "ultimo", "em_curso")
+
+    def __init__(self, numero, reportar, atual, minimo, maximo):
+        self.numero, self.reportar = numero, reportar
+        self.atual, self.alvo = atual, atual
+        self.minimo, self.maximo = minimo, maximo
+        self.vel, self.sleep, self.direcao = 0, 20, 0
+        self.movendo = self.suave = False
+        self.ativacao = 0
+        self.ultimo = 0
+        self.em_curso = False       # já andou um grau neste movimento
+
+    def mover(self, alvo, vel):
+        alvo = min(max(alvo & 0xFF, self.minimo), self.maximo)     # uint8_t target
+        self.alvo = alvo
+        self.vel = ((vel + 128) & 0xFF) - 128       # int8_t
+        self.sleep = _SLEEP[vel & 0xFF]
+        self.movendo = True
+        self.suave = False
+        self.direcao = (alvo > self.atual) - (alvo < self.atual)
+        # lastUpdate não é zerado: parado há mais de `sleep` ms, o primeiro grau sai no próximo
+        # loop e os seguintes contam dele
+
+    def mover_suave(self, alvo, vel):
+        self.mover(alvo, vel)
+        self.suave = True
+        self.ativacao = int(self.alvo - abs(self.alvo - self.atual) * 0.5 * self.direcao) & 0xFF
+
+    def escrever_angulo(self, angulo):
+        self.atual = min(max(angulo, self.minimo), self.maximo)
+        self.reportar(self.numero, self.atual)
+
+    def passo(self, delta):
+        self.escrever_angulo(self.atual + delta)
+
+    def atualizar(self, agora):
+        # vários graus por volta quando o loop atrasa (ou o relógio está acelerado):
+        # cada grau conta do instante em que o anterior deveria ter saído
+        while self.movendo and agora - self.ultimo >= self.sleep:
+            proximo = self.ultimo + self.sleep if self.em_curso else agora
+            if self.suave and ((self.direcao > 0 and self.atual >= self.ativacao)
+                               or (self.direcao < 0 and self.atual <= self.ativacao)):
+                dif = abs(self.alvo - self.atual)
+                baixa = min(max(self.vel - 6, 1), 10)
+                self.sleep = _SLEEP[int(map_esp32(dif, 1, abs(self.alvo - self.ativacao), baixa, self.vel - 1)) & 0xFF]
+            self.passo(self.direcao)
+            self.ultimo = proximo
+            self.em_curso = True
+            if self.atual == self.alvo:
+                self.movendo = self.em_curso = False
+
+
+class EmuladorESP32(FakeESP32):
+    """
+    Emula o protocolo do Cobot.ino:
+    - M:P -> #J1:a# ... #J6:a#; M:M / M:MS; M:H; M:SP -> #SAVEPOS#; G:0/1;
+    - J<n>:M / J<n>:MS / J<n>:S:<passo> (jog);
+    - S:M / S:MS / S:W / S:G com o eco "N - ...", S:C:C/B/F/P/R/L/S/E e S:P,
+      com #STEP:n#, #STEP:UNDERRUN# e #STEP:END#;
+    - P:B / P:T: protocolo binário (telemetria, passos, #SAVEPOS# e M:P em
+      quadros; quadros de M:M / M:MS aceitos a qualquer momento, sem eco).
+    Cada linha recebida gera o mesmo cabeçalho/eco/DONE do firmware.
+
+    baudrate: limita a saída a baudrate/10 bytes/s (None = sem limite);
+    latencia: segundos entre a chegada de uma linha e o processamento;
+    eco: False omite o cabeçalho/String/DONE (só as respostas do protocolo);
+    escala_tempo: acelera o relógio do firmware (servos, esperas, MOVE_DELAY).
+    """
+    def __init__(self, baudrate=500000, latencia=0.0, eco=True, escala_tempo=1.0):
+        super().__init__()
+        self.baudrate = baudrate
+        self.latencia = latencia
+        self.eco = eco
+        self.escala_tempo = escala_tempo
+        self._lock_saida = threading.RLock()  # _quadro: seq e escrita juntos
+        self._livre_em = perf_counter()         # quando a "UART" termina o que já foi escrito
+        self._t0 = perf_counter()
+        self._entrada = deque()                 # (quando processar, linha, quadro)
+        self._decodificador = DecodificadorQuadros()
+        self.binario = False
+        self._seq_tx = 0
+
+        self.juntas = [_Junta(i + 1, self._reportar_junta, p, mn, mx)
+                       for i, (p, (mn, mx)) in enumerate(zip(POSICAO_INICIAL, LIMITES))]
+        self._garra_chegou = True
+        self._garra_desde = 0
+        self._garra_fechada = False
+
+        # sequência (Cobot.ino)
+        self.sequencia = [None] * MAX_STEPS
+        self.num_steps = 0
+        self.passo_atual = 0
+        self.passo_iniciado = False
+        self.executando = False
+        self.repetir = False
+        self.do_inicio = True
+        self.primeiro_print = True
+        self._fim_movimento = 0
+        self._inicio_espera = 0
+        # modo fluxo (S:C:S)
+        self.fluxo = False
+        self._fluxo_fim = False
+        self._fluxo_underrun = False
+        self._fluxo_cabeca = 0
+        self._fluxo_feitos = 0
+        self._fluxo_total = 0
+
+        self.linhas_recebidas = 0
+        self.linhas_enviadas = 0
+        self.bytes_enviados = 0
+
+        self._loop_ativo = True
+        self._loop = threading.Thread(target=self._executar, daemon=True)
+        self._loop.start()
+
+    # --- Saída com limite de baud ---
+    def escrever(self, linha: str):
+        self._escrever_bytes((linha + "\r\n").encode())
+
+    def _escrever_bytes(self, dados):
+        with self._lock_saida:
+            if self.baudrate:
+                agora = perf_counter()
+                inicio = max(agora, self._livre_em)
+                self._livre_em = inicio + len(dados) * 10 / self.baudrate
+                if inicio > agora:
+                    sleep(inicio - agora)
+            os.write(self._master, dados)
+            self.linhas_enviadas += 1
+            self.bytes_enviados += len(dados)
+
+    def _telemetria(self, i):
+        j = i % 5
+        self._reportar_junta(j + 1, self.juntas[j].atual)
+
+    # --- reportJoint / reportStep / reportSavePos: texto ou quadro ---
+    def _quadro(self, fabricar, *args):
+        with self._lock_saida:
+            seq, self._seq_tx = self._seq_tx, (self._seq_tx + 1) & 0xFF
+            self._escrever_bytes(fabricar(*args, seq))
+
+    def _reportar_junta(self, numero, angulo):
+        if self.binario:
+            self._quadro(quadro_junta, numero, angulo)
+        else:
+            self.escrever(f"#J{numero}:{angulo}#")
+
+    def _reportar_step(self, step):
+        """step: número do passo ou "init" / "end" / "underrun"."""
+        if self.binario:
+            self._quadro(quadro_step, step)
+        else:
+            self.escrever(f"#STEP:{str(step).upper()}#")
+
+    def _reportar_savepos(self):
+        if self.binario:
+            self._quadro(quadro_savepos)
+        else:
+            self.escrever("#SAVEPOS#")
+
+    def apertar_botao_salvar(self):
+        """Botão 3 da placa: pede para o app salvar a posição atual."""
+        self._reportar_savepos()
+
+    def posicoes(self):
+        return [j.atual for j in self.juntas]
+
+    def stats(self):
+        return {
+            "linhas_recebidas": self.linhas_recebidas,
+            "linhas_enviadas": self.linhas_enviadas,
+            "bytes_enviados": self.bytes_enviados,
+        }
+
+    def fechar(self):
+        self._loop_ativo = False
+        self._loop.join(timeout=1.0)
+        super().fechar()
+
+    # --- loop() do firmware ---
+    def _ms(self):
+        return int((perf_counter() - self._t0) * 1000 * self.escala_tempo)
+
+    def _executar(self):
+        while self._loop_ativo:
+            try:
+                pronto, _, _ = select.select([self._master], [], [], 0 if self._entrada else 0.001)
+                if pronto:
+                    # linhas de texto e quadros (Serial.peek() == 0xA5 no firmware)
+                    for linha, msg in self._decodificador.alimentar(os.read(self._master, 4096)):
+                        self.linhas_recebidas += 1
+                        self._entrada.append((perf_counter() + self.latencia, linha, msg))
+            except (OSError, ValueError):
+                return
+
+            # como o loop() do firmware: uma linha (ou quadro) por volta, depois os servos
+            if self._entrada and self._entrada[0][0] <= perf_counter():
+                _, linha, msg = self._entrada.popleft()
+                if type(msg) is Mover:
+                    self._mover_todas(msg.suave, msg.vel, msg.angulos)   # processFrame(): sem eco
+                else:
+                    self._processar_linha(linha.strip())
+
+            agora = self._ms()
+            for junta in self.juntas:
+                junta.atualizar(agora)
+            if self.executando:
+                self._executar_sequencia(agora)
+            garra = self.juntas[5]
+            if not garra.movendo and not self._garra_chegou:
+                if self._garra_desde == 0:
+                    self._garra_desde = agora
+                if agora - self._garra_desde >= 100:
+                    self._garra_chegou = True
+                    self._garra_desde = 0
+
+    def _processar_linha(self, linha):
+        if self.eco:
+            self.escrever(SEPARADOR)
+            self.escrever("--- Resposta Serial Identificada ---")
+            self.escrever(f"String: {linha}")
+        partes = ["", "", "", ""]
+        i = 0
+        for c in linha:
+            if c == ":" and i < 3:
+                i += 1
+            else:
+                partes[i] += c
+        self._comando(partes)
+        if self.eco:
+            self.escrever(SEPARADOR + "\n")
+            self.escrever("DONE")
+
+    @staticmethod
+    def _int(texto):
+        """String::toInt(): número inicial ou 0."""
+        texto = texto.strip()
+        fim = 1 if texto[:1] in "+-" else 0
+        while fim < len(texto) and texto[fim].isdigit():
+            fim += 1
+        try:
+            return int(texto[:fim])
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _angulos(campo, maximo):
+        inicio, fim = campo.find("#"), campo.rfind("#")
+        if inicio == -1 or fim <= inicio:
+            return []
+        valores = [EmuladorESP32._int(v) for v in campo[inicio + 1:fim].split(";") if v]
+        return valores[:maximo]
+
+    # --- processCommand() ---
+    def _comando(self, d):
+        if d[0][:1] == "J" and len(d[0]) > 1:
+            alvo = self.juntas[int(d[0][1]) - 1] if d[0][1].isdigit() and 1 <= int(d[0][1]) <= 6 else None
+            if alvo is None:
+                return
+            vel = self._int(d[3]) if self._int(d[3]) > 0 else 10
+            if d[1] == "A":
+                self.escrever("attach()")
+                alvo.escrever_angulo(alvo.atual)
+            elif d[1] == "D":
+                self.escrever("detach()")
+            elif d[1] == "W":
+                self.escrever(f"write({d[2]})")
+                alvo.escrever_angulo(self._int(d[2]))
+            elif d[1] == "M":
+                self.escrever(f"move({d[2]}, {vel})")
+                alvo.mover(self._int(d[2]), vel)
+            elif d[1] == "MS":
+                self.escrever(f"moveSmooth({d[2]}, {vel})")
+                alvo.mover_suave(self._int(d[2]), vel)
+            elif d[1] == "S":
+                self.escrever(f"Step({self._int(d[2])})")
+                alvo.passo(self._int(d[2]))
+            return
+
+        if d[0] == "G":
+            if d[1] == "1":
+                self.escrever("Fechar garra")
+            else:
+                self.escrever("Abrir garra")
+            self._garra(d[1] == "1")
+            return
+
+        if d[0] == "P":
+            if d[1] == "B":
+                self.binario = True
+                self._seq_tx = 0
+                self.escrever("#PROTO:BIN#")
+            elif d[1] == "T":
+                self.binario = False
+                self.escrever("#PROTO:TXT#")
+            return
+
+        if d[0] == "M":
+            if d[1] == "P":
+                if self.binario:
+                    self._quadro(quadro_juntas, self.posicoes())
+                else:
+                    for i, junta in enumerate(self.juntas):
+                        self.escrever(f"#J{i + 1}:{junta.atual}#")
+            elif d[1] in ("M", "MS"):
+                self._mover_todas(d[1] == "MS", self._int(d[2]), self._angulos(d[3], 6))
+            elif d[1] == "H":
+                self.escrever("home()")
+                for junta, angulo in zip(self.juntas, HOME):
+                    junta.mover(angulo, 1)
+            elif d[1] == "SP":
+                self._reportar_savepos()
+            return
+
+        if d[0] == "S":
+            self._comando_sequencia(d)
+
+    def _mover_todas(self, suave, vel, angulos):
+        for junta, angulo in zip(self.juntas, angulos):
+            if suave:
+                junta.mover_suave(angulo, vel)
+            else:
+                junta.mover(angulo, vel)
+
+    def _garra(self, fechar):
+        self.juntas[5].mover(26 if fechar else 110, 10)
+        self._garra_chegou = False
+        self._garra_fechada = fechar
+
+    # --- Sequência ---
+    def _comando_sequencia(self, d):
+        if d[1] in ("M", "MS", "G", "W"):
+            if self.num_steps >= MAX_STEPS:
+                return
+            if d[1] in ("M", "MS"):
+                vel = self._int(d[2]) if self._int(d[2]) > 0 else 10
+                if d[3] == "":
+                    pos = [j.atual for j in self.juntas[:5]]
+                else:
+                    pos = [0] * 5
+                    for i, a in enumerate(self._angulos(d[3], 5)):
+                        pos[i] = a & 0xFF
+                nome = "Move" if d[1] == "M" else "MoveSmooth"
+                cmd = (d[1], vel, tuple(pos))
+                texto = f"{nome} | Vel: {vel} | Pos: {'; '.join(map(str, pos))}"
+            elif d[1] == "G":
+                cmd = ("G", self._int(d[2]) != 0)
+                texto = f"Grip | Acionar: {int(cmd[1])}"
+            else:
+                espera = self._int(d[2]) if self._int(d[2]) > 0 else 1000
+                cmd = ("W", espera & 0xFFFF)
+                texto = f"Wait | Tempo: {cmd[1]}ms"
+            self._adicionar(cmd, texto)
+            return
+
+        if d[1] == "P":
+            self.escrever(f"Num steps: {self.num_steps}")
+            self.escrever(f"Current Step: {self.passo_atual}")
+            self.escrever(f"Start Beginning: {int(self.do_inicio)}")
+            return
+
+        if d[1] != "C":
+            return
+        c = d[2]
+        if c == "C":
+            self.num_steps = 0
+            self.fluxo = False
+            self.executando = False
+            self.passo_atual = 0
+            self.do_inicio = True
+            self.primeiro_print = True
+            self._reportar_step("init")
+        elif c == "S":
+            self.num_steps = 0
+            self.executando = False
+            self.passo_iniciado = False
+            self._fim_movimento = self._inicio_espera = 0
+            self.fluxo = True
+            self._fluxo_fim = self._fluxo_underrun = False
+            self._fluxo_cabeca = self._fluxo_feitos = self._fluxo_total = 0
+            self._reportar_step("init")
+        elif c == "E":
+            self._fluxo_fim = True
+        elif c in ("B", "F") and self.fluxo:
+            self.escrever(f"Fluxo ativo: S:C:{c} ignorado")
+        elif c == "B":
+            self.do_inicio = True
+            self.passo_atual = 0
+            self.primeiro_print = True
+            self.executando = False
+            self._inicio_espera = 0
+            self.passo_iniciado = False
+            self._reportar_step("init")
+        elif c == "F":
+            self.executando = False
+            if not self.primeiro_print and self.passo_atual < self.num_steps:
+                self.passo_atual += 1
+            if self.passo_atual < self.num_steps:
+                self._reportar_step(self.passo_atual + 1)
+                self._iniciar_passo(self.sequencia[self.passo_atual])
+            else:
+                self._reportar_step("end")
+                self.passo_atual = min(max(self.passo_atual, 0), max(self.num_steps - 1, 0))
+            self.do_inicio = False
+            self.primeiro_print = False
+        elif c == "P":
+            self.executando = False
+            self.do_inicio = False
+        elif c == "R":
+            if self.executando:
+                return
+            if self.do_inicio:
+                self.passo_atual = 0
+                self.passo_iniciado = False
+            self.executando = True
+        elif c == "L":
+            self.repetir = d[3] == "1"
+            self.escrever(f"Loop Sequence: {int(self.repetir)}")
+
+    def _adicionar(self, cmd, texto):
+        if self.fluxo:
+            self.sequencia[(self._fluxo_cabeca + self.num_steps) % MAX_STEPS] = cmd
+            self.num_steps += 1
+            self._fluxo_total += 1
+            self._fluxo_underrun = False
+            numero = self._fluxo_total
+        else:
+            self.sequencia[self.num_steps] = cmd
+            self.num_steps += 1
+            numero = self.num_steps
+        self.escrever(f"{numero} - {texto}")
+
+    def _iniciar_passo(self, cmd):
+        if cmd[0] in ("M", "MS"):
+            for junta, angulo in zip(self.juntas, cmd[2]):
+                if junta.atual != angulo:
+                    if cmd[0] == "M":
+                        junta.mover(angulo, cmd[1])
+                    else:
+                        junta.mover_suave(angulo, cmd[1])
+        elif cmd[0] == "G":
+            self._garra(cmd[1])
+
+    def _executar_sequencia(self, agora):
+        """executeSequence() do Cobot.ino."""
+        if self.fluxo:
+            if self.num_steps == 0:
+                if self._fluxo_fim:
+                    self._reportar_step("end")
+                    self.executando = False
+                    self.do_inicio = True
+                elif not self._fluxo_underrun:
+                    self._reportar_step("underrun")
+                    self._fluxo_underrun = True
+                return
+            cmd = self.sequencia[self._fluxo_cabeca]
+            numero = self._fluxo_feitos + 1
+        else:
+            if self.passo_atual >= self.num_steps:
+                return
+            cmd = self.sequencia[self.passo_atual]
+            numero = self.passo_atual + 1
+
+        if not self.passo_iniciado:
+            self._reportar_step(numero)
+            self.passo_iniciado = True
+            self._iniciar_passo(cmd)
+
+        if cmd[0] == "W":
+            if self._inicio_espera == 0:
+                self._inicio_espera = agora
+            if agora - self._inicio_espera <= cmd[1]:
+                return
+            self._inicio_espera = 0
+
+        if cmd[0] in ("M", "MS"):
+            chegou = not any(j.movendo for j in self.juntas[:5])
+        elif cmd[0] == "G":
+            chegou = self._garra_chegou
+        else:
+            chegou = True
+        if not chegou:
+            return
+
+        if self._fim_movimento == 0:
+            self._fim_movimento = agora
+        if agora - self._fim_movimento < MOVE_DELAY:
+            return
+
+        self.passo_iniciado = False
+        self._fim_movimento = 0
+        if self.fluxo:
+            self._fluxo_cabeca = (self._fluxo_cabeca + 1) % MAX_STEPS
+            self.num_steps -= 1
+            self._fluxo_feitos += 1
+        elif self.passo_atual < self.num_steps - 1:
+            self.passo_atual += 1
+        else:
+            self._reportar_step("end")
+            self.do_inicio = True
+            if self.repetir:
+                self.passo_atual = 0
+            else:
+                self.executando = False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Emulador do Cobot.ino num pty (aponte o app para a porta impressa)")
+    parser.add_argument("--baud", type=int, default=500000, help="0 = sem limite")
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por linha recebida")
+    parser.add_argument("--telemetria", type=int, default=0, help="linhas #Jn# extras por segundo")
+    args = parser.parse_args()
+
+    emulador = EmuladorESP32(baudrate=args.baud or None, latencia=args.latencia)
+    if args.telemetria:
+        emulador.transmitir_telemetria(args.telemetria)
+    print(f"Emulador em {emulador.porta} (Ctrl+C para sair)")
+    try:
+        while True:
+            sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(emulador.stats())
+        emulador.fechar()